@@ -0,0 +1,213 @@
+# Progression analytics (NumPy) over the Serie history
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.workout_execution import ExecucaoTreino, ExecucaoExercicio, Serie
+
+class SeriesColunares(NamedTuple):
+    """Histórico de séries de um usuário em arrays colunares (uma posição por série)."""
+    execucao_id: np.ndarray   # int64
+    exercicio_id: np.ndarray  # int64
+    dia: np.ndarray           # datetime64[D], data_inicio da execução
+    ordem: np.ndarray         # int64
+    peso: np.ndarray          # float64 (nan quando ausente)
+    repeticoes: np.ndarray    # float64 (nan quando ausente)
+    concluida: np.ndarray     # bool
+
+class Sessoes(NamedTuple):
+    """Uma posição por (exercício, execução), ordenadas por exercício e data."""
+    exercicio_id: np.ndarray
+    execucao_id: np.ndarray
+    dia: np.ndarray
+    series: np.ndarray
+    repeticoes: np.ndarray
+    tonelagem: np.ndarray
+    e1rm: np.ndarray          # melhor 1RM estimado (Epley) da sessão
+    grupo: np.ndarray         # índice do exercício (0..n_exercicios-1) de cada sessão
+    inicio_grupo: np.ndarray  # posição da primeira sessão de cada exercício
+
+def carregar_series(
+    db: Session, *, usuario_id: int, exercicio_id: Optional[int] = None
+) -> SeriesColunares:
+    """
+    Carrega as séries do usuário com uma única query de colunas, sem instanciar objetos ORM
+    nem schemas Pydantic.
+    """
+    query = (
+        db.query(
+            ExecucaoTreino.id,
+            ExecucaoExercicio.exercicio_id,
+            ExecucaoTreino.data_inicio,
+            Serie.ordem,
+            Serie.peso,
+            Serie.repeticoes,
+            Serie.concluida,
+        )
+        .join(ExecucaoExercicio, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+        .join(Serie, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+        .filter(ExecucaoTreino.usuario_id == usuario_id)
+    )
+    if exercicio_id is not None:
+        query = query.filter(ExecucaoExercicio.exercicio_id == exercicio_id)
+    rows = query.all()
+
+    if not rows:
+        vazio_int = np.empty(0, dtype=np.int64)
+        vazio_float = np.empty(0, dtype=np.float64)
+        return SeriesColunares(
+            vazio_int, vazio_int, np.empty(0, dtype="datetime64[D]"), vazio_int,
+            vazio_float, vazio_float, np.empty(0, dtype=bool),
+        )
+
+    execucao_ids, exercicio_ids, datas, ordens, pesos, repeticoes, concluidas = zip(*rows)
+    return SeriesColunares(
+        execucao_id=np.array(execucao_ids, dtype=np.int64),
+        exercicio_id=np.array(exercicio_ids, dtype=np.int64),
+        dia=np.array(datas, dtype="datetime64[D]"),
+        ordem=np.array(ordens, dtype=np.int64),
+        peso=np.array(pesos, dtype=np.float64),
+        repeticoes=np.array(repeticoes, dtype=np.float64),
+        concluida=np.array(concluidas, dtype=bool),
+    )
+
+def e1rm_epley(peso: np.ndarray, repeticoes: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de crud_statistics.e1rm_epley."""
+    return np.where(repeticoes == 1, peso, peso * (1 + repeticoes / 30))
+
+def agregar_sessoes(series: SeriesColunares) -> Sessoes:
+    """Reduz as séries concluídas a uma linha por (exercício, execução)."""
+    with np.errstate(invalid="ignore"):
+        valida = series.concluida & (series.peso > 0) & (series.repeticoes > 0)
+    idx = np.flatnonzero(valida)
+    idx = idx[np.lexsort((series.execucao_id[idx], series.dia[idx], series.exercicio_id[idx]))]
+
+    exercicio_id = series.exercicio_id[idx]
+    execucao_id = series.execucao_id[idx]
+    peso = series.peso[idx]
+    repeticoes = series.repeticoes[idx]
+
+    if idx.size == 0:
+        vazio_int = np.empty(0, dtype=np.int64)
+        vazio_float = np.empty(0, dtype=np.float64)
+        return Sessoes(
+            vazio_int, vazio_int, np.empty(0, dtype="datetime64[D]"), vazio_int, vazio_float,
+            vazio_float, vazio_float, vazio_int, vazio_int,
+        )
+
+    nova_sessao = np.r_[True, (exercicio_id[1:] != exercicio_id[:-1]) | (execucao_id[1:] != execucao_id[:-1])]
+    inicio = np.flatnonzero(nova_sessao)
+
+    sessao_exercicio = exercicio_id[inicio]
+    novo_exercicio = np.r_[True, sessao_exercicio[1:] != sessao_exercicio[:-1]]
+    inicio_grupo = np.flatnonzero(novo_exercicio)
+
+    return Sessoes(
+        exercicio_id=sessao_exercicio,
+        execucao_id=execucao_id[inicio],
+        dia=series.dia[idx][inicio],
+        series=np.diff(np.r_[inicio, idx.size]),
+        repeticoes=np.add.reduceat(repeticoes, inicio),
+        tonelagem=np.add.reduceat(peso * repeticoes, inicio),
+        e1rm=np.maximum.reduceat(e1rm_epley(peso, repeticoes), inicio),
+        grupo=np.cumsum(novo_exercicio) - 1,
+        inicio_grupo=inicio_grupo,
+    )
+
+def media_movel(valores: np.ndarray, grupo: np.ndarray, inicio_grupo: np.ndarray, janela: int) -> np.ndarray:
+    """Média das últimas `janela` sessões de cada posição, sem cruzar a fronteira entre exercícios."""
+    acumulado = np.r_[0.0, np.cumsum(valores)]
+    posicao = np.arange(valores.size)
+    primeira = np.maximum(posicao - janela + 1, inicio_grupo[grupo])
+    return (acumulado[posicao + 1] - acumulado[primeira]) / (posicao - primeira + 1)
+
+def inclinacao(x: np.ndarray, y: np.ndarray, grupo: np.ndarray, inicio_grupo: np.ndarray) -> np.ndarray:
+    """Inclinação da regressão linear de y em x por exercício (nan com menos de dois pontos distintos)."""
+    contagem = np.diff(np.r_[inicio_grupo, x.size])
+    media_x = np.add.reduceat(x, inicio_grupo) / contagem
+    media_y = np.add.reduceat(y, inicio_grupo) / contagem
+    xc = x - media_x[grupo]
+    yc = y - media_y[grupo]
+    sxx = np.add.reduceat(xc * xc, inicio_grupo)
+    sxy = np.add.reduceat(xc * yc, inicio_grupo)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(sxx > 0, sxy / sxx, np.nan)
+
+def _dias(dia: np.ndarray) -> np.ndarray:
+    return dia.astype(np.int64).astype(np.float64)
+
+def _opcional(valor: float) -> Optional[float]:
+    return None if np.isnan(valor) else round(float(valor), 2)
+
+def progresso_exercicio(series: SeriesColunares, *, exercicio_id: int, janela: int = 4) -> Optional[Dict]:
+    """Série temporal de tonelagem e e1RM de um exercício, com média móvel e tendência semanal."""
+    sessoes = agregar_sessoes(series)
+    grupos = np.flatnonzero(sessoes.exercicio_id[sessoes.inicio_grupo] == exercicio_id)
+    if grupos.size == 0:
+        return None
+    grupo = grupos[0]
+    fim = np.r_[sessoes.inicio_grupo[1:], sessoes.exercicio_id.size]
+    fatia = slice(sessoes.inicio_grupo[grupo], fim[grupo])
+
+    tendencia = inclinacao(_dias(sessoes.dia), sessoes.e1rm, sessoes.grupo, sessoes.inicio_grupo)[grupo] * 7
+    media_e1rm = media_movel(sessoes.e1rm, sessoes.grupo, sessoes.inicio_grupo, janela)
+    media_tonelagem = media_movel(sessoes.tonelagem, sessoes.grupo, sessoes.inicio_grupo, janela)
+
+    pontos = [
+        {
+            "data": dia,
+            "execucao_id": execucao_id,
+            "series": series_,
+            "repeticoes": repeticoes,
+            "tonelagem": round(tonelagem, 2),
+            "e1rm": round(e1rm, 2),
+            "e1rm_media_movel": round(e1rm_medio, 2),
+            "tonelagem_media_movel": round(tonelagem_media, 2),
+        }
+        for dia, execucao_id, series_, repeticoes, tonelagem, e1rm, e1rm_medio, tonelagem_media in zip(
+            sessoes.dia[fatia].tolist(),
+            sessoes.execucao_id[fatia].tolist(),
+            sessoes.series[fatia].tolist(),
+            sessoes.repeticoes[fatia].astype(np.int64).tolist(),
+            sessoes.tonelagem[fatia].tolist(),
+            sessoes.e1rm[fatia].tolist(),
+            media_e1rm[fatia].tolist(),
+            media_tonelagem[fatia].tolist(),
+        )
+    ]
+    return {
+        "exercicio_id": exercicio_id,
+        "sessoes": len(pontos),
+        "tendencia_e1rm_semanal": _opcional(tendencia),
+        "pontos": pontos,
+    }
+
+def resumo_progresso(series: SeriesColunares) -> List[Dict]:
+    """Resumo por exercício: sessões, tonelagem total, e1RM atual/máximo e tendência semanal."""
+    sessoes = agregar_sessoes(series)
+    if sessoes.exercicio_id.size == 0:
+        return []
+
+    inicio = sessoes.inicio_grupo
+    ultimo = np.r_[inicio[1:], sessoes.exercicio_id.size] - 1
+    tendencias = inclinacao(_dias(sessoes.dia), sessoes.e1rm, sessoes.grupo, inicio) * 7
+
+    return [
+        {
+            "exercicio_id": exercicio_id,
+            "sessoes": n_sessoes,
+            "tonelagem_total": round(tonelagem, 2),
+            "e1rm_atual": round(e1rm_atual, 2),
+            "e1rm_maximo": round(e1rm_maximo, 2),
+            "tendencia_e1rm_semanal": _opcional(tendencia),
+        }
+        for exercicio_id, n_sessoes, tonelagem, e1rm_atual, e1rm_maximo, tendencia in zip(
+            sessoes.exercicio_id[inicio].tolist(),
+            (ultimo - inicio + 1).tolist(),
+            np.add.reduceat(sessoes.tonelagem, inicio).tolist(),
+            sessoes.e1rm[ultimo].tolist(),
+            np.maximum.reduceat(sessoes.e1rm, inicio).tolist(),
+            tendencias,
+        )
+    ]
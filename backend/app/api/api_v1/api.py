@@ -1,7 +1,7 @@
 # API router aggregation
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, exercises, workouts, workout_executions, statistics
+from app.api.api_v1.endpoints import auth, users, exercises, workouts, workout_executions, statistics, goals
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -10,3 +10,5 @@ api_router.include_router(exercises.router, prefix="/exercicios", tags=["exercis
 api_router.include_router(workouts.router, prefix="/treinos", tags=["workouts"])
 api_router.include_router(workout_executions.router, prefix="/execucoes", tags=["workout_executions"])
 api_router.include_router(statistics.router, prefix="/estatisticas", tags=["statistics"])
+
+api_router.include_router(goals.router, prefix="/metas", tags=["goals"])
\ No newline at end of file
@@ -1,13 +1,12 @@
 # Authentication endpoints
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app import crud, schemas, models
 from app.api import deps
 from app.core import security
-from app.core.config import settings
-from datetime import timedelta
 
 router = APIRouter()
 
@@ -19,25 +18,24 @@ def ping():
     return {"message": "pong"}
 
 @router.post("/register", response_model=schemas.UserWithToken)
-def register_new_user(
+async def register_new_user(
     *, 
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserCreate
 ):
     """
     Create new user.
+    O hash da senha roda no executor dedicado; as queries no threadpool.
     """
-    user = crud.user.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
-    user = crud.user.create(db, obj_in=user_in)
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
+    senha_hash = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(crud.user.create, db, obj_in=user_in, senha_hash=senha_hash)
+    access_token = await run_in_threadpool(deps.emitir_token, db, user)
     return {
         "id": user.id,
         "nome": user.nome,
@@ -47,28 +45,32 @@ def register_new_user(
     }
 
 @router.post("/login", response_model=schemas.UserWithToken)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(deps.get_db), 
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
+    Hashes com parâmetros antigos (ex.: BCRYPT_ROUNDS alterado) são regravados de forma transparente.
     """
-    user = crud.user.authenticate(
-        db,
-        email=form_data.username, # username is the email in this case
-        password=form_data.password
-    )
+    # username is the email in this case
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=form_data.username)
+    novo_hash = None
+    if user:
+        valida, novo_hash = await security.verify_and_update_password_async(
+            form_data.password, user.senha_hash
+        )
+        if not valida:
+            user = None
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
+    if novo_hash:
+        user = await run_in_threadpool(crud.user.update, db, db_obj=user, obj_in={"senha_hash": novo_hash})
+    access_token = await run_in_threadpool(deps.emitir_token, db, user)
     return {
         "id": user.id,
         "nome": user.nome,
@@ -81,7 +83,7 @@ def login_for_access_token(
     }
 
 @router.post("/test-token", response_model=schemas.User)
-def test_token(current_user: models.User = Depends(deps.get_current_active_user)):
+def test_token(current_user: models.User = Depends(deps.get_current_user_model)):
     """
     Test access token.
     """
@@ -1,6 +1,6 @@
 # Exercise endpoints
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app import crud, models, schemas
@@ -9,11 +9,11 @@ from app.api import deps
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Exercicio, status_code=status.HTTP_201_CREATED)
-def create_exercicio(
+async def create_exercicio(
     *, 
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     exercicio_in: schemas.ExercicioCreate,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: models.User = Depends(deps.get_current_active_user_async)
 ):
     """
     Cria um novo exercício. 
@@ -23,65 +23,114 @@ def create_exercicio(
     # Adiciona o usuario_id ao criar o exercício se não for público ou se for público mas criado por um usuário
     # Se um exercício é global (criado por admin, por exemplo), usuario_id pode ser None.
     # Para este escopo, todos os exercícios criados são associados ao usuário.
-    return crud.exercicio.create_with_owner(db=db, obj_in=exercicio_in, user_id=current_user.id)
+    return await crud.exercicio_async.create_with_owner(db=db, obj_in=exercicio_in, user_id=current_user.id)
 
 @router.get("/", response_model=List[schemas.Exercicio])
-def list_exercicios(
-    db: Session = Depends(deps.get_db),
+async def list_exercicios(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    db_principal: AsyncSession = Depends(deps.get_async_db), # a mesma da autenticação; recarrega o catálogo
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor da página (cabeçalho X-Next-Cursor da resposta anterior)"),
     grupo_muscular: Optional[str] = Query(None, description="Filtrar por grupo muscular"),
     equipamento: Optional[str] = Query(None, description="Filtrar por equipamento"),
     dificuldade: Optional[str] = Query(None, description="Filtrar por dificuldade"),
     nome: Optional[str] = Query(None, description="Buscar por nome (busca parcial)"),
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: models.User = Depends(deps.get_current_active_user_async)
 ):
     """
     Lista exercícios. 
     Retorna exercícios públicos e aqueles criados pelo usuário autenticado.
     Permite filtros por grupo_muscular, equipamento, dificuldade e nome.
+    Os públicos saem do catálogo em memória, já serializado; só os do usuário são consultados.
+    O ETag é o hash do corpo: com If-None-Match igual, responde 304 sem o corpo.
     """
-    exercicios = crud.exercicio.get_multi_filtered(
+    itens = await crud.exercicio_async.listar_catalogo(
         db,
+        db_principal=db_principal,
         user_id=current_user.id,
         skip=skip,
         limit=limit,
         grupo_muscular=grupo_muscular,
         equipamento=equipamento,
         dificuldade=dificuldade,
-        nome=nome
+        nome=nome,
+        cursor=cursor,
     )
-    return exercicios
+    corpo = b"[" + b",".join(item.json for item in itens) + b"]"
+    etag = deps.calcular_etag(corpo)
+    if deps.etag_confere(request, etag):
+        response = deps.nao_modificado(etag)
+    else:
+        response = Response(content=corpo, media_type="application/json")
+        deps.definir_etag(response, etag)
+    deps.definir_proximo_cursor(response, crud.exercicio_async.proximo_cursor(itens, limit=limit))
+    return response
+
+@router.get("/busca", response_model=List[schemas.Exercicio])
+async def buscar_exercicios(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    q: str = Query(..., min_length=1, max_length=100, description="Palavras buscadas em nome, descrição e instruções (por prefixo)"),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: models.User = Depends(deps.get_current_active_user_async)
+):
+    """
+    Busca textual no catálogo (exercícios públicos e do usuário), ordenada por relevância.
+    Cada palavra casa por prefixo ("sup ret" encontra "Supino Reto"); o nome pesa mais que
+    a descrição e as instruções.
+    """
+    return await crud.exercicio_async.buscar(db, user_id=current_user.id, q=q, skip=skip, limit=limit)
+
+@router.patch("/", response_model=schemas.AtualizacaoLote)
+async def update_exercicios_em_lote(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    exercicios_in: schemas.ExercicioUpdateLote,
+    current_user: models.User = Depends(deps.get_current_active_user_async)
+):
+    """
+    Aplica os mesmos campos (ex.: `publico`) a vários exercícios com um único UPDATE.
+    Apenas os exercícios do usuário são alterados; ids de outros usuários são ignorados.
+    """
+    atualizados = await crud.exercicio_async.update_many(
+        db,
+        exercicios_in.ids,
+        exercicios_in.model_dump(exclude_unset=True, exclude={"ids"}),
+        condicoes=(models.Exercicio.usuario_id == current_user.id,),
+    )
+    return {"atualizados": atualizados}
 
 @router.get("/{id}", response_model=schemas.Exercicio)
-def get_exercicio(
+async def get_exercicio(
     *, 
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_read_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: models.User = Depends(deps.get_current_active_user_async)
 ):
     """
     Obtém detalhes de um exercício específico.
     Apenas o criador ou se o exercício for público.
     """
-    exercicio = crud.exercicio.get_public_or_owner(db=db, id=id, user_id=current_user.id)
+    exercicio = await crud.exercicio_async.get_public_or_owner(db=db, id=id, user_id=current_user.id)
     if not exercicio:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercício não encontrado ou acesso negado")
     return exercicio
 
 @router.put("/{id}", response_model=schemas.Exercicio)
-def update_exercicio(
+async def update_exercicio(
     *, 
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     exercicio_in: schemas.ExercicioUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: models.User = Depends(deps.get_current_active_user_async)
 ):
     """
     Atualiza um exercício.
     Apenas o criador do exercício pode atualizá-lo.
     """
-    exercicio = crud.exercicio.get(db=db, id=id)
+    exercicio = await crud.exercicio_async.get(db=db, id=id)
     if not exercicio:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercício não encontrado")
     if exercicio.usuario_id != current_user.id:
@@ -94,26 +143,28 @@ def update_exercicio(
     if "usuario_id" in update_data:
         del update_data["usuario_id"]
         
-    return crud.exercicio.update(db=db, db_obj=exercicio, obj_in=update_data)
+    return await crud.exercicio_async.update(db=db, db_obj=exercicio, obj_in=update_data)
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT) # Alterado response_model e status_code
-def delete_exercicio(
+async def delete_exercicio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: models.User = Depends(deps.get_current_active_user_async)
 ):
     """
     Exclui um exercício.
-    Apenas o criador do exercício pode excluí-lo.
+    Apenas o criador do exercício pode excluí-lo, e só enquanto nenhum treino ou execução o usa.
     """
-    exercicio = crud.exercicio.get(db=db, id=id)
+    exercicio = await crud.exercicio_async.get(db=db, id=id)
     if not exercicio:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exercício não encontrado")
     if exercicio.usuario_id != current_user.id:
         # Adicionar verificação se o exercício é público e se o usuário é admin, se essa lógica for implementada
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Não tem permissão para excluir este exercício")
+    if await crud.exercicio_async.em_uso(db=db, id=id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Exercício em uso em treinos ou execuções")
     
-    crud.exercicio.remove(db=db, id=id)
+    await crud.exercicio_async.remove(db=db, id=id)
     # Nenhum corpo de resposta é retornado para 204
     return # Adicionado para FastAPI entender que não há corpo de resposta
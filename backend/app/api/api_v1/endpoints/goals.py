@@ -0,0 +1,95 @@
+# Goal endpoints (Metas)
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.api import deps
+from app.crud.crud_goal import TIPOS_META
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.Meta, status_code=status.HTTP_201_CREATED)
+def create_meta(
+    *,
+    db: Session = Depends(deps.get_db),
+    meta_in: schemas.MetaCreate,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Cria uma meta (treino, peso ou carga).
+    O progresso inicial é calculado a partir do histórico; depois disso é atualizado a cada execução.
+    """
+    if meta_in.tipo not in TIPOS_META:
+        raise HTTPException(status_code=400, detail=f"Tipo de meta inválido. Use um de: {', '.join(TIPOS_META)}")
+    return crud.meta.create_with_owner(db, obj_in=meta_in, usuario_id=current_user.id)
+
+@router.get("/", response_model=List[schemas.Meta])
+def list_metas(
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
+    ativa: Optional[bool] = Query(None, description="Filtrar por metas ativas/inativas"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor da página (cabeçalho X-Next-Cursor da resposta anterior)"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Lista as metas do usuário com o progresso atual (valor_atual já mantido incrementalmente).
+    """
+    metas = crud.meta.get_multi_by_usuario(
+        db, usuario_id=current_user.id, ativa=ativa, skip=skip, limit=limit, cursor=cursor
+    )
+    deps.definir_proximo_cursor(response, crud.meta.proximo_cursor(metas, limit=limit))
+    return metas
+
+@router.get("/{id}", response_model=schemas.Meta)
+def get_meta(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Obtém uma meta do usuário.
+    """
+    meta = crud.meta.get(db, id=id)
+    if not meta or meta.usuario_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta não encontrada")
+    return meta
+
+@router.put("/{id}", response_model=schemas.Meta)
+def update_meta(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    meta_in: schemas.MetaUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Atualiza uma meta. Alterar o tipo ou as datas recalcula o progresso a partir do histórico.
+    """
+    meta = crud.meta.get(db, id=id)
+    if not meta or meta.usuario_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta não encontrada")
+    update_data = meta_in.model_dump(exclude_unset=True)
+    if "tipo" in update_data and update_data["tipo"] not in TIPOS_META:
+        raise HTTPException(status_code=400, detail=f"Tipo de meta inválido. Use um de: {', '.join(TIPOS_META)}")
+    return crud.meta.update(db, db_obj=meta, obj_in=update_data)
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_meta(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    current_user: models.User = Depends(deps.get_current_active_user),
+):
+    """
+    Exclui uma meta do usuário.
+    """
+    meta = crud.meta.get(db, id=id)
+    if not meta or meta.usuario_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta não encontrada")
+    crud.meta.remove(db, id=id)
+    return
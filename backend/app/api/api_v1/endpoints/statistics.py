@@ -1,6 +1,147 @@
 # Statistics endpoints
-from fastapi import APIRouter
+import calendar
+from datetime import date, datetime, time, timedelta
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app import analytics, crud, models, schemas
+from app.api import deps
 
 router = APIRouter()
 
-# TODO: Implement statistics endpoints based on the report
+@router.get("/volume", response_model=List[schemas.VolumePeriodo])
+def read_training_volume(
+    db: Session = Depends(deps.get_read_db),
+    data_inicio: Optional[date] = Query(None, description="Início do intervalo (padrão: 12 semanas antes de data_fim)"),
+    data_fim: Optional[date] = Query(None, description="Fim do intervalo (padrão: hoje)"),
+    agrupamento: Literal["dia", "semana"] = Query("semana", description="Agrupar por dia ou por semana"),
+    grupo_muscular: Optional[str] = Query(None, description="Filtrar por grupo muscular"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Volume de treino (séries, repetições e tonelagem) por grupo muscular.
+    Lido do rollup diário mantido a cada execução, sem carregar o histórico de séries.
+    """
+    data_fim = data_fim or date.today()
+    data_inicio = data_inicio or data_fim - timedelta(weeks=12)
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="data_inicio deve ser anterior a data_fim")
+    return crud.volume_diario.get_periodo(
+        db,
+        usuario_id=current_user.id,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        agrupamento=agrupamento,
+        grupo_muscular=grupo_muscular,
+    )
+
+@router.get("/recordes", response_model=List[schemas.RecordePessoal])
+def read_personal_records(
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Recordes pessoais (melhor peso e 1RM estimado por Epley/Brzycki) de todos os exercícios do usuário.
+    """
+    return crud.recorde_pessoal.get_multi_by_usuario(db, usuario_id=current_user.id)
+
+@router.get("/recordes/{exercicio_id}", response_model=schemas.RecordePessoal)
+def read_personal_record(
+    exercicio_id: int,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Recorde pessoal de um exercício, lido diretamente do índice (usuario_id, exercicio_id).
+    """
+    recorde = crud.recorde_pessoal.get_by_exercicio(db, usuario_id=current_user.id, exercicio_id=exercicio_id)
+    if not recorde:
+        raise HTTPException(status_code=404, detail="Nenhum recorde registrado para este exercício")
+    return recorde
+
+@router.get("/progresso", response_model=List[schemas.ResumoProgresso])
+def read_progression_summary(
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Resumo de progressão de todos os exercícios do usuário (tonelagem total, e1RM atual/máximo e tendência).
+    """
+    series = analytics.carregar_series(db, usuario_id=current_user.id)
+    return analytics.resumo_progresso(series)
+
+@router.get("/progresso/{exercicio_id}", response_model=schemas.ProgressoExercicio)
+def read_exercise_progression(
+    exercicio_id: int,
+    janela: int = Query(4, ge=1, le=52, description="Número de sessões da média móvel"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Série temporal por sessão de um exercício: tonelagem, e1RM, médias móveis e tendência semanal do e1RM.
+    """
+    series = analytics.carregar_series(db, usuario_id=current_user.id, exercicio_id=exercicio_id)
+    progresso = analytics.progresso_exercicio(series, exercicio_id=exercicio_id, janela=janela)
+    if progresso is None:
+        raise HTTPException(status_code=404, detail="Nenhuma série concluída para este exercício")
+    return progresso
+
+@router.get("/calendario", response_model=schemas.CalendarioTreino)
+def read_training_calendar(
+    ano: Optional[int] = Query(None, ge=1900, le=9999, description="Ano (padrão: ano atual)"),
+    mes: Optional[int] = Query(None, ge=1, le=12, description="Mês (padrão: mês atual)"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Dias treinados no mês e sequências (atual e maior) de dias consecutivos.
+    Lido do índice de dias treinados, sem carregar execuções ou séries.
+    """
+    hoje = date.today()
+    ano = ano or hoje.year
+    mes = mes or hoje.month
+    inicio = date(ano, mes, 1)
+    fim = date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+    dias = crud.dia_treino.get_dias(db, usuario_id=current_user.id, data_inicio=inicio, data_fim=fim)
+    sequencia_atual, maior_sequencia = crud.dia_treino.get_sequencias(db, usuario_id=current_user.id, hoje=hoje)
+    return {
+        "ano": ano,
+        "mes": mes,
+        "dias": [{"dia": dia, "execucoes": execucoes} for dia, execucoes in dias],
+        "sequencia_atual": sequencia_atual,
+        "maior_sequencia": maior_sequencia,
+    }
+
+@router.get("/grupos-musculares", response_model=List[schemas.DistribuicaoGrupo])
+def read_muscle_group_distribution(
+    semanas: int = Query(4, ge=1, le=104, description="Quantidade de semanas até hoje"),
+    agrupamento: Literal["total", "semana", "mes"] = Query("total", description="Agrupar o período por semana ou mês"),
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Séries concluídas por grupo muscular nas últimas N semanas, agregadas diretamente no banco.
+    """
+    fim = datetime.combine(date.today() + timedelta(days=1), time.min)
+    rows = crud.serie.get_distribuicao_grupos(
+        db,
+        usuario_id=current_user.id,
+        data_inicio=fim - timedelta(weeks=semanas),
+        data_fim=fim,
+        agrupamento=agrupamento,
+    )
+    if agrupamento == "total":
+        rows = [(None, *row) for row in rows]
+    return [
+        {
+            "periodo_inicio": periodo_inicio,
+            "grupo_muscular": grupo_muscular,
+            "series": series,
+            "repeticoes": repeticoes,
+            "tonelagem": round(tonelagem, 2),
+        }
+        for periodo_inicio, grupo_muscular, series, repeticoes, tonelagem in rows
+    ]
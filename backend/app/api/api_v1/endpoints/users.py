@@ -1,16 +1,18 @@
 # User endpoints
 from typing import Any, List # Added List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core import security
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.User)
-def create_user(
+async def create_user(
     *, 
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserCreate
@@ -18,13 +20,14 @@ def create_user(
     """
     Create new user.
     """
-    user = crud.user.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud.user.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
-    user = crud.user.create(db, obj_in=user_in)
+    senha_hash = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(crud.user.create, db, obj_in=user_in, senha_hash=senha_hash)
     return user
 
 @router.get("/", response_model=List[schemas.User])
@@ -41,24 +44,43 @@ def read_users(
     return users
 
 @router.get("/me", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(deps.get_current_active_user)) -> Any:
+def read_users_me(request: Request, current_user: models.User = Depends(deps.get_current_user_model)) -> Any:
     """
     Get current user.
+    O usuário vem do cache de autenticação; o ETag é o hash do JSON e If-None-Match igual responde 304.
     """
-    return current_user
+    corpo = schemas.User.model_validate(current_user).model_dump_json().encode()
+    etag = deps.calcular_etag(corpo)
+    if deps.etag_confere(request, etag):
+        return deps.nao_modificado(etag)
+    response = Response(content=corpo, media_type="application/json")
+    deps.definir_etag(response, etag)
+    return response
 
-@router.put("/me", response_model=schemas.User)
-def update_user_me(
+@router.put("/me", response_model=schemas.UserAtualizado)
+async def update_user_me(
     *, 
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    current_user: models.User = Depends(deps.get_current_user_model)
 ) -> Any:
     """
     Update own user.
+    Trocar a senha revoga os tokens sem estado já emitidos (no mesmo commit da senha nova) e a
+    resposta traz em access_token o token que o cliente deve usar dali em diante.
     """
-    user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
-    return user
+    update_data = user_in.model_dump(exclude_unset=True)
+    troca_senha = bool(update_data.get("password"))
+    if troca_senha:
+        update_data["senha_hash"] = await security.get_password_hash_async(update_data.pop("password"))
+    user = await run_in_threadpool(
+        crud.user.update, db, db_obj=current_user, obj_in=update_data, revogar_tokens=troca_senha
+    )
+    resposta = schemas.UserAtualizado.model_validate(user)
+    if troca_senha:
+        resposta.access_token = await run_in_threadpool(deps.emitir_token, db, user)
+        resposta.token_type = "bearer"
+    return resposta
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user_by_id(
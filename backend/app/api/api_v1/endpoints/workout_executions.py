@@ -1,111 +1,118 @@
 # Workout execution endpoints
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.models.workout_execution import ExecucaoTreino
 
 router = APIRouter()
 
 
 @router.post("/start", response_model=schemas.workout_execution.ExecucaoTreino)
-def start_workout_execution(
+async def start_workout_execution(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     start_data: schemas.workout_execution.TreinoExecucaoStart, # Schema para dados de início
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Start a new workout execution (minimal data).
     """
-    treino_fixo = crud.treino_fixo.get(db=db, id=start_data.treino_fixo_id)
+    treino_fixo = await crud.treino_fixo_async.get_simples(db=db, id=start_data.treino_fixo_id)
     if not treino_fixo:
         raise HTTPException(status_code=404, detail=f"Fixed workout with id {start_data.treino_fixo_id} not found")
     # Adicionar verificação de permissão se o treino fixo não pertencer ao usuário (ex: treinos públicos)
     # if treino_fixo.usuario_id != current_user.id and not treino_fixo.publico:
     #     raise HTTPException(status_code=403, detail="Not enough permissions for this fixed workout")
 
-    workout_execution = crud.execucao_treino.start_execution(
+    workout_execution = await crud.execucao_treino_async.start_execution(
         db=db, obj_in=start_data, usuario_id=current_user.id
     )
     return workout_execution
 
 
 @router.post("/", response_model=schemas.workout_execution.ExecucaoTreino)
-def create_full_workout_execution(
+async def create_full_workout_execution(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     workout_execution_in: schemas.workout_execution.ExecucaoTreinoCreate, # Corrigido: TreinoExecucaoCreate -> ExecucaoTreinoCreate
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Create new workout execution with all details (exercises and series).
     Este endpoint pode ser usado se o frontend envia todos os dados de uma vez.
     Alternativamente, o fluxo seria /start e depois / {execucao_id} com PUT.
     """
-    treino_fixo = crud.treino_fixo.get(db=db, id=workout_execution_in.treino_fixo_id)
+    treino_fixo = await crud.treino_fixo_async.get_simples(db=db, id=workout_execution_in.treino_fixo_id)
     if not treino_fixo:
         raise HTTPException(status_code=404, detail=f"TreinoFixo with id {workout_execution_in.treino_fixo_id} not found.")
     # Adicionar verificação de permissão
 
-    workout_execution = crud.execucao_treino.create_with_exercicios(
+    workout_execution = await crud.execucao_treino_async.create_with_exercicios(
         db=db, obj_in=workout_execution_in, usuario_id=current_user.id
     )
     return workout_execution
 
 
 @router.get("/by-workout/{treino_fixo_id}", response_model=List[schemas.workout_execution.ExecucaoTreino])
-def read_workout_executions_by_workout(
+async def read_workout_executions_by_workout(
     treino_fixo_id: int,
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_read_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = Query(None, description="Cursor da página (cabeçalho X-Next-Cursor da resposta anterior)"),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Retrieve workout executions for a specific fixed workout by the current user.
     """
     # Adicionar verificação se o treino_fixo_id existe e se o usuário tem permissão para vê-lo
-    treino_fixo = crud.treino_fixo.get(db=db, id=treino_fixo_id)
+    treino_fixo = await crud.treino_fixo_async.get_simples(db=db, id=treino_fixo_id)
     if not treino_fixo:
         raise HTTPException(status_code=404, detail=f"Fixed workout with id {treino_fixo_id} not found")
     # if treino_fixo.usuario_id != current_user.id and not treino_fixo.publico: # Exemplo de verificação
     #     raise HTTPException(status_code=403, detail="Not allowed to view executions for this workout")
 
-    workout_executions = crud.execucao_treino.get_multi_by_usuario_and_treino_fixo(
-        db=db, usuario_id=current_user.id, treino_fixo_id=treino_fixo_id, skip=skip, limit=limit
+    workout_executions = await crud.execucao_treino_async.get_multi_by_usuario_and_treino_fixo(
+        db=db, usuario_id=current_user.id, treino_fixo_id=treino_fixo_id, skip=skip, limit=limit, cursor=cursor
     )
+    deps.definir_proximo_cursor(response, crud.execucao_treino_async.proximo_cursor(workout_executions, limit=limit))
     return workout_executions
 
 
 @router.get("/", response_model=List[schemas.workout_execution.ExecucaoTreino])
-def read_all_user_workout_executions(
-    db: Session = Depends(deps.get_db),
+async def read_all_user_workout_executions(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_read_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = Query(None, description="Cursor da página (cabeçalho X-Next-Cursor da resposta anterior)"),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Retrieve all workout executions for the current user.
     """
-    workout_executions = crud.execucao_treino.get_multi_by_usuario(
-        db=db, usuario_id=current_user.id, skip=skip, limit=limit
+    workout_executions = await crud.execucao_treino_async.get_multi_by_usuario(
+        db=db, usuario_id=current_user.id, skip=skip, limit=limit, cursor=cursor
     )
+    deps.definir_proximo_cursor(response, crud.execucao_treino_async.proximo_cursor(workout_executions, limit=limit))
     return workout_executions
 
 
 @router.get("/{execucao_id}", response_model=schemas.workout_execution.ExecucaoTreino)
-def read_workout_execution_details(
+async def read_workout_execution_details(
     execucao_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Get a specific workout execution by ID, ensuring it belongs to the current user.
     """
-    workout_execution = crud.execucao_treino.get_full_details(db=db, id=execucao_id, usuario_id=current_user.id)
+    workout_execution = await crud.execucao_treino_async.get_full_details(db=db, id=execucao_id, usuario_id=current_user.id)
     if not workout_execution:
         raise HTTPException(status_code=404, detail="Workout execution not found or not owned by user")
     # A verificação de owner já é feita em get_full_details, mas uma dupla verificação não faz mal.
@@ -115,46 +122,130 @@ def read_workout_execution_details(
 
 
 @router.put("/{execucao_id}", response_model=schemas.workout_execution.ExecucaoTreino)
-def update_workout_execution(
+async def update_workout_execution(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     execucao_id: int,
     workout_execution_in: schemas.workout_execution.ExecucaoTreinoUpdate, # Corrigido: TreinoExecucaoUpdate -> ExecucaoTreinoUpdate
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> Any:
     """
     Update a workout execution (e.g., mark as finished, update series, observations).
     This is intended to be used to finalize the workout and save all performed series.
     """
-    db_obj = crud.execucao_treino.get(db=db, id=execucao_id)
-    if not db_obj:
-        raise HTTPException(status_code=404, detail="Workout execution not found")
-    if db_obj.usuario_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    db_obj = await _execucao_do_usuario(db, execucao_id, current_user.id)
 
     # Usar a função finalizar_treino do CRUD que deve lidar com a lógica de 
     # atualizar/criar séries e exercícios executados.
-    updated_workout_execution = crud.execucao_treino.finalizar_treino(
+    updated_workout_execution = await crud.execucao_treino_async.finalizar_treino(
         db=db, db_obj=db_obj, obj_in=workout_execution_in
     )
     return updated_workout_execution
 
 
+async def _execucao_do_usuario(db: AsyncSession, execucao_id: int, usuario_id: int) -> ExecucaoTreino:
+    """Linha da execução (sem exercícios e séries) após conferir que pertence ao usuário."""
+    db_obj = await crud.execucao_treino_async.get_simples(db=db, id=execucao_id)
+    if not db_obj:
+        raise HTTPException(status_code=404, detail="Workout execution not found")
+    if db_obj.usuario_id != usuario_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return db_obj
+
+
+def _confirmacoes(series: List[Any]) -> List[schemas.SerieConfirmacao]:
+    return [
+        schemas.SerieConfirmacao(
+            id=db_serie.id,
+            exercicio_ordem=exercicio_ordem,
+            ordem=db_serie.ordem,
+            repeticoes=db_serie.repeticoes,
+            peso=db_serie.peso,
+            concluida=db_serie.concluida,
+        )
+        for exercicio_ordem, db_serie in series
+    ]
+
+
+@router.patch("/{execucao_id}/series", response_model=List[schemas.SerieConfirmacao])
+async def patch_workout_execution_series(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    execucao_id: int,
+    series_in: List[schemas.SeriePatchLote],
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update several sets at once, addressed by (exercicio_ordem, ordem). Only the fields sent are changed
+    and only those rows are written; the response acknowledges each set instead of returning the execution.
+    """
+    db_obj = await _execucao_do_usuario(db, execucao_id, current_user.id)
+    alteracoes = [
+        (serie_in.exercicio_ordem, serie_in.ordem, serie_in.model_dump(exclude_unset=True, exclude={"exercicio_ordem", "ordem"}))
+        for serie_in in series_in
+    ]
+    series = await crud.execucao_treino_async.atualizar_series(db=db, db_obj=db_obj, alteracoes=alteracoes)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Set not found in this workout execution")
+    return _confirmacoes(series)
+
+
+@router.patch(
+    "/{execucao_id}/exercicios/{exercicio_ordem}/series/{serie_ordem}",
+    response_model=schemas.SerieConfirmacao,
+)
+async def patch_workout_execution_set(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    execucao_id: int,
+    exercicio_ordem: int,
+    serie_ordem: int,
+    serie_in: schemas.SeriePatch,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a single set (e.g. tick it off during the workout) without re-sending the whole execution.
+    """
+    db_obj = await _execucao_do_usuario(db, execucao_id, current_user.id)
+    series = await crud.execucao_treino_async.atualizar_series(
+        db=db, db_obj=db_obj, alteracoes=[(exercicio_ordem, serie_ordem, serie_in.model_dump(exclude_unset=True))]
+    )
+    if series is None:
+        raise HTTPException(status_code=404, detail="Set not found in this workout execution")
+    return _confirmacoes(series)[0]
+
+
+@router.patch("/{execucao_id}/exercicios/{exercicio_ordem}", response_model=schemas.ExecucaoExercicioConfirmacao)
+async def patch_workout_execution_exercise(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    execucao_id: int,
+    exercicio_ordem: int,
+    exercicio_in: schemas.ExecucaoExercicioPatch,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update the fields of one executed exercise (observations), leaving its sets untouched.
+    """
+    db_obj = await _execucao_do_usuario(db, execucao_id, current_user.id)
+    db_execucao_exercicio = await crud.execucao_treino_async.atualizar_exercicio(
+        db=db, db_obj=db_obj, ordem=exercicio_ordem, obj_in=exercicio_in.model_dump(exclude_unset=True)
+    )
+    if db_execucao_exercicio is None:
+        raise HTTPException(status_code=404, detail="Exercise not found in this workout execution")
+    return db_execucao_exercicio
+
+
 @router.delete("/{execucao_id}", status_code=204)
-def delete_workout_execution(
+async def delete_workout_execution(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     execucao_id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: models.User = Depends(deps.get_current_active_user_async),
 ) -> None:
     """
     Delete a workout execution.
     Only the owner can delete their execution.
     """
-    db_obj = crud.execucao_treino.get(db=db, id=execucao_id)
-    if not db_obj:
-        raise HTTPException(status_code=404, detail="Workout execution not found")
-    if db_obj.usuario_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-
-    crud.execucao_treino.remove(db=db, id=execucao_id)
+    await _execucao_do_usuario(db, execucao_id, current_user.id) # a linha fica na sessão para o remove
+    await crud.execucao_treino_async.remove(db=db, id=execucao_id)
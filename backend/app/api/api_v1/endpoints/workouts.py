@@ -1,48 +1,59 @@
 # Workout endpoints
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from sqlalchemy.orm import Session, selectinload # Adicionado selectinload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging # Adicionado para logging
 
 from app import crud, models, schemas
-from app.crud.crud_workout import treino_fixo, exercicio_treino
+from app.crud.crud_workout import marca_dagua_de, treino_fixo_async, exercicio_treino_async
 from app.schemas.workout import TreinoFixo, TreinoFixoCreate, TreinoFixoUpdate, ExercicioTreino, ExercicioTreinoCreate, ExercicioTreinoUpdate
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import (
+    calcular_etag, definir_etag, definir_proximo_cursor, etag_confere, get_async_db, get_async_read_db,
+    get_current_active_user_async, nao_modificado,
+)
 from app.models.user import User
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TreinoFixo])
-def read_treinos(
+async def read_treinos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    cursor: Optional[str] = Query(None, description="Cursor da página (cabeçalho X-Next-Cursor da resposta anterior)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
     """List all workouts for the current user"""
     # Filtrar treinos pelo usuário atual
-    return treino_fixo.get_multi_by_usuario(
-        db, usuario_id=current_user.id, skip=skip, limit=limit
+    treinos = await treino_fixo_async.get_multi_by_usuario(
+        db, usuario_id=current_user.id, skip=skip, limit=limit, cursor=cursor
     )
+    definir_proximo_cursor(response, treino_fixo_async.proximo_cursor(treinos, limit=limit))
+    return treinos
 
 @router.get("/{treino_id}", response_model=schemas.TreinoFixo)
-def read_treino(
+async def read_treino(
     treino_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
-    """Get a workout by ID"""
-    # Modificado para usar eager loading para carregar os detalhes do exercício
-    db_obj = (
-        db.query(models.TreinoFixo)
-        .options(
-            selectinload(models.TreinoFixo.exercicios_treino)  # Carrega a lista de ExercicioTreino
-            .selectinload(models.ExercicioTreino.exercicio)   # Para cada ExercicioTreino, carrega o Exercicio relacionado
-        )
-        .filter(models.TreinoFixo.id == treino_id)
-        .filter(models.TreinoFixo.usuario_id == current_user.id) # Garantir que o treino pertence ao usuário
-        .first()
-    )
+    """
+    Get a workout by ID.
+    Com If-None-Match, um treino inalterado responde 304 depois de uma única consulta de
+    agregados (marca d'água), sem carregar os exercícios.
+    """
+    if request.headers.get("if-none-match"):
+        marca = await treino_fixo_async.marca_dagua(db, id=treino_id, usuario_id=current_user.id)
+        if marca is not None:
+            etag = calcular_etag(treino_id, *marca)
+            if etag_confere(request, etag):
+                return nao_modificado(etag)
+
+    # Eager loading dos exercícios do treino e seus detalhes (ver CRUDTreinoFixoAsync.carregar)
+    db_obj = await treino_fixo_async.get_by_usuario(db, id=treino_id, usuario_id=current_user.id)
     
     # Log para depuração
     logging.warning(f"--- Detalhes do Treino Buscado (ID: {treino_id}) ---")
@@ -60,32 +71,33 @@ def read_treino(
             else:
                 logging.warning(f"    Exercicio Detalhes: Não carregado ou Nulo")
     logging.warning("--- Fim dos Detalhes do Treino Buscado ---")
+    definir_etag(response, calcular_etag(treino_id, *marca_dagua_de(db_obj)))
 
     return db_obj
 
 @router.post("/", response_model=TreinoFixo)
-def create_treino(
+async def create_treino(
     treino_in: TreinoFixoCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
     """Create a new workout"""
     # Criar objeto para passar para o CRUD
-    db_obj = treino_fixo.create(
+    db_obj = await treino_fixo_async.create(
         db, 
         obj_in={"usuario_id": current_user.id, **treino_in.model_dump()}
     )
     return db_obj
 
 @router.put("/{treino_id}", response_model=TreinoFixo)
-def update_treino(
+async def update_treino(
     treino_id: int,
     treino_in: TreinoFixoUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
     """Update an existing workout"""
-    db_obj = treino_fixo.get(db, id=treino_id)
+    db_obj = await treino_fixo_async.get(db, id=treino_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Treino não encontrado")
     
@@ -93,16 +105,17 @@ def update_treino(
     if db_obj.usuario_id != current_user.id:
         raise HTTPException(status_code=403, detail="Acesso não permitido a este treino")
         
-    return treino_fixo.update(db, db_obj=db_obj, obj_in=treino_in)
+    return await treino_fixo_async.update(db, db_obj=db_obj, obj_in=treino_in)
 
 @router.delete("/{treino_id}", response_model=TreinoFixo)
-def delete_treino(
+async def delete_treino(
     treino_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
-    """Delete a workout"""
-    db_obj = treino_fixo.get(db, id=treino_id)
+    """Delete a workout (responde após a exclusão lógica; execuções e séries são purgadas em segundo plano)"""
+    db_obj = await treino_fixo_async.get(db, id=treino_id)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Treino não encontrado")
     
@@ -110,18 +123,20 @@ def delete_treino(
     if db_obj.usuario_id != current_user.id:
         raise HTTPException(status_code=403, detail="Acesso não permitido a este treino")
         
-    return treino_fixo.remove(db, id=treino_id)
+    db_obj = await treino_fixo_async.excluir(db, db_obj=db_obj)
+    background_tasks.add_task(treino_fixo_async.purgar, db.bind, treino_id)
+    return db_obj
 
 # Endpoints para gerenciar exercícios dentro dos treinos
 @router.post("/{treino_id}/exercicios", response_model=ExercicioTreino)
-def add_exercicio_to_treino(
+async def add_exercicio_to_treino(
     treino_id: int,
     exercicio_in: ExercicioTreinoCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
     """Adicionar exercício a um treino"""
-    treino = treino_fixo.get(db, id=treino_id)
+    treino = await treino_fixo_async.get_simples(db, id=treino_id)
     if not treino:
         raise HTTPException(status_code=404, detail="Treino não encontrado")
     
@@ -130,26 +145,26 @@ def add_exercicio_to_treino(
         raise HTTPException(status_code=403, detail="Acesso não permitido a este treino")
     
     # Verificar se o exercício existe
-    exercicio = db.query(models.Exercicio).get(exercicio_in.exercicio_id)
+    exercicio = await db.get(models.Exercicio, exercicio_in.exercicio_id)
     if not exercicio:
         raise HTTPException(status_code=404, detail="Exercício não encontrado")
     
     # Criar o exercício no treino
-    return exercicio_treino.create(db, obj_in={
+    return await exercicio_treino_async.create(db, obj_in={
         "treino_fixo_id": treino_id,
         **exercicio_in.model_dump()
     })
 
 @router.put("/{treino_id}/exercicios/{exercicio_treino_id}", response_model=ExercicioTreino)
-def update_exercicio_in_treino(
+async def update_exercicio_in_treino(
     treino_id: int,
     exercicio_treino_id: int,
     exercicio_in: ExercicioTreinoUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
     """Atualizar informações de um exercício em um treino"""
-    treino = treino_fixo.get(db, id=treino_id)
+    treino = await treino_fixo_async.get_simples(db, id=treino_id)
     if not treino:
         raise HTTPException(status_code=404, detail="Treino não encontrado")
     
@@ -158,7 +173,7 @@ def update_exercicio_in_treino(
         raise HTTPException(status_code=403, detail="Acesso não permitido a este treino")
     
     # Buscar o exercício no treino
-    ex_treino = exercicio_treino.get(db, id=exercicio_treino_id)
+    ex_treino = await exercicio_treino_async.get(db, id=exercicio_treino_id)
     if not ex_treino:
         raise HTTPException(status_code=404, detail="Exercício não encontrado no treino")
     
@@ -166,17 +181,17 @@ def update_exercicio_in_treino(
         raise HTTPException(status_code=400, detail="Este exercício não pertence ao treino informado")
     
     # Atualizar
-    return exercicio_treino.update(db, db_obj=ex_treino, obj_in=exercicio_in)
+    return await exercicio_treino_async.update(db, db_obj=ex_treino, obj_in=exercicio_in)
 
 @router.delete("/{treino_id}/exercicios/{exercicio_treino_id}", response_model=ExercicioTreino)
-def remove_exercicio_from_treino(
+async def remove_exercicio_from_treino(
     treino_id: int,
     exercicio_treino_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
 ):
     """Remover exercício de um treino"""
-    treino = treino_fixo.get(db, id=treino_id)
+    treino = await treino_fixo_async.get_simples(db, id=treino_id)
     if not treino:
         raise HTTPException(status_code=404, detail="Treino não encontrado")
     
@@ -185,12 +200,7 @@ def remove_exercicio_from_treino(
         raise HTTPException(status_code=403, detail="Acesso não permitido a este treino")
     
     # Buscar o exercício no treino com o relacionamento 'exercicio' pré-carregado
-    ex_treino = (
-        db.query(models.ExercicioTreino)
-        .options(selectinload(models.ExercicioTreino.exercicio))
-        .filter(models.ExercicioTreino.id == exercicio_treino_id)
-        .first()
-    )
+    ex_treino = await exercicio_treino_async.get(db, id=exercicio_treino_id)
     
     if not ex_treino:
         raise HTTPException(status_code=404, detail="Exercício não encontrado no treino")
@@ -199,6 +209,6 @@ def remove_exercicio_from_treino(
         raise HTTPException(status_code=400, detail="Este exercício não pertence ao treino informado")
     
     # Remover
-    exercicio_treino.remove(db, id=exercicio_treino_id)
+    await exercicio_treino_async.remove(db, id=exercicio_treino_id)
     # Retornar o objeto como estava antes da remoção (com 'exercicio' carregado)
     return ex_treino
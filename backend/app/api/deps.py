@@ -1,15 +1,19 @@
 # Dependencies for API endpoints
-from typing import Generator, Optional
+import hashlib
+from datetime import timedelta
+from typing import Any, AsyncGenerator, Dict, Generator, Optional, Tuple, Union
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
+from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -22,33 +26,154 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Sessões da réplica de leitura (READ_DATABASE_URL), apenas para endpoints GET sem escrita.
+# A réplica pode estar atrasada em relação ao principal: respostas de escrita continuam
+# sendo montadas a partir da sessão principal.
+def get_read_db() -> Generator:
+    try:
+        db = ReadSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+def definir_proximo_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Publica o cursor da página seguinte no cabeçalho X-Next-Cursor (ausente na última página)."""
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+
+# Respostas GET condicionais (ETag / If-None-Match). As respostas são por usuário: o cliente
+# guarda em cache privado e sempre revalida.
+CACHE_CONTROL_REVALIDAR = "private, no-cache"
+
+def calcular_etag(*partes: Any) -> str:
+    """ETag fraco a partir de uma marca d'água (valores como data_atualizacao) ou do corpo (bytes)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        digest.update(parte if isinstance(parte, bytes) else repr(parte).encode())
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()}"'
+
+def etag_confere(request: Request, etag: str) -> bool:
+    """If-None-Match da requisição casa com `etag` (comparação fraca, RFC 9110 13.1.2)."""
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    return any(candidato.strip().removeprefix("W/") == etag.removeprefix("W/") for candidato in cabecalho.split(","))
+
+def definir_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL_REVALIDAR
+
+def nao_modificado(etag: str) -> Response:
+    """304 sem corpo, com o mesmo ETag."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    definir_etag(response, etag)
+    return response
+
 # Simplify token decoding and user retrieval
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> models.User:
-    credentials_exception = HTTPException(
+def emitir_token(db: Session, user: models.User) -> str:
+    """Access token do usuário; no modo STATELESS_TOKENS inclui o retrato do usuário e a versão."""
+    data = {"sub": str(user.id)}
+    if settings.STATELESS_TOKENS:
+        data.update(
+            nome=user.nome,
+            email=user.email,
+            ver=crud.user.get_token_version(db, usuario_id=user.id),
+        )
+    return security.create_access_token(
+        data=data, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+def _credenciais_invalidas() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _ler_token(token: str) -> Tuple[int, Dict[str, Any]]:
+    """Id do usuário e payload do token; credenciais inválidas viram 403."""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         sub = payload.get("sub")
         if sub is None:
-            raise credentials_exception
-        user_id = int(sub)
+            raise _credenciais_invalidas()
+        return int(sub), payload
     except Exception:
-        raise credentials_exception
-    user = crud.user.get(db, id=user_id)
+        raise _credenciais_invalidas()
+
+def _usuario_do_token(user_id: int, payload: Dict[str, Any], versao_atual: int) -> schemas.TokenUser:
+    if payload["ver"] < versao_atual:
+        raise _credenciais_invalidas()
+    return schemas.TokenUser(
+        id=user_id, nome=payload["nome"], email=payload["email"], token_version=payload["ver"]
+    )
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+) -> Union[models.User, schemas.TokenUser]:
+    """
+    Usuário autenticado. No modo STATELESS_TOKENS, tokens que carregam "ver" viram um
+    schemas.TokenUser sem nenhuma query (a versão é conferida no mapa em memória);
+    caso contrário o usuário é carregado (via cache) do banco.
+    """
+    user_id, payload = _ler_token(token)
+    if settings.STATELESS_TOKENS and "ver" in payload:
+        return _usuario_do_token(user_id, payload, crud.user.get_token_version(db, usuario_id=user_id))
+    user = crud.user.get_cached(db, id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: Union[models.User, schemas.TokenUser] = Depends(get_current_user),
+) -> Union[models.User, schemas.TokenUser]:
     # if not crud.user.is_active(current_user):
     #     raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+# Mesma autenticação para os routers assíncronos: roda no event loop, sobre a AsyncSession do
+# endpoint (get_async_db é resolvido uma vez por requisição), sem ocupar o threadpool.
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
+) -> Union[models.User, schemas.TokenUser]:
+    user_id, payload = _ler_token(token)
+    if settings.STATELESS_TOKENS and "ver" in payload:
+        versao = await crud.user_async.get_token_version(db, usuario_id=user_id)
+        return _usuario_do_token(user_id, payload, versao)
+    user = await crud.user_async.get_cached(db, id=user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+async def get_current_active_user_async(
+    current_user: Union[models.User, schemas.TokenUser] = Depends(get_current_user_async),
+) -> Union[models.User, schemas.TokenUser]:
+    return current_user
+
+def get_current_user_model(
+    db: Session = Depends(get_db),
+    current_user: Union[models.User, schemas.TokenUser] = Depends(get_current_active_user),
+) -> models.User:
+    """
+    Registro ORM completo do usuário autenticado, para endpoints que precisam de mais que o id.
+    Com tokens sem estado, é carregado apenas aqui.
+    """
+    if isinstance(current_user, models.User):
+        return current_user
+    user = crud.user.get_cached(db, id=current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
@@ -0,0 +1,146 @@
+# In-process caches
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+class TTLCache:
+    """
+    Cache LRU com expiração por tempo, seguro entre threads.
+    Guarda apenas valores imutáveis/copiáveis (nunca objetos ligados a uma Session).
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._dados: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._dados.get(key)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > time.monotonic():
+                    self._dados.move_to_end(key)
+                    self.hits += 1
+                    return valor
+                del self._dados[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, valor: Any) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._dados[key] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(key)
+            while len(self._dados) > self.maxsize:
+                self._dados.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._dados.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dados.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._dados)}
+
+class VersionMap:
+    """
+    Mapa pequeno usuario_id -> versão do token, recarregado por completo a cada `ttl` segundos
+    para que revogações feitas por outros processos sejam vistas com atraso limitado.
+    """
+
+    def __init__(self, *, ttl: float):
+        self.ttl = ttl
+        self._versoes: Dict[int, int] = {}
+        self._expira_em = 0.0
+        self._lock = threading.Lock()
+
+    def expirado(self) -> bool:
+        return time.monotonic() >= self._expira_em
+
+    def carregar(self, versoes: Dict[int, int]) -> None:
+        with self._lock:
+            self._versoes = dict(versoes)
+            self._expira_em = time.monotonic() + self.ttl
+
+    def get(self, usuario_id: int) -> int:
+        return self._versoes.get(usuario_id, 0)
+
+    def set(self, usuario_id: int, versao: int) -> None:
+        with self._lock:
+            self._versoes[usuario_id] = versao
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versoes = {}
+            self._expira_em = 0.0
+
+class CacheVersionado:
+    """
+    Um único valor, válido enquanto a versão e a marca d'água não mudarem. Escritas deste
+    processo chamam invalidar() (a versão sobe); escritas de outros processos mudam a marca
+    d'água, lida do banco pelo chamador a cada get (uma consulta barata de agregados). O
+    valor também expira a cada `ttl` segundos (0 desativa o cache).
+    """
+
+    def __init__(self, *, ttl: float):
+        self.ttl = ttl
+        self.versao = 0
+        self.marca: Any = None
+        self._valor: Any = None
+        self._versao_valor = -1
+        self._expira_em = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, marca: Any) -> Optional[Any]:
+        """O valor guardado, se ainda for da versão atual e da `marca` d'água lida agora."""
+        with self._lock:
+            if self._versao_valor == self.versao and self.marca == marca and time.monotonic() < self._expira_em:
+                return self._valor
+            return None
+
+    def set(self, valor: Any, versao: int, marca: Any) -> None:
+        """
+        Guarda `valor` lido na `versao` informada, depois de ler a `marca`; descarta se houve
+        escrita deste processo durante a leitura. Uma escrita de outro processo entre a marca e
+        a leitura só faz o próximo get recarregar.
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if versao == self.versao:
+                self._valor = valor
+                self._versao_valor = versao
+                self.marca = marca
+                self._expira_em = time.monotonic() + self.ttl
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self.versao += 1
+            self._valor = None
+            self.marca = None
+
+    def clear(self) -> None:
+        self.invalidar()
+
+# Usuários autenticados por id, consultados a cada request em deps.get_current_user
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Versões de token por usuário, conferidas em deps.get_current_user no modo STATELESS_TOKENS
+token_versions = VersionMap(ttl=settings.TOKEN_VERSION_REFRESH_SECONDS)
+
+# Catálogo de exercícios públicos serializado, servido por GET /exercicios/ (crud_exercise)
+catalogo_publico = CacheVersionado(ttl=settings.CATALOGO_CACHE_TTL_SECONDS)
@@ -13,11 +13,53 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60 * 24 * 1))
 
+    # Tokens sem estado: o JWT carrega id, nome, email e a versão do token, e
+    # get_current_user não consulta o banco (revogação via versao_token)
+    STATELESS_TOKENS: bool = os.getenv("STATELESS_TOKENS", "false").lower() in ("1", "true", "yes")
+    TOKEN_VERSION_REFRESH_SECONDS: int = int(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", 30))
+
     # Database
     SQLALCHEMY_DATABASE_URI: str = os.getenv("DATABASE_URL", "sqlite:///./fittracker.db") # Alterado para ler DATABASE_URL diretamente
+    # Réplica somente leitura usada pelos GETs (histórico, catálogo, treinos); vazio usa o banco principal
+    READ_DATABASE_URI: Optional[str] = os.getenv("READ_DATABASE_URL") or None
+
+    # Na inicialização a aplicação só confere a versão do esquema (migrações: python migrate.py)
+    CHECK_SCHEMA_VERSION: bool = os.getenv("CHECK_SCHEMA_VERSION", "true").lower() in ("1", "true", "yes")
+
+    # Pool de conexões. DB_POOL_CLASS vazio escolhe pelo backend (ver db/session.py)
+    DB_POOL_CLASS: str = os.getenv("DB_POOL_CLASS", "") # queue, null ou static
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800)) # segundos; substitui o pre-ping em servidores
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+
+    # Pragmas aplicados a cada nova conexão SQLite
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL") # leitores não bloqueiam o escritor
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)) # bytes
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", -64000)) # negativo = KiB
+    SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+    # Instrumentação de SQL por requisição (app/db/instrumentacao.py): cabeçalhos X-DB-* nas
+    # respostas (só para depuração) e aviso no log quando um statement se repete mais que o limite
+    SQL_DEBUG_HEADERS: bool = os.getenv("SQL_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+    SQL_REPETICOES_ALERTA: int = int(os.getenv("SQL_REPETICOES_ALERTA", 10)) # 0 desativa
 
     PROJECT_NAME: str = "FitTracker API"
 
+    # Hashing de senhas (bcrypt) em executor dedicado
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 32)) # além disso responde 503
+
+    # Cache em memória dos usuários autenticados (TTL 0 desativa)
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", 1024))
+
+    # Catálogo público de exercícios em memória; recarregado quando a marca d'água muda ou a cada TTL (0 desativa)
+    CATALOGO_CACHE_TTL_SECONDS: int = int(os.getenv("CATALOGO_CACHE_TTL_SECONDS", 300))
+
     class Config:
         case_sensitive = True
         env_file = ".env"
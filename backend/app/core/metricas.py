@@ -0,0 +1,290 @@
+# Métricas no formato de exposição do Prometheus
+"""
+Latência por rota (histograma), respostas por status, requisições em andamento e estatísticas
+dos pools de conexão, servidas como texto em /metrics. Sem dependências externas: o registro é
+montado uma vez por rota e cada requisição só incrementa contadores já alocados. Os percentis
+(p95/p99) saem de histogram_quantile no Prometheus; a exposição também traz uma estimativa
+calculada pelos buckets para quem lê o endpoint direto.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PREFIXO = "fittracker"
+
+# Limites superiores dos buckets, em segundos
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_ESPERA_POOL = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+QUANTIS = (0.5, 0.95, 0.99)
+
+ROTA_NAO_ROTEADA = "nao_roteada" # 404 e afins: um único rótulo em vez de um por caminho
+
+def _formatar(valor: float) -> str:
+    return "+Inf" if valor == float("inf") else repr(float(valor))
+
+class Histograma:
+    """Buckets fixos e pré-alocados; observar() não aloca nada."""
+
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: Sequence[float]) -> None:
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1) # o último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def acumulados(self) -> List[Tuple[float, int]]:
+        acumulado, linhas = 0, []
+        for limite, contagem in zip(self.limites + (float("inf"),), self.contagens):
+            acumulado += contagem
+            linhas.append((limite, acumulado))
+        return linhas
+
+    def quantil(self, q: float) -> Optional[float]:
+        """Estimativa por interpolação linear dentro do bucket, como o histogram_quantile."""
+        if not self.total:
+            return None
+        alvo = q * self.total
+        anterior_limite, anterior_acumulado = 0.0, 0
+        for limite, acumulado in self.acumulados():
+            if acumulado >= alvo:
+                if limite == float("inf"):
+                    return anterior_limite
+                no_bucket = acumulado - anterior_acumulado
+                return anterior_limite + (limite - anterior_limite) * (alvo - anterior_acumulado) / no_bucket
+            anterior_limite, anterior_acumulado = limite, acumulado
+        return anterior_limite
+
+class MetricasRota:
+    __slots__ = ("rotulos", "latencia", "status")
+
+    def __init__(self, metodo: str, rota: str) -> None:
+        self.rotulos = f'method="{metodo}",route="{rota}"' # formatado uma vez, reaproveitado na exposição
+        self.latencia = Histograma(BUCKETS_LATENCIA)
+        self.status: Dict[int, int] = {}
+
+class MetricasPool:
+    """Contadores de um pool de conexões, alimentados pelos eventos do pool e por PoolMedido."""
+
+    def __init__(self, nome: str) -> None:
+        self.nome = nome
+        self.engine: Optional[Engine] = None
+        self.checkouts = 0
+        self.checkins = 0
+        self.conexoes_abertas = 0
+        self.timeouts = 0
+        self.espera = Histograma(BUCKETS_ESPERA_POOL)
+        self._lock = threading.Lock() # eventos chegam das threads do threadpool
+
+    def registrar_espera(self, segundos: float, *, timeout: bool) -> None:
+        with self._lock:
+            self.espera.observar(segundos)
+            self.timeouts += timeout
+
+    def _contar(self, atributo: str) -> None:
+        with self._lock:
+            setattr(self, atributo, getattr(self, atributo) + 1)
+
+    def ligar(self, engine: Engine) -> None:
+        """Eventos no pool do engine (síncrono); o recreate() do dispose herda os listeners."""
+        self.engine = engine
+        event.listen(engine.pool, "checkout", lambda *args: self._contar("checkouts"))
+        event.listen(engine.pool, "checkin", lambda *args: self._contar("checkins"))
+        event.listen(engine.pool, "connect", lambda *args: self._contar("conexoes_abertas"))
+
+    def em_uso(self) -> int:
+        checkedout = getattr(self.engine.pool, "checkedout", None) if self.engine is not None else None
+        return checkedout() if callable(checkedout) else self.checkouts - self.checkins
+
+    def tamanho(self) -> Optional[int]:
+        size = getattr(self.engine.pool, "size", None) if self.engine is not None else None
+        return size() if callable(size) else None
+
+class RegistroMetricas:
+    def __init__(self) -> None:
+        self.em_andamento = 0
+        self._rotas: Dict[str, Dict[str, MetricasRota]] = {} # rota -> método -> métricas
+        self._modelos: Dict[int, str] = {}                   # id da rota (vive com o app) -> caminho completo
+        self.pools: Dict[str, MetricasPool] = {}
+        self._lock = threading.Lock()
+
+    def rota(self, metodo: str, modelo: str) -> MetricasRota:
+        por_metodo = self._rotas.get(modelo)
+        metricas = por_metodo.get(metodo) if por_metodo is not None else None
+        if metricas is None:
+            with self._lock:
+                metricas = self._rotas.setdefault(modelo, {}).setdefault(metodo, MetricasRota(metodo, modelo))
+        return metricas
+
+    def modelo_rota(self, scope: Scope) -> str:
+        """
+        Caminho da rota com os parâmetros ({id}), não o caminho da requisição, para que cada
+        endpoint seja uma série só. A rota do scope pode ser relativa ao prefixo do include_router;
+        o prefixo (sem parâmetros) são os segmentos iniciais do caminho requisitado.
+        """
+        rota = scope.get("route")
+        if rota is None:
+            return ROTA_NAO_ROTEADA
+        modelo = self._modelos.get(id(rota))
+        if modelo is None:
+            relativo = rota.path
+            segmentos = scope["path"].split("/")
+            prefixo = "/".join(segmentos[: len(segmentos) - len(relativo.split("/")) + 1])
+            modelo = self._modelos.setdefault(id(rota), prefixo + relativo)
+        return modelo
+
+    def pool(self, nome: str) -> MetricasPool:
+        with self._lock:
+            return self.pools.setdefault(nome, MetricasPool(nome))
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._rotas.clear()
+            self.em_andamento = 0
+
+    def exposicao(self) -> str:
+        """Texto no formato de exposição 0.0.4 do Prometheus."""
+        linhas: List[str] = []
+
+        def familia(nome: str, tipo: str, ajuda: str) -> str:
+            nome = f"{PREFIXO}_{nome}"
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            return nome
+
+        def histograma(nome: str, rotulos: str, h: Histograma) -> None:
+            separador = "," if rotulos else ""
+            for limite, acumulado in h.acumulados():
+                linhas.append(f'{nome}_bucket{{{rotulos}{separador}le="{_formatar(limite)}"}} {acumulado}')
+            chaves = f"{{{rotulos}}}" if rotulos else ""
+            linhas.append(f"{nome}_sum{chaves} {_formatar(h.soma)}")
+            linhas.append(f"{nome}_count{chaves} {h.total}")
+
+        rotas = [m for por_metodo in list(self._rotas.values()) for m in list(por_metodo.values())]
+
+        nome = familia("http_requests_in_flight", "gauge", "Requisições HTTP em andamento.")
+        linhas.append(f"{nome} {self.em_andamento}")
+
+        nome = familia("http_request_duration_seconds", "histogram", "Latência das requisições HTTP por rota.")
+        for m in rotas:
+            histograma(nome, m.rotulos, m.latencia)
+
+        nome = familia("http_request_duration_quantile_seconds", "gauge",
+                       "Percentis estimados pelos buckets do histograma (desde o início do processo).")
+        for m in rotas:
+            for q in QUANTIS:
+                valor = m.latencia.quantil(q)
+                if valor is not None:
+                    linhas.append(f'{nome}{{{m.rotulos},quantile="{q}"}} {_formatar(valor)}')
+
+        nome = familia("http_responses_total", "counter", "Respostas HTTP por rota e status.")
+        for m in rotas:
+            for status, total in sorted(m.status.items()):
+                linhas.append(f'{nome}{{{m.rotulos},status="{status}"}} {total}')
+
+        pools = list(self.pools.values())
+        for chave, tipo, ajuda in (
+            ("checkouts", "counter", "Conexões retiradas do pool."),
+            ("checkins", "counter", "Conexões devolvidas ao pool."),
+            ("conexoes_abertas", "counter", "Conexões novas abertas com o banco."),
+            ("timeouts", "counter", "Esperas por conexão que estouraram o timeout do pool."),
+        ):
+            nome = familia(f"db_pool_{_NOMES_POOL[chave]}_total", tipo, ajuda)
+            for p in pools:
+                linhas.append(f'{nome}{{pool="{p.nome}"}} {getattr(p, chave)}')
+
+        nome = familia("db_pool_checked_out", "gauge", "Conexões em uso no momento.")
+        for p in pools:
+            linhas.append(f'{nome}{{pool="{p.nome}"}} {p.em_uso()}')
+
+        nome = familia("db_pool_size", "gauge", "Tamanho configurado do pool (sem o overflow).")
+        for p in pools:
+            tamanho = p.tamanho()
+            if tamanho is not None:
+                linhas.append(f'{nome}{{pool="{p.nome}"}} {tamanho}')
+
+        nome = familia("db_pool_wait_seconds", "histogram", "Tempo até obter uma conexão do pool.")
+        for p in pools:
+            histograma(nome, f'pool="{p.nome}"', p.espera)
+
+        return "\n".join(linhas) + "\n"
+
+_NOMES_POOL = {
+    "checkouts": "checkouts",
+    "checkins": "checkins",
+    "conexoes_abertas": "connections_opened",
+    "timeouts": "timeouts",
+}
+
+metricas = RegistroMetricas()
+
+class PoolMedido:
+    """
+    Mixin de pool que mede a espera em connect() (fila do pool mais a abertura de uma conexão
+    nova). Usado via pool_medido(); o recreate() do pool (dispose) preserva a classe.
+    """
+    metricas_pool: MetricasPool
+
+    def connect(self):
+        inicio = time.perf_counter()
+        timeout = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timeout = True
+            raise
+        finally:
+            self.metricas_pool.registrar_espera(time.perf_counter() - inicio, timeout=timeout)
+
+_classes_medidas: Dict[Tuple[str, Type[Pool]], Type[Pool]] = {}
+
+def pool_medido(nome: str, poolclass: Type[Pool]) -> Type[Pool]:
+    """Subclasse de `poolclass` que registra as esperas de connect() nas métricas do pool `nome`."""
+    chave = (nome, poolclass)
+    if chave not in _classes_medidas:
+        _classes_medidas[chave] = type(
+            f"{poolclass.__name__}Medido", (PoolMedido, poolclass), {"metricas_pool": metricas.pool(nome)}
+        )
+    return _classes_medidas[chave]
+
+class MetricasHTTPMiddleware:
+    """Latência, status e requisições em andamento de cada requisição HTTP."""
+
+    def __init__(self, app: ASGIApp, *, registro: RegistroMetricas = metricas) -> None:
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registro = self.registro
+        status = 500 # se a aplicação falhar antes de responder
+        inicio = time.perf_counter()
+        registro.em_andamento += 1
+
+        async def enviar(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            registro.em_andamento -= 1
+            rota = registro.rota(scope["method"], registro.modelo_rota(scope))
+            rota.latencia.observar(time.perf_counter() - inicio)
+            rota.status[status] = rota.status.get(status, 0) + 1
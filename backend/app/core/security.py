@@ -1,13 +1,17 @@
 # Security utilities (passwords, JWT)
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Callable, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 ALGORITHM = settings.ALGORITHM
 
@@ -28,3 +32,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+class PasswordHasherBusy(Exception):
+    """A fila do executor de senhas está cheia; a requisição deve ser recusada com 503."""
+
+class PasswordHasher:
+    """
+    Executor dedicado e limitado para o bcrypt, para que picos de login não ocupem o
+    threadpool que atende os demais endpoints. Acima de `workers + max_queue` tarefas
+    pendentes as novas são recusadas com PasswordHasherBusy.
+    """
+
+    def __init__(self, *, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.max_pending = workers + max_queue
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS, max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha no executor dedicado. Quando o hash usa parâmetros antigos (ex.: outro
+    BCRYPT_ROUNDS), devolve também o novo hash para ser gravado (needs_update do passlib).
+    """
+    return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
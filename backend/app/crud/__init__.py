@@ -1,8 +1,9 @@
-from .crud_user import user
-from .crud_exercise import exercicio
-from .crud_workout import treino_fixo, exercicio_treino
-from .crud_workout_execution import execucao_treino, execucao_exercicio, serie
-# from .crud_goal import meta
+from .crud_user import user, user_async
+from .crud_exercise import exercicio, exercicio_async
+from .crud_workout import treino_fixo, exercicio_treino, treino_fixo_async, exercicio_treino_async
+from .crud_workout_execution import execucao_treino, execucao_exercicio, serie, execucao_treino_async
+from .crud_statistics import volume_diario, recorde_pessoal, dia_treino
+from .crud_goal import meta
 
 # For a new basic set of CRUD operations you could just do
 
@@ -1,9 +1,17 @@
 # Base CRUD operations
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import Select, Update, inspect, select, tuple_, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db.base_class import Base
 
@@ -11,7 +19,102 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
-class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+@lru_cache(maxsize=None)
+def colunas_do_modelo(model: Type[Base]) -> Tuple[str, ...]:
+    """Atributos de coluna do modelo (sem relacionamentos), calculados uma vez por classe."""
+    return tuple(attr.key for attr in inspect(model).column_attrs)
+
+def valores_update(model: Type[Base], obj_in: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+    """Campos do update que são colunas do modelo (Pydantic: só os enviados)."""
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True) # Pydantic V2
+    colunas = colunas_do_modelo(model)
+    return {campo: valor for campo, valor in update_data.items() if campo in colunas}
+
+def update_returning(model: Type[Base], id: Any, valores: Dict[str, Any]) -> Update:
+    """UPDATE de uma linha devolvendo todas as colunas (inclusive onupdate como data_atualizacao)."""
+    return (
+        update(model)
+        .where(model.id == id)
+        .values(**valores)
+        .returning(*(getattr(model, coluna) for coluna in colunas_do_modelo(model)))
+        .execution_options(synchronize_session=False)
+    )
+
+def aplicar_linha(db_obj: Base, linha: Row) -> None:
+    """Carrega no objeto os valores devolvidos pelo RETURNING, sem SELECT e sem marcá-lo como alterado."""
+    for coluna, valor in zip(colunas_do_modelo(type(db_obj)), linha):
+        set_committed_value(db_obj, coluna, valor)
+
+def update_many_stmt(model: Type[Base], ids: Iterable[Any], valores: Dict[str, Any], condicoes: Sequence[Any]) -> Update:
+    return (
+        update(model)
+        .where(model.id.in_(list(ids)), *condicoes)
+        .values(**valores)
+        .execution_options(synchronize_session="evaluate")
+    )
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado ou que não corresponde à chave da listagem."""
+
+class PaginacaoCursor:
+    """
+    Paginação por chave (keyset): em vez de offset(skip), cada página continua a partir da chave
+    do último item da anterior, e o banco desce direto pelo índice até ela. O cursor é a chave
+    serializada em base64 (opaco para o cliente).
+    """
+    # Colunas da ordenação da listagem; a última precisa ser única para desempatar
+    chave_cursor: Sequence[str] = ("id",)
+    cursor_descendente: bool = False
+
+    def _colunas_cursor(self) -> List[Any]:
+        return [getattr(self.model, coluna) for coluna in self.chave_cursor]
+
+    def codificar_cursor(self, db_obj: ModelType) -> str:
+        valores = jsonable_encoder([getattr(db_obj, coluna) for coluna in self.chave_cursor])
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip("=")
+
+    def decodificar_cursor(self, cursor: str) -> List[Any]:
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise CursorInvalido("Cursor inválido")
+        if not isinstance(valores, list) or len(valores) != len(self.chave_cursor):
+            raise CursorInvalido("Cursor inválido")
+        colunas = self._colunas_cursor()
+        try:
+            for i, coluna in enumerate(colunas):
+                tipo = coluna.type.python_type
+                if tipo in (datetime, date) and isinstance(valores[i], str):
+                    valores[i] = tipo.fromisoformat(valores[i])
+                elif not isinstance(valores[i], tipo):
+                    raise CursorInvalido("Cursor inválido")
+        except ValueError as e:
+            raise CursorInvalido("Cursor inválido") from e
+        return valores
+
+    def paginar(self, query: Select, *, cursor: Optional[str] = None, skip: int = 0, limit: int = 100) -> Select:
+        """
+        Ordena a consulta pela chave do cursor e aplica a página: a partir do cursor quando
+        informado, senão por offset (a primeira página e clientes antigos).
+        """
+        colunas = self._colunas_cursor()
+        ordem = [coluna.desc() if self.cursor_descendente else coluna for coluna in colunas]
+        query = query.order_by(*ordem)
+        if cursor:
+            chave = tuple_(*colunas)
+            valores = tuple_(*self.decodificar_cursor(cursor))
+            query = query.where(chave < valores if self.cursor_descendente else chave > valores)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    def proximo_cursor(self, itens: Sequence[ModelType], *, limit: int) -> Optional[str]:
+        """Cursor da página seguinte, ou None quando esta veio incompleta (fim da listagem)."""
+        if not itens or len(itens) < limit:
+            return None
+        return self.codificar_cursor(itens[-1])
+
+class CRUDBase(PaginacaoCursor, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -31,6 +134,13 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_page(
+        self, db: Session, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Página da tabela pela chave do cursor, com o cursor da página seguinte."""
+        itens = db.scalars(self.paginar(select(self.model), cursor=cursor, limit=limit)).all()
+        return itens, self.proximo_cursor(itens, limit=limit)
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
@@ -46,19 +156,39 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType, 
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.model_dump(exclude_unset=True) # Pydantic V2
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
+        """
+        Grava só as colunas enviadas com um UPDATE ... RETURNING e recarrega o objeto a partir
+        da linha devolvida, sem o SELECT do refresh. Sem RETURNING no dialeto, usa o refresh.
+        """
+        valores = valores_update(self.model, obj_in)
+        if not db.get_bind().dialect.update_returning:
+            for field, value in valores.items():
+                setattr(db_obj, field, value)
+            db.add(db_obj)
+            db.commit()
+            db.refresh(db_obj)
+            return db_obj
+        db.flush() # alterações pendentes no objeto (ex.: feitas por subclasses) vão antes do UPDATE
+        linha = db.execute(update_returning(self.model, db_obj.id, valores)).one() if valores else None
         db.commit()
-        db.refresh(db_obj)
+        if linha is not None:
+            aplicar_linha(db_obj, linha)
         return db_obj
 
+    def update_many(
+        self, db: Session, ids: Iterable[Any], values: Dict[str, Any], *, condicoes: Sequence[Any] = ()
+    ) -> int:
+        """
+        Aplica os mesmos valores a várias linhas com um único UPDATE ... WHERE id IN (...).
+        `condicoes` restringe ainda mais as linhas (ex.: só as do dono). Retorna quantas foram alteradas.
+        """
+        valores = valores_update(self.model, values)
+        if not valores:
+            return 0
+        resultado = db.execute(update_many_stmt(self.model, ids, valores, condicoes))
+        db.commit()
+        return resultado.rowcount
+
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
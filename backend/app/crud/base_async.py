@@ -0,0 +1,102 @@
+# Base CRUD operations (AsyncSession)
+from typing import Any, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import (
+    CreateSchemaType, ModelType, PaginacaoCursor, UpdateSchemaType,
+    aplicar_linha, update_many_stmt, update_returning, valores_update,
+)
+
+class AsyncCRUDBase(PaginacaoCursor, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Loader options aplicadas em toda leitura e na recarga após escritas. Em código assíncrono
+    # relacionamentos não podem ser carregados sob demanda, então o que a resposta serializa
+    # precisa estar listado aqui.
+    carregar: Sequence[Any] = ()
+
+    def __init__(self, model: Type[ModelType]):
+        """
+        Versão assíncrona de CRUDBase, com os mesmos métodos sobre uma AsyncSession.
+
+        **Parameters**
+
+        * `model`: A SQLAlchemy model class
+        """
+        self.model = model
+
+    def _select(self) -> Select:
+        return select(self.model).options(*self.carregar)
+
+    async def _recarregar(self, db: AsyncSession, db_obj: ModelType) -> ModelType:
+        """Relê o objeto após uma escrita, já com os relacionamentos de `carregar`."""
+        if not self.carregar:
+            await db.refresh(db_obj)
+            return db_obj
+        return await db.scalar(
+            self._select()
+            .where(self.model.id == db_obj.id)
+            .execution_options(populate_existing=True)
+        )
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.scalar(self._select().where(self.model.id == id))
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        return (await db.scalars(self._select().offset(skip).limit(limit))).all()
+
+    async def get_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Página da tabela pela chave do cursor, com o cursor da página seguinte."""
+        itens = (await db.scalars(self.paginar(self._select(), cursor=cursor, limit=limit))).all()
+        return itens, self.proximo_cursor(itens, limit=limit)
+
+    async def create(self, db: AsyncSession, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)  # type: ignore
+        db.add(db_obj)
+        await db.commit()
+        return await self._recarregar(db, db_obj)
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        """
+        UPDATE ... RETURNING das colunas enviadas, como CRUDBase.update. Os relacionamentos já
+        carregados continuam válidos (expire_on_commit=False); só uma chave estrangeira alterada
+        exige reler o objeto com `carregar`.
+        """
+        valores = valores_update(self.model, obj_in)
+        if not valores:
+            return db_obj
+        linha = (await db.execute(update_returning(self.model, db_obj.id, valores))).one()
+        await db.commit()
+        aplicar_linha(db_obj, linha)
+        if self.carregar and any(self.model.__table__.c[coluna].foreign_keys for coluna in valores):
+            return await self._recarregar(db, db_obj)
+        return db_obj
+
+    async def update_many(
+        self, db: AsyncSession, ids: Iterable[Any], values: Dict[str, Any], *, condicoes: Sequence[Any] = ()
+    ) -> int:
+        """Versão assíncrona de CRUDBase.update_many (um único UPDATE ... WHERE id IN (...))."""
+        valores = valores_update(self.model, values)
+        if not valores:
+            return 0
+        resultado = await db.execute(update_many_stmt(self.model, ids, valores, condicoes))
+        await db.commit()
+        return resultado.rowcount
+
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await self.get(db, id=id)
+        await db.delete(obj)
+        await db.commit()
+        return obj
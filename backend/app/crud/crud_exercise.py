@@ -1,10 +1,125 @@
 # CRUD operations for Exercise model
+from heapq import merge
+from itertools import islice
+from operator import attrgetter
+from sqlalchemy import Select, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional, Union, Dict, Any
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union, Dict, Any
 
-from app.crud.base import CRUDBase
+from app.core.cache import catalogo_publico
+from app.crud.base import CRUDBase, valores_update
+from app.crud.base_async import AsyncCRUDBase
+from app.crud.crud_statistics import volume_diario
+from app.db.busca import aplicar_busca, termos
 from app.models.exercise import Exercicio
-from app.schemas.exercise import ExercicioCreate, ExercicioUpdate
+from app.models.workout import ExercicioTreino
+from app.models.workout_execution import ExecucaoExercicio
+from app.schemas.exercise import Exercicio as ExercicioSchema, ExercicioCreate, ExercicioUpdate
+
+def _aplicar_filtros(
+    query: Select,
+    *,
+    grupo_muscular: Optional[str],
+    equipamento: Optional[str],
+    dificuldade: Optional[str],
+    nome: Optional[str],
+) -> Select:
+    if grupo_muscular:
+        query = query.where(Exercicio.grupo_muscular.ilike(f"%{grupo_muscular}%"))
+    if equipamento:
+        query = query.where(Exercicio.equipamento.ilike(f"%{equipamento}%"))
+    if dificuldade:
+        query = query.where(Exercicio.dificuldade == dificuldade)
+    if nome:
+        query = query.where(Exercicio.nome.ilike(f"%{nome}%"))
+    return query
+
+def _select_filtrado(*, user_id: int, **filtros: Optional[str]) -> Select:
+    """Exercícios públicos ou do usuário, com os filtros opcionais da listagem."""
+    query = select(Exercicio).where(
+        (Exercicio.publico == True) | (Exercicio.usuario_id == user_id)
+    )
+    return _aplicar_filtros(query, **filtros)
+
+class ItemCatalogo(NamedTuple):
+    """Exercício já serializado em JSON, com os campos filtráveis normalizados para comparação."""
+    id: int
+    grupo_muscular: str
+    equipamento: str
+    dificuldade: str
+    nome: str
+    json: bytes
+
+def _item_catalogo(exercicio: Exercicio) -> ItemCatalogo:
+    return ItemCatalogo(
+        id=exercicio.id,
+        grupo_muscular=exercicio.grupo_muscular.lower(),
+        equipamento=(exercicio.equipamento or "").lower(),
+        dificuldade=exercicio.dificuldade,
+        nome=exercicio.nome.lower(),
+        json=ExercicioSchema.model_validate(exercicio).model_dump_json().encode(),
+    )
+
+def _filtrar_catalogo(
+    itens: Iterable[ItemCatalogo],
+    *,
+    apos: Optional[int],
+    grupo_muscular: Optional[str],
+    equipamento: Optional[str],
+    dificuldade: Optional[str],
+    nome: Optional[str],
+) -> Iterator[ItemCatalogo]:
+    """Os mesmos filtros de _aplicar_filtros (ilike por substring), em memória."""
+    grupo_muscular, equipamento, nome = (f.lower() if f else None for f in (grupo_muscular, equipamento, nome))
+    for item in itens:
+        if apos is not None and item.id <= apos:
+            continue
+        if grupo_muscular and grupo_muscular not in item.grupo_muscular:
+            continue
+        if equipamento and equipamento not in item.equipamento:
+            continue
+        if dificuldade and item.dificuldade != dificuldade:
+            continue
+        if nome and nome not in item.nome:
+            continue
+        yield item
+
+def _select_busca(*, dialeto: str, user_id: int, q: str, skip: int, limit: int) -> Optional[Select]:
+    """Busca textual ranqueada entre os exercícios visíveis; None quando `q` não tem palavras."""
+    palavras = termos(q)
+    if not palavras:
+        return None
+    query = select(Exercicio).where((Exercicio.publico == True) | (Exercicio.usuario_id == user_id))
+    return aplicar_busca(query, Exercicio.id, dialeto, palavras).offset(skip).limit(limit)
+
+def _visivel(exercise: Optional[Exercicio], user_id: Optional[int]) -> Optional[Exercicio]:
+    if exercise and (exercise.publico or (user_id is not None and exercise.usuario_id == user_id)):
+        return exercise
+    return None
+
+def _reclassificar_volume(
+    db: Session, valores: Dict[str, Any], *, ids: Iterable[Any], condicoes: Sequence[Any] = ()
+) -> None:
+    """
+    O volume_diario é somado pelo grupo muscular do exercício: antes de um UPDATE que muda o
+    grupo, move o volume já consolidado dos exercícios afetados, na mesma transação.
+    """
+    grupo_novo = valores.get("grupo_muscular")
+    if grupo_novo is None:
+        return
+    anteriores = dict(db.execute(
+        select(Exercicio.id, Exercicio.grupo_muscular)
+        .where(Exercicio.id.in_(list(ids)), Exercicio.grupo_muscular != grupo_novo, *condicoes)
+    ).all())
+    volume_diario.reclassificar(db, grupos_anteriores=anteriores, grupo_novo=grupo_novo)
+
+def _select_em_uso(id: int) -> Select:
+    """Se algum treino ou execução (de qualquer usuário) referencia o exercício."""
+    return select(or_(
+        exists().where(ExercicioTreino.exercicio_id == id),
+        exists().where(ExecucaoExercicio.exercicio_id == id),
+    ))
 
 class CRUDExercicio(CRUDBase[Exercicio, ExercicioCreate, ExercicioUpdate]):
     def create_with_owner(
@@ -17,6 +132,37 @@ class CRUDExercicio(CRUDBase[Exercicio, ExercicioCreate, ExercicioUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    # Toda escrita muda a versão do catálogo público em memória (depois do commit)
+    def create(self, db: Session, *, obj_in: ExercicioCreate) -> Exercicio:
+        db_obj = super().create(db, obj_in=obj_in)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    def update(self, db: Session, *, db_obj: Exercicio, obj_in: Union[ExercicioUpdate, Dict[str, Any]]) -> Exercicio:
+        valores = valores_update(self.model, obj_in)
+        _reclassificar_volume(db, valores, ids=[db_obj.id])
+        db_obj = super().update(db, db_obj=db_obj, obj_in=valores)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    def update_many(
+        self, db: Session, ids: Iterable[Any], values: Dict[str, Any], *, condicoes: Sequence[Any] = ()
+    ) -> int:
+        ids = list(ids)
+        _reclassificar_volume(db, values, ids=ids, condicoes=condicoes)
+        atualizados = super().update_many(db, ids, values, condicoes=condicoes)
+        catalogo_publico.invalidar()
+        return atualizados
+
+    def em_uso(self, db: Session, *, id: int) -> bool:
+        return bool(db.scalar(_select_em_uso(id)))
+
+    def remove(self, db: Session, *, id: int) -> Exercicio:
+        db_obj = super().remove(db, id=id)
+        catalogo_publico.invalidar()
         return db_obj
 
     def get_multi_by_owner(
@@ -25,6 +171,7 @@ class CRUDExercicio(CRUDBase[Exercicio, ExercicioCreate, ExercicioUpdate]):
         return (
             db.query(self.model)
             .filter(Exercicio.usuario_id == user_id)
+            .order_by(Exercicio.id)
             .offset(skip)
             .limit(limit)
             .all()
@@ -40,29 +187,163 @@ class CRUDExercicio(CRUDBase[Exercicio, ExercicioCreate, ExercicioUpdate]):
         grupo_muscular: Optional[str] = None,
         equipamento: Optional[str] = None,
         dificuldade: Optional[str] = None,
-        nome: Optional[str] = None
+        nome: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> List[Exercicio]:
-        query = db.query(self.model).filter(
-            (Exercicio.publico == True) | (Exercicio.usuario_id == user_id)
+        query = _select_filtrado(
+            user_id=user_id,
+            grupo_muscular=grupo_muscular,
+            equipamento=equipamento,
+            dificuldade=dificuldade,
+            nome=nome,
         )
-        if grupo_muscular:
-            query = query.filter(Exercicio.grupo_muscular.ilike(f"%{grupo_muscular}%"))
-        if equipamento:
-            query = query.filter(Exercicio.equipamento.ilike(f"%{equipamento}%"))
-        if dificuldade:
-            query = query.filter(Exercicio.dificuldade == dificuldade)
-        if nome:
-            query = query.filter(Exercicio.nome.ilike(f"%{nome}%"))
-        
-        return query.offset(skip).limit(limit).all()
+        return db.scalars(self.paginar(query, cursor=cursor, skip=skip, limit=limit)).all()
+
+    def buscar(
+        self, db: Session, *, user_id: int, q: str, skip: int = 0, limit: int = 20
+    ) -> List[Exercicio]:
+        """Exercícios visíveis cujo nome, descrição ou instruções casam com `q` (prefixos), por relevância."""
+        query = _select_busca(dialeto=db.get_bind().dialect.name, user_id=user_id, q=q, skip=skip, limit=limit)
+        return db.scalars(query).all() if query is not None else []
 
     def get_public_or_owner(self, db: Session, *, id: int, user_id: Optional[int]) -> Optional[Exercicio]:
         """Get an exercise if it's public or owned by the user."""
         exercise = db.query(self.model).filter(self.model.id == id).first()
-        if not exercise:
-            return None
-        if exercise.publico or (user_id is not None and exercise.usuario_id == user_id):
-            return exercise
-        return None
+        return _visivel(exercise, user_id)
+
+class CRUDExercicioAsync(AsyncCRUDBase[Exercicio, ExercicioCreate, ExercicioUpdate]):
+    async def create_with_owner(
+        self, db: AsyncSession, *, obj_in: ExercicioCreate, user_id: Optional[int] = None
+    ) -> Exercicio:
+        db_obj = Exercicio(
+            **obj_in.model_dump(),
+            usuario_id=user_id
+        )
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    async def create(self, db: AsyncSession, *, obj_in: Union[ExercicioCreate, Dict[str, Any]]) -> Exercicio:
+        db_obj = await super().create(db, obj_in=obj_in)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: Exercicio, obj_in: Union[ExercicioUpdate, Dict[str, Any]]
+    ) -> Exercicio:
+        valores = valores_update(self.model, obj_in)
+        await db.run_sync(_reclassificar_volume, valores, ids=[db_obj.id])
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=valores)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    async def update_many(
+        self, db: AsyncSession, ids: Iterable[Any], values: Dict[str, Any], *, condicoes: Sequence[Any] = ()
+    ) -> int:
+        ids = list(ids)
+        await db.run_sync(_reclassificar_volume, values, ids=ids, condicoes=condicoes)
+        atualizados = await super().update_many(db, ids, values, condicoes=condicoes)
+        catalogo_publico.invalidar()
+        return atualizados
+
+    async def em_uso(self, db: AsyncSession, *, id: int) -> bool:
+        """
+        Treinos e execuções não são excluídos em cascata a partir do catálogo (a chave estrangeira
+        recusa o DELETE): um exercício em uso precisa continuar existindo.
+        """
+        return bool(await db.scalar(_select_em_uso(id)))
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Exercicio:
+        db_obj = await super().remove(db, id=id)
+        catalogo_publico.invalidar()
+        return db_obj
+
+    async def marca_dagua_catalogo(self, db: AsyncSession) -> Tuple[Any, ...]:
+        """
+        Contagem, maior id e maior data_atualizacao dos exercícios públicos: muda a cada inclusão,
+        exclusão, edição ou troca de `publico`, inclusive as feitas por outros processos.
+        """
+        linha = (await db.execute(
+            select(func.count(Exercicio.id), func.max(Exercicio.id), func.max(Exercicio.data_atualizacao))
+            .where(Exercicio.publico == True)
+        )).one()
+        return tuple(linha)
+
+    async def get_catalogo_publico(self, db: AsyncSession) -> Tuple[ItemCatalogo, ...]:
+        """
+        Exercícios públicos serializados, por id; do cache enquanto a versão do catálogo e a marca
+        d'água do banco valerem. `db` deve ser a sessão principal: uma réplica atrasada guardaria
+        sob a versão atual um catálogo anterior às escritas deste processo.
+        """
+        marca = await self.marca_dagua_catalogo(db)
+        itens = catalogo_publico.get(marca)
+        if itens is None:
+            versao = catalogo_publico.versao
+            exercicios = await db.scalars(select(Exercicio).where(Exercicio.publico == True).order_by(Exercicio.id))
+            itens = tuple(_item_catalogo(e) for e in exercicios)
+            catalogo_publico.set(itens, versao, marca)
+        return itens
+
+    async def listar_catalogo(
+        self,
+        db: AsyncSession,
+        *,
+        db_principal: AsyncSession,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        **filtros: Optional[str],
+    ) -> List[ItemCatalogo]:
+        """
+        Mesma página de get_multi_filtered, já serializada: os públicos vêm do catálogo em
+        memória e só os exercícios privados do usuário são lidos do banco, intercalados por id.
+        Os privados saem de `db` (pode ser a réplica); o catálogo, quando frio, de `db_principal`.
+        """
+        apos = self.decodificar_cursor(cursor)[0] if cursor else None
+        inicio = 0 if cursor else skip # com cursor, skip é ignorado como em paginar
+        publicos = _filtrar_catalogo(await self.get_catalogo_publico(db_principal), apos=apos, **filtros)
+        query = _aplicar_filtros(
+            select(Exercicio).where(Exercicio.usuario_id == user_id, Exercicio.publico.isnot(True)), **filtros
+        )
+        privados = (await db.scalars(self.paginar(query, cursor=cursor, limit=inicio + limit))).all()
+        intercalados = merge(publicos, map(_item_catalogo, privados), key=attrgetter("id"))
+        return list(islice(intercalados, inicio, inicio + limit))
+
+    async def get_multi_filtered(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        grupo_muscular: Optional[str] = None,
+        equipamento: Optional[str] = None,
+        dificuldade: Optional[str] = None,
+        nome: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Exercicio]:
+        query = _select_filtrado(
+            user_id=user_id,
+            grupo_muscular=grupo_muscular,
+            equipamento=equipamento,
+            dificuldade=dificuldade,
+            nome=nome,
+        )
+        return (await db.scalars(self.paginar(query, cursor=cursor, skip=skip, limit=limit))).all()
+
+    async def buscar(
+        self, db: AsyncSession, *, user_id: int, q: str, skip: int = 0, limit: int = 20
+    ) -> List[Exercicio]:
+        """Exercícios visíveis cujo nome, descrição ou instruções casam com `q` (prefixos), por relevância."""
+        query = _select_busca(dialeto=db.get_bind().dialect.name, user_id=user_id, q=q, skip=skip, limit=limit)
+        return (await db.scalars(query)).all() if query is not None else []
+
+    async def get_public_or_owner(self, db: AsyncSession, *, id: int, user_id: Optional[int]) -> Optional[Exercicio]:
+        """Get an exercise if it's public or owned by the user."""
+        return _visivel(await self.get(db, id=id), user_id)
 
 exercicio = CRUDExercicio(Exercicio)
+exercicio_async = CRUDExercicioAsync(Exercicio)
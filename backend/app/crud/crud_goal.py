@@ -1,9 +1,137 @@
 # CRUD for Meta
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import Date, func
+from sqlalchemy.orm import Session
+
 from app.crud.base import CRUDBase
+from app.crud.crud_statistics import ResumoSerie
 from app.models.goal import Meta
+from app.models.workout_execution import ExecucaoTreino, ExecucaoExercicio, Serie
 from app.schemas.goal import MetaCreate, MetaUpdate
 
+TIPOS_META = ("treino", "peso", "carga")
+
 class CRUDMeta(CRUDBase[Meta, MetaCreate, MetaUpdate]):
-    pass
+    chave_cursor = ("data_inicio", "id")
+    cursor_descendente = True
+
+    def get_multi_by_usuario(
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        ativa: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[Meta]:
+        query = db.query(self.model).filter(self.model.usuario_id == usuario_id)
+        if ativa is not None:
+            query = query.filter(self.model.ativa == ativa)
+        return self.paginar(query, cursor=cursor, skip=skip, limit=limit).all()
+
+    def create_with_owner(self, db: Session, *, obj_in: MetaCreate, usuario_id: int) -> Meta:
+        db_obj = Meta(**obj_in.model_dump(), usuario_id=usuario_id)
+        if db_obj.tipo in TIPOS_META:
+            db_obj.valor_atual = self._valor_do_historico(db, meta=db_obj)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: Meta, obj_in: Union[MetaUpdate, Dict[str, Any]]
+    ) -> Meta:
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        # Mudar o tipo ou a janela da meta invalida o valor acumulado, e uma meta inativa não acompanha
+        # as execuções (avaliar_execucao só vê as ativas): nesses casos recalcula uma única vez
+        reativada = update_data.get("ativa") is True and not db_obj.ativa
+        if reativada or {"tipo", "data_inicio", "data_fim"} & update_data.keys():
+            for field in ("tipo", "data_inicio", "data_fim"):
+                if field in update_data:
+                    setattr(db_obj, field, update_data[field])
+            if db_obj.tipo in TIPOS_META:
+                update_data["valor_atual"] = self._valor_do_historico(db, meta=db_obj)
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
+    def _valor_do_historico(self, db: Session, *, meta: Meta) -> float:
+        """
+        Valor da meta calculado a partir do histórico; usado na criação, ao mudar a janela e, nas
+        metas de peso, quando o peso de alguma execução muda.
+        """
+        dia_execucao = func.date(ExecucaoTreino.data_inicio, type_=Date)
+        query = db.query(ExecucaoTreino).filter(
+            ExecucaoTreino.usuario_id == meta.usuario_id,
+            dia_execucao >= meta.data_inicio,
+        )
+        if meta.data_fim:
+            query = query.filter(dia_execucao <= meta.data_fim)
+
+        if meta.tipo == "treino":
+            return float(query.with_entities(func.count(ExecucaoTreino.id)).scalar() or 0)
+        if meta.tipo == "carga":
+            maior = (
+                query.join(ExecucaoExercicio, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+                .join(Serie, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+                .filter(Serie.concluida == True)
+                .with_entities(func.max(Serie.peso))
+                .scalar()
+            )
+            return float(maior or 0)
+        ultimo = (
+            query.filter(ExecucaoTreino.peso_usuario.isnot(None))
+            .order_by(ExecucaoTreino.data_inicio.desc(), ExecucaoTreino.id.desc())
+            .with_entities(ExecucaoTreino.peso_usuario)
+            .first()
+        )
+        return float(ultimo[0]) if ultimo else 0.0
+
+    def avaliar_execucao(
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        dia: date,
+        execucoes: int = 0,
+        adicionadas: Sequence[ResumoSerie] = (),
+        removidas: Sequence[ResumoSerie] = (),
+        peso_alterado: bool = False,
+    ) -> None:
+        """
+        Atualiza valor_atual das metas ativas cuja janela contém `dia` usando apenas o delta
+        desta escrita: +/-1 treino e a maior carga entre as séries novas. Como nos recordes, a
+        carga só relê o histórico quando uma série removida (ou a versão anterior de uma série
+        alterada) era a marca atual. O peso corporal não é um delta: quando a escrita criou, removeu
+        ou mudou o peso_usuario de uma execução, a meta de peso volta a ser o peso da execução mais
+        recente da janela (que pode ser outra, se esta for retroativa). As séries já devem estar
+        gravadas (flush feito pelo chamador). Não faz commit.
+        """
+        cargas = [s.peso for s in adicionadas if s.concluida and s.peso is not None]
+        cargas_removidas = [s.peso for s in removidas if s.concluida and s.peso is not None]
+        if not execucoes and not cargas and not cargas_removidas and not peso_alterado:
+            return
+
+        metas = (
+            db.query(self.model)
+            .filter(
+                self.model.usuario_id == usuario_id,
+                self.model.ativa == True,
+                self.model.data_inicio <= dia,
+                (self.model.data_fim.is_(None)) | (self.model.data_fim >= dia),
+            )
+            .all()
+        )
+        for db_meta in metas:
+            if db_meta.tipo == "treino" and execucoes:
+                db_meta.valor_atual = max((db_meta.valor_atual or 0) + execucoes, 0)
+            elif db_meta.tipo == "carga" and cargas_removidas and max(cargas_removidas) >= (db_meta.valor_atual or 0):
+                db_meta.valor_atual = self._valor_do_historico(db, meta=db_meta)
+            elif db_meta.tipo == "carga" and cargas:
+                db_meta.valor_atual = max(db_meta.valor_atual or 0, max(cargas))
+            elif db_meta.tipo == "peso" and peso_alterado:
+                db_meta.valor_atual = self._valor_do_historico(db, meta=db_meta)
+        db.flush()
 
 meta = CRUDMeta(Meta)
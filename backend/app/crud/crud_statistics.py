@@ -0,0 +1,386 @@
+# CRUD for statistics rollups (VolumeDiario, RecordePessoal, DiaTreino)
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.exercise import Exercicio
+from app.models.statistics import VolumeDiario, RecordePessoal, DiaTreino
+from app.models.workout_execution import ExecucaoTreino, ExecucaoExercicio, Serie
+
+class ResumoSerie(NamedTuple):
+    """Dados mínimos de uma série escrita ou removida, usados para manter os agregados."""
+    exercicio_id: int
+    repeticoes: Optional[int]
+    peso: Optional[float]
+    concluida: bool
+    serie_id: Optional[int] = None
+
+def e1rm_epley(peso: float, repeticoes: int) -> float:
+    """1RM estimado pela fórmula de Epley (uma repetição vale o próprio peso)."""
+    if repeticoes == 1:
+        return peso
+    return peso * (1 + repeticoes / 30)
+
+def e1rm_brzycki(peso: float, repeticoes: int) -> Optional[float]:
+    """1RM estimado pela fórmula de Brzycki, definida apenas para menos de 37 repetições."""
+    if repeticoes >= 37:
+        return None
+    return peso * 36 / (37 - repeticoes)
+
+class CRUDVolumeDiario(CRUDBase[VolumeDiario, BaseModel, BaseModel]):
+
+    def _grupos_por_exercicio(self, db: Session, exercicio_ids: Iterable[int]) -> Dict[int, str]:
+        ids = set(exercicio_ids)
+        if not ids:
+            return {}
+        rows = db.query(Exercicio.id, Exercicio.grupo_muscular).filter(Exercicio.id.in_(ids)).all()
+        return {id_: grupo for id_, grupo in rows}
+
+    def registrar_series(
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        dia: date,
+        adicionadas: Iterable[ResumoSerie] = (),
+        removidas: Iterable[ResumoSerie] = (),
+    ) -> None:
+        """
+        Aplica ao rollup apenas a diferença entre as séries adicionadas e removidas de um dia.
+        Somente séries concluídas contam como volume. Não faz commit: a alteração entra na
+        mesma transação da escrita das séries.
+        """
+        adicionadas = [s for s in adicionadas if s.concluida]
+        removidas = [s for s in removidas if s.concluida]
+        if not adicionadas and not removidas:
+            return
+
+        grupos = self._grupos_por_exercicio(db, (s.exercicio_id for s in adicionadas + removidas))
+        deltas: Dict[str, List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        for sinal, series in ((1, adicionadas), (-1, removidas)):
+            for s in series:
+                grupo = grupos.get(s.exercicio_id)
+                if grupo is None:
+                    continue
+                repeticoes = s.repeticoes or 0
+                delta = deltas[grupo]
+                delta[0] += sinal
+                delta[1] += sinal * repeticoes
+                delta[2] += sinal * repeticoes * (s.peso or 0)
+
+        self._aplicar_deltas(db, usuario_id=usuario_id, dia=dia, deltas=deltas)
+
+    def _aplicar_deltas(
+        self, db: Session, *, usuario_id: int, dia: date, deltas: Dict[str, List[float]]
+    ) -> None:
+        existentes = {
+            row.grupo_muscular: row
+            for row in db.query(self.model).filter(
+                self.model.usuario_id == usuario_id,
+                self.model.dia == dia,
+                self.model.grupo_muscular.in_(list(deltas)),
+            )
+        }
+        for grupo, (series, repeticoes, tonelagem) in deltas.items():
+            row = existentes.get(grupo)
+            if row is None:
+                if series <= 0:
+                    continue
+                db.add(VolumeDiario(
+                    usuario_id=usuario_id,
+                    dia=dia,
+                    grupo_muscular=grupo,
+                    series=series,
+                    repeticoes=repeticoes,
+                    tonelagem=tonelagem,
+                ))
+                continue
+            row.series += series
+            row.repeticoes += repeticoes
+            row.tonelagem += tonelagem
+            if row.series <= 0:
+                db.delete(row)
+        db.flush()
+
+    def reclassificar(self, db: Session, *, grupos_anteriores: Dict[int, str], grupo_novo: str) -> None:
+        """
+        Move para `grupo_novo` o volume já consolidado dos exercícios de `grupos_anteriores`
+        (exercicio_id -> grupo em que foram somados), em todos os usuários e dias em que aparecem.
+        Chamado quando o grupo muscular de exercícios muda, na mesma transação. Não faz commit.
+        """
+        if not grupos_anteriores:
+            return
+        rows = (
+            db.query(
+                ExecucaoTreino.usuario_id,
+                ExecucaoTreino.data_inicio,
+                ExecucaoExercicio.exercicio_id,
+                func.count(Serie.id),
+                func.coalesce(func.sum(Serie.repeticoes), 0),
+                func.coalesce(func.sum(Serie.repeticoes * Serie.peso), 0),
+            )
+            .join(ExecucaoExercicio, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+            .join(Serie, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .filter(ExecucaoExercicio.exercicio_id.in_(list(grupos_anteriores)), Serie.concluida == True)
+            .group_by(ExecucaoTreino.usuario_id, ExecucaoTreino.data_inicio, ExecucaoExercicio.exercicio_id)
+            .all()
+        )
+        por_dia: Dict[Tuple[int, date], Dict[str, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0, 0, 0.0]))
+        for usuario_id, data_inicio, exercicio_id, series, repeticoes, tonelagem in rows:
+            deltas = por_dia[(usuario_id, data_inicio.date())]
+            for grupo, sinal in ((grupos_anteriores[exercicio_id], -1), (grupo_novo, 1)):
+                delta = deltas[grupo]
+                delta[0] += sinal * series
+                delta[1] += sinal * repeticoes
+                delta[2] += sinal * (tonelagem or 0)
+        for (usuario_id, dia), deltas in por_dia.items():
+            self._aplicar_deltas(db, usuario_id=usuario_id, dia=dia, deltas=deltas)
+
+    def get_periodo(
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        data_inicio: date,
+        data_fim: date,
+        agrupamento: str = "semana",
+        grupo_muscular: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Lê o rollup no intervalo [data_inicio, data_fim] com uma única varredura no índice
+        (usuario_id, dia). Com agrupamento "semana" as linhas diárias são somadas por semana ISO.
+        """
+        query = db.query(
+            self.model.dia,
+            self.model.grupo_muscular,
+            self.model.series,
+            self.model.repeticoes,
+            self.model.tonelagem,
+        ).filter(
+            self.model.usuario_id == usuario_id,
+            self.model.dia >= data_inicio,
+            self.model.dia <= data_fim,
+        )
+        if grupo_muscular:
+            query = query.filter(self.model.grupo_muscular == grupo_muscular)
+
+        periodos: Dict[Tuple[date, str], List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        for dia, grupo, series, repeticoes, tonelagem in query.order_by(self.model.dia):
+            inicio = dia - timedelta(days=dia.weekday()) if agrupamento == "semana" else dia
+            acumulado = periodos[(inicio, grupo)]
+            acumulado[0] += series
+            acumulado[1] += repeticoes
+            acumulado[2] += tonelagem
+
+        return [
+            {
+                "periodo_inicio": inicio,
+                "grupo_muscular": grupo,
+                "series": series,
+                "repeticoes": repeticoes,
+                "tonelagem": round(tonelagem, 2),
+            }
+            for (inicio, grupo), (series, repeticoes, tonelagem) in sorted(periodos.items())
+        ]
+
+    def reconstruir(self, db: Session, *, usuario_id: int) -> None:
+        """Recalcula o rollup de um usuário a partir do histórico (backfill e correções)."""
+        db.query(self.model).filter(self.model.usuario_id == usuario_id).delete(synchronize_session=False)
+        rows = (
+            db.query(ExecucaoTreino.data_inicio, ExecucaoExercicio.exercicio_id, Serie.repeticoes, Serie.peso)
+            .join(ExecucaoExercicio, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+            .join(Serie, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .filter(ExecucaoTreino.usuario_id == usuario_id, Serie.concluida == True)
+            .all()
+        )
+        por_dia: Dict[date, List[ResumoSerie]] = defaultdict(list)
+        for data_inicio, exercicio_id, repeticoes, peso in rows:
+            por_dia[data_inicio.date()].append(ResumoSerie(exercicio_id, repeticoes, peso, True))
+        for dia, series in por_dia.items():
+            self.registrar_series(db, usuario_id=usuario_id, dia=dia, adicionadas=series)
+        db.commit()
+
+class CRUDRecordePessoal(CRUDBase[RecordePessoal, BaseModel, BaseModel]):
+    _CAMPOS_RECORDE = (
+        "melhor_peso", "melhor_peso_repeticoes", "melhor_peso_serie_id",
+        "e1rm_epley", "e1rm_epley_serie_id", "e1rm_brzycki", "e1rm_brzycki_serie_id",
+    )
+
+    def get_by_exercicio(self, db: Session, *, usuario_id: int, exercicio_id: int) -> Optional[RecordePessoal]:
+        return db.query(self.model).filter(
+            self.model.usuario_id == usuario_id, self.model.exercicio_id == exercicio_id
+        ).first()
+
+    def get_multi_by_usuario(self, db: Session, *, usuario_id: int) -> List[RecordePessoal]:
+        return db.query(self.model).filter(self.model.usuario_id == usuario_id).order_by(self.model.exercicio_id).all()
+
+    def _aplicar_serie(self, recorde: RecordePessoal, serie: ResumoSerie) -> None:
+        peso, repeticoes = serie.peso, serie.repeticoes
+        if (
+            recorde.melhor_peso is None
+            or peso > recorde.melhor_peso
+            or (peso == recorde.melhor_peso and repeticoes > (recorde.melhor_peso_repeticoes or 0))
+        ):
+            recorde.melhor_peso = peso
+            recorde.melhor_peso_repeticoes = repeticoes
+            recorde.melhor_peso_serie_id = serie.serie_id
+
+        epley = e1rm_epley(peso, repeticoes)
+        if recorde.e1rm_epley is None or epley > recorde.e1rm_epley:
+            recorde.e1rm_epley = round(epley, 2)
+            recorde.e1rm_epley_serie_id = serie.serie_id
+
+        brzycki = e1rm_brzycki(peso, repeticoes)
+        if brzycki is not None and (recorde.e1rm_brzycki is None or brzycki > recorde.e1rm_brzycki):
+            recorde.e1rm_brzycki = round(brzycki, 2)
+            recorde.e1rm_brzycki_serie_id = serie.serie_id
+
+    def _series_do_historico(self, db: Session, *, usuario_id: int, exercicio_id: int) -> List[ResumoSerie]:
+        rows = (
+            db.query(Serie.id, Serie.repeticoes, Serie.peso)
+            .join(ExecucaoExercicio, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .join(ExecucaoTreino, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+            .filter(
+                ExecucaoTreino.usuario_id == usuario_id,
+                ExecucaoExercicio.exercicio_id == exercicio_id,
+                Serie.concluida == True,
+            )
+            .all()
+        )
+        return [ResumoSerie(exercicio_id, repeticoes, peso, True, serie_id) for serie_id, repeticoes, peso in rows]
+
+    def registrar_series(
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        adicionadas: Iterable[ResumoSerie] = (),
+        removidas: Iterable[ResumoSerie] = (),
+    ) -> None:
+        """
+        Atualiza os recordes com as séries gravadas, comparando apenas contra o valor atual.
+        O histórico só é relido para exercícios cujo recorde vinha de uma série removida.
+        As séries adicionadas precisam já ter id (flush feito pelo chamador). Não faz commit.
+        """
+        adicionadas = [
+            s for s in adicionadas
+            if s.concluida and s.peso is not None and s.peso > 0 and s.repeticoes is not None and s.repeticoes > 0
+        ]
+        removidas_ids = {s.serie_id for s in removidas if s.concluida and s.serie_id is not None}
+        exercicio_ids = {s.exercicio_id for s in adicionadas} | {
+            s.exercicio_id for s in removidas if s.serie_id in removidas_ids
+        }
+        if not exercicio_ids:
+            return
+
+        recordes = {
+            r.exercicio_id: r
+            for r in db.query(self.model).filter(
+                self.model.usuario_id == usuario_id, self.model.exercicio_id.in_(exercicio_ids)
+            )
+        }
+        invalidados = {
+            exercicio_id for exercicio_id, r in recordes.items()
+            if {r.melhor_peso_serie_id, r.e1rm_epley_serie_id, r.e1rm_brzycki_serie_id} & removidas_ids
+        }
+
+        for exercicio_id in exercicio_ids:
+            recorde = recordes.get(exercicio_id)
+            if exercicio_id in invalidados:
+                series = [
+                    s for s in self._series_do_historico(db, usuario_id=usuario_id, exercicio_id=exercicio_id)
+                    if s.peso is not None and s.peso > 0 and s.repeticoes is not None and s.repeticoes > 0
+                ]
+                if not series:
+                    db.delete(recorde)
+                    continue
+                for campo in self._CAMPOS_RECORDE:
+                    setattr(recorde, campo, None)
+            else:
+                series = [s for s in adicionadas if s.exercicio_id == exercicio_id]
+            if not series:
+                continue
+            if recorde is None:
+                recorde = RecordePessoal(usuario_id=usuario_id, exercicio_id=exercicio_id)
+                db.add(recorde)
+            for serie in series:
+                self._aplicar_serie(recorde, serie)
+        db.flush()
+
+    def reconstruir(self, db: Session, *, usuario_id: int) -> None:
+        """Recalcula todos os recordes de um usuário a partir do histórico (backfill e correções)."""
+        db.query(self.model).filter(self.model.usuario_id == usuario_id).delete(synchronize_session=False)
+        rows = (
+            db.query(Serie.id, ExecucaoExercicio.exercicio_id, Serie.repeticoes, Serie.peso)
+            .join(ExecucaoExercicio, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .join(ExecucaoTreino, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+            .filter(ExecucaoTreino.usuario_id == usuario_id, Serie.concluida == True)
+            .all()
+        )
+        self.registrar_series(
+            db,
+            usuario_id=usuario_id,
+            adicionadas=[ResumoSerie(exercicio_id, repeticoes, peso, True, serie_id) for serie_id, exercicio_id, repeticoes, peso in rows],
+        )
+        db.commit()
+
+class CRUDDiaTreino(CRUDBase[DiaTreino, BaseModel, BaseModel]):
+
+    def registrar_execucoes(self, db: Session, *, usuario_id: int, dia: date, delta: int) -> None:
+        """Soma `delta` execuções ao dia, removendo o registro quando não resta nenhuma. Não faz commit."""
+        if not delta:
+            return
+        row = db.query(self.model).filter(self.model.usuario_id == usuario_id, self.model.dia == dia).first()
+        if row is None:
+            if delta > 0:
+                db.add(DiaTreino(usuario_id=usuario_id, dia=dia, execucoes=delta))
+        else:
+            row.execucoes += delta
+            if row.execucoes <= 0:
+                db.delete(row)
+        db.flush()
+
+    def get_dias(
+        self, db: Session, *, usuario_id: int, data_inicio: Optional[date] = None, data_fim: Optional[date] = None
+    ) -> List[Tuple[date, int]]:
+        """Dias treinados (e número de execuções) em ordem crescente."""
+        query = db.query(self.model.dia, self.model.execucoes).filter(self.model.usuario_id == usuario_id)
+        if data_inicio:
+            query = query.filter(self.model.dia >= data_inicio)
+        if data_fim:
+            query = query.filter(self.model.dia <= data_fim)
+        return query.order_by(self.model.dia).all()
+
+    def get_sequencias(self, db: Session, *, usuario_id: int, hoje: date) -> Tuple[int, int]:
+        """
+        Sequência atual e maior sequência de dias consecutivos, em uma passada sobre os dias treinados.
+        A sequência atual continua valendo se o último treino foi hoje ou ontem.
+        """
+        dias = [dia for (dia,) in db.query(self.model.dia).filter(self.model.usuario_id == usuario_id).order_by(self.model.dia)]
+        maior = atual = 0
+        anterior: Optional[date] = None
+        for dia in dias:
+            atual = atual + 1 if anterior is not None and (dia - anterior).days == 1 else 1
+            maior = max(maior, atual)
+            anterior = dia
+        if anterior is None or (hoje - anterior).days > 1:
+            atual = 0
+        return atual, maior
+
+    def reconstruir(self, db: Session, *, usuario_id: int) -> None:
+        """Recalcula os dias treinados de um usuário a partir das execuções (backfill e correções)."""
+        db.query(self.model).filter(self.model.usuario_id == usuario_id).delete(synchronize_session=False)
+        por_dia: Dict[date, int] = defaultdict(int)
+        for (data_inicio,) in db.query(ExecucaoTreino.data_inicio).filter(ExecucaoTreino.usuario_id == usuario_id):
+            por_dia[data_inicio.date()] += 1
+        db.add_all(DiaTreino(usuario_id=usuario_id, dia=dia, execucoes=n) for dia, n in por_dia.items())
+        db.commit()
+
+volume_diario = CRUDVolumeDiario(VolumeDiario)
+recorde_pessoal = CRUDRecordePessoal(RecordePessoal)
+dia_treino = CRUDDiaTreino(DiaTreino)
@@ -1,21 +1,57 @@
 # CRUD operations for User model
 from typing import Any, Dict, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import catalogo_publico, token_versions, user_cache
 from app.core.security import get_password_hash, verify_password
 from app.crud.base import CRUDBase
-from app.models.user import User
+from app.crud.base_async import AsyncCRUDBase
+from app.models.exercise import Exercicio
+from app.models.user import User, VersaoToken
+from app.models.workout import ExercicioTreino, TreinoFixo
+from app.models.workout_execution import ExecucaoExercicio, ExecucaoTreino
 from app.schemas.user import UserCreate, UserUpdate
 
+# Colunas guardadas no cache de usuários (o hash da senha fica de fora e é carregado sob demanda)
+_COLUNAS_CACHE = tuple(c.key for c in inspect(User).column_attrs if c.key != "senha_hash")
+
+def _do_cache(valores: Dict[str, Any]) -> User:
+    """Usuário destacado montado a partir do cache, pronto para o merge sem query."""
+    db_obj = User(**valores)
+    make_transient_to_detached(db_obj)
+    return db_obj
+
+def _guardar_no_cache(db_obj: User) -> None:
+    user_cache.set(db_obj.id, {key: getattr(db_obj, key) for key in _COLUNAS_CACHE})
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    def get_cached(self, db: Session, *, id: int) -> Optional[User]:
+        """
+        Obtém o usuário pelo id passando pelo cache em memória.
+        No acerto, o registro é anexado à sessão sem nenhuma query (merge com load=False).
+        """
+        valores = user_cache.get(id)
+        if valores is not None:
+            return db.merge(_do_cache(valores), load=False)
+        db_obj = self.get(db, id=id)
+        if db_obj is not None:
+            _guardar_no_cache(db_obj)
+        return db_obj
+
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    def create(self, db: Session, *, obj_in: UserCreate, senha_hash: Optional[str] = None) -> User:
+        """
+        Cria o usuário. `senha_hash` permite informar o hash já calculado fora do threadpool
+        (ver security.get_password_hash_async); sem ele a senha é hasheada aqui.
+        """
         db_obj = User(
             email=obj_in.email,
-            senha_hash=get_password_hash(obj_in.password),
+            senha_hash=senha_hash or get_password_hash(obj_in.password),
             nome=obj_in.nome,
             peso=obj_in.peso,
             altura=obj_in.altura,
@@ -28,8 +64,17 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         return db_obj
 
     def update(
-        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+        self,
+        db: Session,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+        revogar_tokens: bool = False,
     ) -> User:
+        """
+        `revogar_tokens` (troca de senha) incrementa a versão dos tokens no mesmo commit da
+        alteração: não há janela em que a senha nova valha e os tokens antigos também.
+        """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -38,7 +83,66 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["senha_hash"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        versao = self._incrementar_versao_token(db, usuario_id=db_obj.id) if revogar_tokens else None
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        user_cache.invalidate(db_obj.id) # só depois do commit, para não recarregar a linha antiga
+        if versao is not None:
+            token_versions.set(db_obj.id, versao.versao)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> User:
+        self.revoke_tokens(db, usuario_id=id)
+        self._liberar_exercicios_em_uso(db, usuario_id=id)
+        usuario = super().remove(db, id=id)
+        user_cache.invalidate(id)
+        catalogo_publico.invalidar() # os exercícios do usuário saem em cascata
+        return usuario
+
+    def _liberar_exercicios_em_uso(self, db: Session, *, usuario_id: int) -> None:
+        """
+        Exercícios do usuário usados em treinos ou execuções de outros usuários não saem em cascata
+        (a chave estrangeira recusaria o DELETE): ficam sem dono, preservando o histórico alheio.
+        """
+        usado_por_outros = or_(
+            exists().where(
+                ExercicioTreino.exercicio_id == Exercicio.id,
+                ExercicioTreino.treino_fixo_id == TreinoFixo.id,
+                TreinoFixo.usuario_id != usuario_id,
+            ),
+            exists().where(
+                ExecucaoExercicio.exercicio_id == Exercicio.id,
+                ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id,
+                ExecucaoTreino.usuario_id != usuario_id,
+            ),
+        )
+        db.execute(
+            update(Exercicio)
+            .where(Exercicio.usuario_id == usuario_id, usado_por_outros)
+            .values(usuario_id=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_token_version(self, db: Session, *, usuario_id: int) -> int:
+        """Versão atual dos tokens do usuário, lida do mapa em memória (recarregado quando expira)."""
+        if token_versions.expirado():
+            token_versions.carregar(dict(db.query(VersaoToken.usuario_id, VersaoToken.versao).all()))
+        return token_versions.get(usuario_id)
+
+    def _incrementar_versao_token(self, db: Session, *, usuario_id: int) -> VersaoToken:
+        """Incrementa a versão na sessão, sem commit (o chamador decide a transação)."""
+        db_obj = db.get(VersaoToken, usuario_id)
+        if db_obj is None:
+            db_obj = VersaoToken(usuario_id=usuario_id, versao=0)
+            db.add(db_obj)
+        db_obj.versao += 1
+        return db_obj
+
+    def revoke_tokens(self, db: Session, *, usuario_id: int) -> int:
+        """Invalida todos os tokens sem estado já emitidos para o usuário."""
+        db_obj = self._incrementar_versao_token(db, usuario_id=usuario_id)
+        db.commit()
+        token_versions.set(usuario_id, db_obj.versao)
+        return db_obj.versao
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
@@ -48,4 +152,23 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             return None
         return user
 
+class CRUDUserAsync(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    """Leituras de autenticação sobre AsyncSession, para as dependências dos routers assíncronos."""
+
+    async def get_cached(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        valores = user_cache.get(id)
+        if valores is not None:
+            return await db.merge(_do_cache(valores), load=False)
+        db_obj = await self.get(db, id=id)
+        if db_obj is not None:
+            _guardar_no_cache(db_obj)
+        return db_obj
+
+    async def get_token_version(self, db: AsyncSession, *, usuario_id: int) -> int:
+        if token_versions.expirado():
+            linhas = await db.execute(select(VersaoToken.usuario_id, VersaoToken.versao))
+            token_versions.carregar(dict(linhas.all()))
+        return token_versions.get(usuario_id)
+
 user = CRUDUser(User)
+user_async = CRUDUserAsync(User)
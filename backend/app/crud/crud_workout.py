@@ -1,24 +1,178 @@
 # CRUD for TreinoFixo and ExercicioTreino
-from typing import List
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Select, delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from app.crud.base import CRUDBase
+from app.crud.base_async import AsyncCRUDBase
+from app.crud.crud_goal import meta
+from app.crud.crud_statistics import volume_diario, recorde_pessoal, dia_treino, ResumoSerie
+from app.models.exercise import Exercicio
 from app.models.workout import TreinoFixo, ExercicioTreino
+from app.models.workout_execution import ExecucaoTreino, ExecucaoExercicio, Serie
 from app.schemas.workout import TreinoFixoCreate, TreinoFixoUpdate, ExercicioTreinoCreate, ExercicioTreinoUpdate
 
+def _select_por_usuario(usuario_id: int) -> Select:
+    return select(TreinoFixo).where(TreinoFixo.usuario_id == usuario_id, TreinoFixo.excluido_em.is_(None))
+
+def _maximo(valores) -> Optional[Any]:
+    return max((v for v in valores if v is not None), default=None)
+
+def marca_dagua_de(treino: TreinoFixo) -> Tuple[Any, ...]:
+    """
+    A mesma marca d'água de CRUDTreinoFixoAsync.marca_dagua, calculada a partir do treino já
+    carregado com os exercícios (sem consulta).
+    """
+    itens = treino.exercicios_treino
+    return (
+        treino.data_atualizacao,
+        len(itens),
+        _maximo(et.id for et in itens),
+        _maximo(et.data_atualizacao for et in itens),
+        _maximo(et.exercicio.data_atualizacao for et in itens if et.exercicio is not None),
+    )
+
 class CRUDTreinoFixo(CRUDBase[TreinoFixo, TreinoFixoCreate, TreinoFixoUpdate]):
-    # Add custom methods if needed
+    def get(self, db: Session, id: Any) -> Optional[TreinoFixo]:
+        """Treinos excluídos logicamente já não existem para a aplicação, mesmo antes da purga."""
+        return db.scalar(select(TreinoFixo).where(TreinoFixo.id == id, TreinoFixo.excluido_em.is_(None)))
+
     def get_multi_by_usuario(
-        self, db: Session, *, usuario_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, *, usuario_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[TreinoFixo]:
         """Obtém todos os treinos de um usuário específico"""
-        return db.query(self.model).filter(
-            self.model.usuario_id == usuario_id
-        ).offset(skip).limit(limit).all()
+        return db.scalars(self.paginar(_select_por_usuario(usuario_id), cursor=cursor, skip=skip, limit=limit)).all()
+
+    def purgar(self, db: Session, *, id: int) -> None:
+        """
+        Apaga o treino com um único DELETE; exercícios, execuções e séries saem pelo ON DELETE
+        CASCADE do banco, sem serem carregados. Antes, as séries das execuções são lidas só como
+        resumo para descontar dos agregados (volume, recordes, dias treinados e metas) apenas os
+        dias e exercícios afetados, na mesma transação do DELETE.
+        """
+        usuario_id = db.scalar(select(TreinoFixo.usuario_id).where(TreinoFixo.id == id))
+        if usuario_id is None:
+            return
+        execucoes = db.execute(
+            select(ExecucaoTreino.id, ExecucaoTreino.data_inicio, ExecucaoTreino.peso_usuario)
+            .where(ExecucaoTreino.usuario_id == usuario_id, ExecucaoTreino.treino_fixo_id == id)
+        ).all()
+        series_por_execucao: Dict[int, List[ResumoSerie]] = defaultdict(list)
+        for execucao_id, *resumo in db.execute(
+            select(
+                ExecucaoExercicio.execucao_treino_id, ExecucaoExercicio.exercicio_id,
+                Serie.repeticoes, Serie.peso, Serie.concluida, Serie.id,
+            )
+            .join(Serie, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .join(ExecucaoTreino, ExecucaoTreino.id == ExecucaoExercicio.execucao_treino_id)
+            .where(ExecucaoTreino.usuario_id == usuario_id, ExecucaoTreino.treino_fixo_id == id)
+        ):
+            series_por_execucao[execucao_id].append(ResumoSerie(*resumo))
+
+        db.execute(delete(TreinoFixo).where(TreinoFixo.id == id))
+
+        # (execuções, séries removidas, havia peso_usuario) por dia
+        dias: Dict[date, Tuple[int, List[ResumoSerie], bool]] = {}
+        for execucao_id, data_inicio, peso_usuario in execucoes:
+            total, removidas, peso = dias.get(data_inicio.date(), (0, [], False))
+            removidas.extend(series_por_execucao[execucao_id])
+            dias[data_inicio.date()] = (total + 1, removidas, peso or peso_usuario is not None)
+        for dia, (total, removidas, peso) in dias.items():
+            dia_treino.registrar_execucoes(db, usuario_id=usuario_id, dia=dia, delta=-total)
+            volume_diario.registrar_series(db, usuario_id=usuario_id, dia=dia, removidas=removidas)
+            meta.avaliar_execucao(
+                db, usuario_id=usuario_id, dia=dia, execucoes=-total, removidas=removidas, peso_alterado=peso
+            )
+        recorde_pessoal.registrar_series(
+            db, usuario_id=usuario_id, removidas=[s for series in series_por_execucao.values() for s in series]
+        )
+        db.commit()
+
+    def purgar_excluidos(self, db: Session) -> int:
+        """Conclui as purgas interrompidas (ex.: processo reiniciado antes da tarefa em segundo plano)."""
+        ids = db.scalars(select(TreinoFixo.id).where(TreinoFixo.excluido_em.is_not(None))).all()
+        for id in ids:
+            self.purgar(db, id=id)
+        return len(ids)
 
 class CRUDExercicioTreino(CRUDBase[ExercicioTreino, ExercicioTreinoCreate, ExercicioTreinoUpdate]):
     # Add custom methods if needed
     pass
 
+class CRUDTreinoFixoAsync(AsyncCRUDBase[TreinoFixo, TreinoFixoCreate, TreinoFixoUpdate]):
+    carregar = (
+        selectinload(TreinoFixo.exercicios_treino).selectinload(ExercicioTreino.exercicio),
+    )
+
+    def _select(self) -> Select:
+        return super()._select().where(TreinoFixo.excluido_em.is_(None))
+
+    async def get_multi_by_usuario(
+        self, db: AsyncSession, *, usuario_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[TreinoFixo]:
+        """Obtém todos os treinos de um usuário específico"""
+        query = self.paginar(_select_por_usuario(usuario_id).options(*self.carregar), cursor=cursor, skip=skip, limit=limit)
+        return (await db.scalars(query)).all()
+
+    async def get_by_usuario(self, db: AsyncSession, *, id: int, usuario_id: int) -> Optional[TreinoFixo]:
+        """Obtém o treino apenas se pertencer ao usuário"""
+        return await db.scalar(
+            self._select().where(TreinoFixo.id == id, TreinoFixo.usuario_id == usuario_id)
+        )
+
+    async def marca_dagua(self, db: AsyncSession, *, id: int, usuario_id: int) -> Optional[Tuple[Any, ...]]:
+        """
+        Uma linha de agregados que muda sempre que a resposta de GET /treinos/{id} mudaria:
+        data_atualizacao do treino, dos seus exercícios e dos exercícios do catálogo usados,
+        mais a contagem e o maior id (inclusões e remoções). None se o treino não for do usuário.
+        """
+        linha = (await db.execute(
+            select(
+                TreinoFixo.data_atualizacao,
+                func.count(ExercicioTreino.id),
+                func.max(ExercicioTreino.id),
+                func.max(ExercicioTreino.data_atualizacao),
+                func.max(Exercicio.data_atualizacao),
+            )
+            .select_from(TreinoFixo)
+            .outerjoin(ExercicioTreino, ExercicioTreino.treino_fixo_id == TreinoFixo.id)
+            .outerjoin(Exercicio, Exercicio.id == ExercicioTreino.exercicio_id)
+            .where(TreinoFixo.id == id, TreinoFixo.usuario_id == usuario_id, TreinoFixo.excluido_em.is_(None))
+            .group_by(TreinoFixo.id)
+        )).first()
+        return tuple(linha) if linha is not None else None
+
+    async def get_simples(self, db: AsyncSession, *, id: int) -> Optional[TreinoFixo]:
+        """Apenas a linha do treino, sem os exercícios (conferência de existência e de dono)."""
+        return await db.scalar(select(TreinoFixo).where(TreinoFixo.id == id, TreinoFixo.excluido_em.is_(None)))
+
+    async def excluir(self, db: AsyncSession, *, db_obj: TreinoFixo) -> TreinoFixo:
+        """
+        Exclusão lógica: só marca excluido_em, então responde na hora mesmo com um histórico
+        grande. A remoção das linhas fica com `purgar`, agendada em segundo plano.
+        """
+        return await self.update(db, db_obj=db_obj, obj_in={"excluido_em": datetime.now()})
+
+    async def purgar(self, bind: AsyncEngine, id: int) -> None:
+        """Purga o treino em uma sessão própria (a da requisição já foi fechada quando a tarefa roda)."""
+        async with AsyncSession(bind, expire_on_commit=False) as db:
+            await db.run_sync(treino_fixo.purgar, id=id)
+
+    async def purgar_excluidos(self, bind: AsyncEngine) -> int:
+        """
+        Conclui as purgas interrompidas sem segurar a inicialização: roda como tarefa em segundo
+        plano, e cada purga é uma transação própria (uma interrompida de novo fica para a próxima).
+        """
+        async with AsyncSession(bind, expire_on_commit=False) as db:
+            return await db.run_sync(treino_fixo.purgar_excluidos)
+
+class CRUDExercicioTreinoAsync(AsyncCRUDBase[ExercicioTreino, ExercicioTreinoCreate, ExercicioTreinoUpdate]):
+    carregar = (selectinload(ExercicioTreino.exercicio),)
+
 treino_fixo = CRUDTreinoFixo(TreinoFixo)
 exercicio_treino = CRUDExercicioTreino(ExercicioTreino)
+treino_fixo_async = CRUDTreinoFixoAsync(TreinoFixo)
+exercicio_treino_async = CRUDExercicioTreinoAsync(ExercicioTreino)
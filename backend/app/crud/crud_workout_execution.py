@@ -1,8 +1,15 @@
 # CRUD for ExecucaoTreino, ExecucaoExercicio, Serie
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import Select, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload, joinedload
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Sequence, Tuple
 
 from app.crud.base import CRUDBase
+from app.crud.base_async import AsyncCRUDBase
+from app.crud.crud_goal import meta
+from app.crud.crud_statistics import volume_diario, recorde_pessoal, dia_treino, ResumoSerie
 from app.models.workout_execution import ExecucaoTreino, ExecucaoExercicio, Serie
 from app.models.exercise import Exercicio as ExercicioModel # Para carregar nome do exercício
 from app.models.workout import TreinoFixo, ExercicioTreino # Adicionado para acessar o template
@@ -12,8 +19,135 @@ from app.schemas.workout_execution import (
     SerieCreate, SerieUpdate # Não usado diretamente aqui, mas bom ter
 )
 
+def _inserir_em_lote(db: Session, model: Any, linhas: Sequence[Dict[str, Any]]) -> List[int]:
+    """
+    INSERT de várias linhas em um único statement multi-VALUES, devolvendo os ids na ordem de `linhas`.
+    O SQLite atribui os rowids de um INSERT em sequência, na ordem do VALUES, mas não garante a ordem
+    do RETURNING, então os ids retornados são ordenados. Dialetos que correlacionam o RETURNING com
+    os parâmetros (PostgreSQL) usam sort_by_parameter_order; os demais fazem um INSERT por linha.
+    """
+    if not linhas:
+        return []
+    dialeto = db.get_bind().dialect
+    if dialeto.name == "sqlite" and dialeto.insert_executemany_returning:
+        return sorted(db.scalars(insert(model).returning(model.id), linhas).all())
+    if dialeto.insert_executemany_returning_sort_by_parameter_order:
+        return db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), linhas).all()
+    return [db.execute(insert(model), linha).inserted_primary_key[0] for linha in linhas]
+
+def _resumo_serie(db_serie: Serie, exercicio_id: int) -> ResumoSerie:
+    return ResumoSerie(exercicio_id, db_serie.repeticoes, db_serie.peso, db_serie.concluida, db_serie.id)
+
+# Relacionamentos serializados por schemas.ExecucaoTreino
+_CARGA_EXECUCAO = (
+    selectinload(ExecucaoTreino.treino_fixo), # Carregar o TreinoFixo associado
+    selectinload(ExecucaoTreino.exercicios_executados)
+    .selectinload(ExecucaoExercicio.series),
+    selectinload(ExecucaoTreino.exercicios_executados)
+    .joinedload(ExecucaoExercicio.exercicio), # Usar joinedload para carregar o nome do exercício
+)
+
+def _select_por_usuario(usuario_id: int, treino_fixo_id: Optional[int] = None) -> Select:
+    """Execuções do usuário (opcionalmente de um treino); a ordem vem da chave do cursor."""
+    query = (
+        select(ExecucaoTreino)
+        .where(ExecucaoTreino.usuario_id == usuario_id)
+        .options(*_CARGA_EXECUCAO)
+    )
+    if treino_fixo_id:
+        query = query.where(ExecucaoTreino.treino_fixo_id == treino_fixo_id)
+    return query
+
+def _select_detalhes(id: int, usuario_id: int) -> Select:
+    return (
+        select(ExecucaoTreino)
+        .options(*_CARGA_EXECUCAO)
+        .where(ExecucaoTreino.id == id, ExecucaoTreino.usuario_id == usuario_id)
+    )
+
 class CRUDExecucaoTreino(CRUDBase[ExecucaoTreino, ExecucaoTreinoCreate, ExecucaoTreinoUpdate]):
+    # Histórico das mais recentes para as mais antigas, coberto pelos índices (usuario_id, [treino_fixo_id,] data_inicio)
+    chave_cursor = ("data_inicio", "id")
+    cursor_descendente = True
+
+    def _atualizar_agregados(
+        self,
+        db: Session,
+        *,
+        db_obj: ExecucaoTreino,
+        adicionadas: Sequence[ResumoSerie] = (),
+        removidas: Sequence[ResumoSerie] = (),
+        execucoes: int = 0,
+        peso_alterado: bool = False,
+    ) -> None:
+        """
+        Propaga para os agregados (volume, recordes, dias treinados, metas) apenas as séries gravadas
+        e removidas nesta escrita, dentro da mesma transação. As séries adicionadas já devem ter id;
+        `execucoes` é +1 quando a execução foi criada e -1 quando foi removida. `peso_alterado`
+        indica uma edição do peso_usuario (criar ou remover uma execução com peso já conta).
+        """
+        dia_treino.registrar_execucoes(
+            db, usuario_id=db_obj.usuario_id, dia=db_obj.data_inicio.date(), delta=execucoes
+        )
+        volume_diario.registrar_series(
+            db,
+            usuario_id=db_obj.usuario_id,
+            dia=db_obj.data_inicio.date(),
+            adicionadas=adicionadas,
+            removidas=removidas,
+        )
+        recorde_pessoal.registrar_series(
+            db, usuario_id=db_obj.usuario_id, adicionadas=adicionadas, removidas=removidas
+        )
+        meta.avaliar_execucao(
+            db,
+            usuario_id=db_obj.usuario_id,
+            dia=db_obj.data_inicio.date(),
+            execucoes=execucoes,
+            adicionadas=adicionadas,
+            removidas=removidas,
+            peso_alterado=peso_alterado or (execucoes != 0 and db_obj.peso_usuario is not None),
+        )
     
+    def _inserir_exercicios(
+        self,
+        db: Session,
+        *,
+        execucao_treino_id: int,
+        exercicios: Sequence[Tuple[Dict[str, Any], Sequence[Dict[str, Any]]]],
+    ) -> List[ResumoSerie]:
+        """
+        Grava os exercícios de uma execução e suas séries com um INSERT em lote para cada tabela,
+        sem flush por exercício. `exercicios` traz, em ordem, as colunas de cada ExecucaoExercicio
+        e as de suas séries. Retorna o resumo das séries gravadas (já com id) para os agregados.
+        """
+        exercicio_ids = _inserir_em_lote(
+            db, ExecucaoExercicio, [{**dados, "execucao_treino_id": execucao_treino_id} for dados, _ in exercicios]
+        )
+        linhas_series = [
+            {**serie, "execucao_exercicio_id": execucao_exercicio_id}
+            for execucao_exercicio_id, (_, series) in zip(exercicio_ids, exercicios)
+            for serie in series
+        ]
+        serie_ids = _inserir_em_lote(db, Serie, linhas_series)
+        exercicio_de_cada_serie = [dados["exercicio_id"] for dados, series in exercicios for _ in series]
+        return [
+            ResumoSerie(exercicio_id, linha.get("repeticoes"), linha.get("peso"), linha.get("concluida", False), serie_id)
+            for exercicio_id, linha, serie_id in zip(exercicio_de_cada_serie, linhas_series, serie_ids)
+        ]
+
+    def _series_por_exercicio(self, db: Session, *, execucao_treino_id: int) -> Dict[int, List[Serie]]:
+        """Todas as séries da execução em uma única query, agrupadas por execucao_exercicio_id."""
+        series: Dict[int, List[Serie]] = defaultdict(list)
+        for db_serie in db.scalars(
+            select(Serie)
+            .join(ExecucaoExercicio, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .where(ExecucaoExercicio.execucao_treino_id == execucao_treino_id)
+            .order_by(Serie.id)
+        ):
+            series[db_serie.execucao_exercicio_id].append(db_serie)
+        return series
+
     def create_with_exercicios(self, db: Session, *, obj_in: ExecucaoTreinoCreate, usuario_id: int) -> ExecucaoTreino:
         # Mapear nomes de campos do frontend para o modelo, se necessário
         db_obj_data = obj_in.model_dump(exclude={"exercicios_executados"}) # Exclui a lista de exercícios por enquanto
@@ -28,74 +162,40 @@ class CRUDExecucaoTreino(CRUDBase[ExecucaoTreino, ExecucaoTreinoCreate, Execucao
         db.add(db_execucao_treino)
         db.flush() # Para obter o ID da execucao_treino antes de adicionar exercícios
 
-        for ex_exec_in in obj_in.exercicios_executados:
-            db_ex_exec_data = ex_exec_in.model_dump(exclude={"series"})
-            db_ex_exec_data['execucao_treino_id'] = db_execucao_treino.id
-            
-            db_execucao_exercicio = ExecucaoExercicio(**db_ex_exec_data)
-            db.add(db_execucao_exercicio)
-            db.flush() # Para obter o ID da execucao_exercicio antes de adicionar séries
-
-            for serie_in in ex_exec_in.series:
-                db_serie_data = serie_in.model_dump()
-                db_serie_data['execucao_exercicio_id'] = db_execucao_exercicio.id
-                db_serie = Serie(**db_serie_data)
-                db.add(db_serie)
+        adicionadas = self._inserir_exercicios(
+            db,
+            execucao_treino_id=db_execucao_treino.id,
+            exercicios=[
+                (ex_exec_in.model_dump(exclude={"series"}), [serie_in.model_dump() for serie_in in ex_exec_in.series])
+                for ex_exec_in in obj_in.exercicios_executados
+            ],
+        )
+        self._atualizar_agregados(db, db_obj=db_execucao_treino, adicionadas=adicionadas, execucoes=1)
         
         db.commit()
         db.refresh(db_execucao_treino)
         return db_execucao_treino
 
     def get_multi_by_usuario_and_treino_fixo(
-        self, db: Session, *, usuario_id: int, treino_fixo_id: Optional[int] = None, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        treino_fixo_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
     ) -> List[ExecucaoTreino]:
-        query = (
-            db.query(self.model)
-            .filter(ExecucaoTreino.usuario_id == usuario_id)
-            .options(
-                selectinload(ExecucaoTreino.exercicios_executados)
-                .selectinload(ExecucaoExercicio.series),
-                selectinload(ExecucaoTreino.exercicios_executados)
-                .joinedload(ExecucaoExercicio.exercicio) # Usar joinedload para carregar o nome do exercício
-            )
-            .order_by(ExecucaoTreino.data_inicio.desc())
-        )
-        if treino_fixo_id:
-            query = query.filter(ExecucaoTreino.treino_fixo_id == treino_fixo_id)
-        
-        return query.offset(skip).limit(limit).all()
+        query = self.paginar(_select_por_usuario(usuario_id, treino_fixo_id), cursor=cursor, skip=skip, limit=limit)
+        return db.scalars(query).all()
 
     def get_multi_by_usuario(
-        self, db: Session, *, usuario_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, *, usuario_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[ExecucaoTreino]:
-        return (
-            db.query(self.model)
-            .filter(ExecucaoTreino.usuario_id == usuario_id)
-            .options(
-                selectinload(ExecucaoTreino.treino_fixo), # Carregar o TreinoFixo associado
-                selectinload(ExecucaoTreino.exercicios_executados)
-                .selectinload(ExecucaoExercicio.series),
-                selectinload(ExecucaoTreino.exercicios_executados)
-                .joinedload(ExecucaoExercicio.exercicio)
-            )
-            .order_by(ExecucaoTreino.data_inicio.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return db.scalars(self.paginar(_select_por_usuario(usuario_id), cursor=cursor, skip=skip, limit=limit)).all()
     
     def get_full_details(self, db: Session, *, id: int, usuario_id: int) -> Optional[ExecucaoTreino]:
-        return (
-            db.query(self.model)
-            .options(
-                selectinload(ExecucaoTreino.exercicios_executados)
-                .selectinload(ExecucaoExercicio.series),
-                selectinload(ExecucaoTreino.exercicios_executados)
-                .joinedload(ExecucaoExercicio.exercicio) # Carrega o objeto Exercicio relacionado
-            )
-            .filter(ExecucaoTreino.id == id, ExecucaoTreino.usuario_id == usuario_id)
-            .first()
-        )
+        return db.scalar(_select_detalhes(id, usuario_id))
     
     # Você pode adicionar um método de atualização mais granular se necessário,
     # por exemplo, para finalizar um treino (atualizar data_fim, observacoes_gerais)
@@ -107,50 +207,156 @@ class CRUDExecucaoTreino(CRUDBase[ExecucaoTreino, ExecucaoTreinoCreate, Execucao
             update_data['peso_usuario'] = update_data.pop('peso_corporal')
         if 'observacoes_gerais' in update_data:
             update_data['observacoes'] = update_data.pop('observacoes_gerais')
+        peso_alterado = 'peso_usuario' in update_data and update_data['peso_usuario'] != db_obj.peso_usuario
 
         for field, value in update_data.items():
-            setattr(db_obj, field, value)        # Atualiza os exercícios executados e suas séries
+            setattr(db_obj, field, value)
+
+        # Séries alteradas, gravadas e removidas, para atualizar os agregados apenas com a diferença
+        series_removidas: List[ResumoSerie] = []
+        series_adicionadas: List[ResumoSerie] = []
+
+        # Atualiza os exercícios executados e suas séries
         if obj_in.exercicios_executados:
-            # Criar um mapa dos exercícios existentes por (exercicio_id, ordem)
-            exercicios_existentes_map = {(ee.exercicio_id, ee.ordem): ee for ee in db_obj.exercicios_executados}
+            # Criar um mapa dos exercícios existentes por (exercicio_id, ordem), lidos em uma query
+            # (db_obj pode vir sem relacionamentos carregados, ver get_simples)
+            exercicios_existentes_map = {
+                (ee.exercicio_id, ee.ordem): ee
+                for ee in db.scalars(
+                    select(ExecucaoExercicio).where(ExecucaoExercicio.execucao_treino_id == db_obj.id)
+                )
+            }
+            series_existentes = self._series_por_exercicio(db, execucao_treino_id=db_obj.id)
+            exercicios_novos = []
+            series_novas = []
             
             for ex_update_in in obj_in.exercicios_executados:
                 # Buscar o exercício existente por exercicio_id e ordem
                 chave_exercicio = (ex_update_in.exercicio_id, ex_update_in.ordem)
                 
-                if chave_exercicio in exercicios_existentes_map:
-                    # Atualizar exercício existente
-                    db_execucao_exercicio = exercicios_existentes_map[chave_exercicio]
-                    if ex_update_in.observacoes is not None:
-                        db_execucao_exercicio.observacoes = ex_update_in.observacoes
-                else:
-                    # Criar novo exercício se não existe
-                    db_ex_exec_data = ex_update_in.model_dump(exclude={"series"})
-                    db_ex_exec_data['execucao_treino_id'] = db_obj.id
-                    
-                    db_execucao_exercicio = ExecucaoExercicio(**db_ex_exec_data)
-                    db.add(db_execucao_exercicio)
-                    db.flush()  # Para obter o ID antes de adicionar séries
-                
-                # Atualizar ou criar séries do exercício
-                if ex_update_in.series:
-                    # Remover séries existentes e criar novas (estratégia mais simples)
-                    # Em uma implementação mais sofisticada, você poderia tentar preservar séries existentes
-                    for serie_existente in db_execucao_exercicio.series:
+                if chave_exercicio not in exercicios_existentes_map:
+                    # Exercícios novos são gravados em lote junto com suas séries
+                    exercicios_novos.append((
+                        ex_update_in.model_dump(exclude={"series"}),
+                        [serie_in.model_dump() for serie_in in ex_update_in.series or []],
+                    ))
+                    continue
+
+                db_execucao_exercicio = exercicios_existentes_map[chave_exercicio]
+                if ex_update_in.observacoes is not None:
+                    db_execucao_exercicio.observacoes = ex_update_in.observacoes
+                if not ex_update_in.series:
+                    continue
+
+                # Reconciliar por ordem: só as séries alteradas, novas ou ausentes geram escrita
+                exercicio_id = db_execucao_exercicio.exercicio_id
+                existentes: Dict[int, List[Serie]] = defaultdict(list)
+                for serie_existente in series_existentes.get(db_execucao_exercicio.id, []):
+                    existentes[serie_existente.ordem].append(serie_existente)
+
+                for serie_in in ex_update_in.series:
+                    dados = serie_in.model_dump()
+                    mesma_ordem = existentes.get(serie_in.ordem)
+                    if not mesma_ordem:
+                        series_novas.append((exercicio_id, {**dados, "execucao_exercicio_id": db_execucao_exercicio.id}))
+                        continue
+                    db_serie = mesma_ordem.pop(0)
+                    if all(getattr(db_serie, campo) == valor for campo, valor in dados.items()):
+                        continue
+                    series_removidas.append(_resumo_serie(db_serie, exercicio_id))
+                    for campo, valor in dados.items():
+                        setattr(db_serie, campo, valor)
+                    series_adicionadas.append(_resumo_serie(db_serie, exercicio_id))
+
+                for sobras in existentes.values():
+                    for serie_existente in sobras:
+                        series_removidas.append(_resumo_serie(serie_existente, exercicio_id))
                         db.delete(serie_existente)
-                    
-                    # Adicionar novas séries
-                    for serie_in in ex_update_in.series:
-                        db_serie_data = serie_in.model_dump()
-                        db_serie_data['execucao_exercicio_id'] = db_execucao_exercicio.id
-                        db_serie = Serie(**db_serie_data)
-                        db.add(db_serie)
+
+            db.flush()
+            serie_ids = _inserir_em_lote(db, Serie, [linha for _, linha in series_novas])
+            series_adicionadas += [
+                ResumoSerie(exercicio_id, linha["repeticoes"], linha["peso"], linha["concluida"], serie_id)
+                for (exercicio_id, linha), serie_id in zip(series_novas, serie_ids)
+            ]
+            series_adicionadas += self._inserir_exercicios(db, execucao_treino_id=db_obj.id, exercicios=exercicios_novos)
+
+        db.flush()
+        self._atualizar_agregados(
+            db, db_obj=db_obj, adicionadas=series_adicionadas, removidas=series_removidas, peso_alterado=peso_alterado
+        )
 
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def atualizar_series(
+        self,
+        db: Session,
+        *,
+        db_obj: ExecucaoTreino,
+        alteracoes: Sequence[Tuple[int, int, Dict[str, Any]]],
+    ) -> Optional[List[Tuple[int, Serie]]]:
+        """
+        Altera apenas as séries indicadas por (ordem do exercício, ordem da série, campos), carregadas
+        em uma única query, e propaga aos agregados só as que mudaram. Retorna (ordem do exercício,
+        série) de cada alteração, ou None sem gravar nada se alguma série não existir.
+        """
+        chaves = {(exercicio_ordem, serie_ordem) for exercicio_ordem, serie_ordem, _ in alteracoes}
+        if not chaves:
+            return []
+        encontradas = {
+            (exercicio_ordem, db_serie.ordem): (exercicio_id, db_serie)
+            for db_serie, exercicio_id, exercicio_ordem in db.execute(
+                select(Serie, ExecucaoExercicio.exercicio_id, ExecucaoExercicio.ordem)
+                .join(ExecucaoExercicio, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+                .where(
+                    ExecucaoExercicio.execucao_treino_id == db_obj.id,
+                    tuple_(ExecucaoExercicio.ordem, Serie.ordem).in_(chaves),
+                )
+                .order_by(Serie.id.desc()) # com ordens repetidas, vale a primeira série gravada
+            )
+        }
+        if chaves - encontradas.keys():
+            return None
+
+        series_removidas: List[ResumoSerie] = []
+        series_adicionadas: List[ResumoSerie] = []
+        resultado = []
+        for exercicio_ordem, serie_ordem, dados in alteracoes:
+            exercicio_id, db_serie = encontradas[(exercicio_ordem, serie_ordem)]
+            resultado.append((exercicio_ordem, db_serie))
+            if all(getattr(db_serie, campo) == valor for campo, valor in dados.items()):
+                continue
+            series_removidas.append(_resumo_serie(db_serie, exercicio_id))
+            for campo, valor in dados.items():
+                setattr(db_serie, campo, valor)
+            series_adicionadas.append(_resumo_serie(db_serie, exercicio_id))
+
+        if series_adicionadas:
+            db.flush()
+            self._atualizar_agregados(db, db_obj=db_obj, adicionadas=series_adicionadas, removidas=series_removidas)
+            db.commit()
+        return resultado
+
+    def atualizar_exercicio(
+        self, db: Session, *, db_obj: ExecucaoTreino, ordem: int, obj_in: Dict[str, Any]
+    ) -> Optional[ExecucaoExercicio]:
+        """Altera os campos próprios de um exercício executado (não as séries), localizado pela ordem."""
+        db_execucao_exercicio = db.scalar(
+            select(ExecucaoExercicio)
+            .where(ExecucaoExercicio.execucao_treino_id == db_obj.id, ExecucaoExercicio.ordem == ordem)
+            .order_by(ExecucaoExercicio.id)
+            .limit(1)
+        )
+        if db_execucao_exercicio is None:
+            return None
+        for campo, valor in obj_in.items():
+            setattr(db_execucao_exercicio, campo, valor)
+        db.commit()
+        return db_execucao_exercicio
+
     def start_execution(self, db: Session, *, obj_in: Any, usuario_id: int) -> ExecucaoTreino:
         """
         Iniciar uma nova execução de treino com dados mínimos (treino_fixo_id, data_inicio, peso_corporal opcional)
@@ -180,34 +386,25 @@ class CRUDExecucaoTreino(CRUDBase[ExecucaoTreino, ExecucaoTreinoCreate, Execucao
             .first()
         )
         
+        exercicios = []
         if treino_fixo and treino_fixo.exercicios_treino:
             # Criar exercícios de execução baseados no template
             for exercicio_template in treino_fixo.exercicios_treino:
-                # Criar o exercício de execução
-                db_execucao_exercicio = ExecucaoExercicio(
-                    execucao_treino_id=db_execucao_treino.id,
-                    exercicio_id=exercicio_template.exercicio_id,
-                    ordem=exercicio_template.ordem,
-                    observacoes=""  # Observações vazias para serem preenchidas durante a execução
-                )
-                db.add(db_execucao_exercicio)
-                db.flush()  # Para obter o ID antes de adicionar séries                # Criar séries baseadas no template ou configuração personalizada
                 exercicio_config = None
                 if hasattr(obj_in, 'exercicios_config') and obj_in.exercicios_config:
                     exercicio_config = obj_in.exercicios_config.get(str(exercicio_template.exercicio_id))
                 
+                series = []
                 for serie_ordem in range(1, exercicio_template.series + 1):
                     # Inicializar valores padrão
                     repeticoes_padrao = None
                     peso_padrao = None
-                    tempo_padrao = None
                     
                     # Verificar se há configuração personalizada para esta série
                     if exercicio_config and len(exercicio_config.get('series', [])) >= serie_ordem:
                         serie_config = exercicio_config['series'][serie_ordem - 1]
                         repeticoes_padrao = serie_config.get('repeticoes')
                         peso_padrao = serie_config.get('peso')
-                        tempo_padrao = serie_config.get('tempo')
                     
                     # Se não há configuração personalizada, usar valores recomendados do template
                     if repeticoes_padrao is None and exercicio_template.repeticoes_recomendadas:
@@ -224,26 +421,171 @@ class CRUDExecucaoTreino(CRUDBase[ExecucaoTreino, ExecucaoTreinoCreate, Execucao
                             # Se não conseguir converter, deixa None
                             pass
                     
-                    db_serie = Serie(
-                        execucao_exercicio_id=db_execucao_exercicio.id,
-                        ordem=serie_ordem,
-                        repeticoes=repeticoes_padrao,
-                        peso=peso_padrao,
-                        tempo=tempo_padrao,
-                        concluida=False
-                    )
-                    db.add(db_serie)
+                    series.append({
+                        "ordem": serie_ordem,
+                        "repeticoes": repeticoes_padrao,
+                        "peso": peso_padrao,
+                        "concluida": False,
+                    })
+
+                exercicios.append((
+                    {
+                        "exercicio_id": exercicio_template.exercicio_id,
+                        "ordem": exercicio_template.ordem,
+                        "observacoes": "",  # Observações vazias para serem preenchidas durante a execução
+                    },
+                    series,
+                ))
+        self._inserir_exercicios(db, execucao_treino_id=db_execucao_treino.id, exercicios=exercicios)
+
+        # Séries iniciadas como não concluídas não contam volume; só o dia treinado é registrado
+        self._atualizar_agregados(db, db_obj=db_execucao_treino, execucoes=1)
         
         db.commit()
         db.refresh(db_execucao_treino)
         return db_execucao_treino
 
+    def remove(self, db: Session, *, id: int) -> ExecucaoTreino:
+        """
+        Remove a execução descontando suas séries dos agregados. As séries são lidas só como
+        resumo; exercícios e séries saem pelo ON DELETE CASCADE do banco (passive_deletes).
+        """
+        db_obj = db.get(self.model, id)
+        removidas = [
+            ResumoSerie(*linha)
+            for linha in db.execute(
+                select(ExecucaoExercicio.exercicio_id, Serie.repeticoes, Serie.peso, Serie.concluida, Serie.id)
+                .join(Serie, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+                .where(ExecucaoExercicio.execucao_treino_id == id)
+            )
+        ]
+        db.delete(db_obj)
+        db.flush()
+        self._atualizar_agregados(db, db_obj=db_obj, removidas=removidas, execucoes=-1)
+        db.commit()
+        return db_obj
+
+class CRUDExecucaoTreinoAsync(AsyncCRUDBase[ExecucaoTreino, ExecucaoTreinoCreate, ExecucaoTreinoUpdate]):
+    """
+    Execuções sobre AsyncSession. As escritas que mantêm os agregados reutilizam a implementação
+    síncrona via AsyncSession.run_sync, que roda no greenlet do SQLAlchemy sem ocupar uma thread.
+    """
+    carregar = _CARGA_EXECUCAO
+    chave_cursor = CRUDExecucaoTreino.chave_cursor
+    cursor_descendente = CRUDExecucaoTreino.cursor_descendente
+
+    async def get_multi_by_usuario_and_treino_fixo(
+        self,
+        db: AsyncSession,
+        *,
+        usuario_id: int,
+        treino_fixo_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[ExecucaoTreino]:
+        query = self.paginar(_select_por_usuario(usuario_id, treino_fixo_id), cursor=cursor, skip=skip, limit=limit)
+        return (await db.scalars(query)).all()
+
+    async def get_multi_by_usuario(
+        self, db: AsyncSession, *, usuario_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[ExecucaoTreino]:
+        query = self.paginar(_select_por_usuario(usuario_id), cursor=cursor, skip=skip, limit=limit)
+        return (await db.scalars(query)).all()
+
+    async def get_full_details(self, db: AsyncSession, *, id: int, usuario_id: int) -> Optional[ExecucaoTreino]:
+        return await db.scalar(_select_detalhes(id, usuario_id))
+
+    async def create_with_exercicios(
+        self, db: AsyncSession, *, obj_in: ExecucaoTreinoCreate, usuario_id: int
+    ) -> ExecucaoTreino:
+        db_obj = await db.run_sync(execucao_treino.create_with_exercicios, obj_in=obj_in, usuario_id=usuario_id)
+        return await self._recarregar(db, db_obj)
+
+    async def finalizar_treino(
+        self, db: AsyncSession, *, db_obj: ExecucaoTreino, obj_in: ExecucaoTreinoUpdate
+    ) -> ExecucaoTreino:
+        db_obj = await db.run_sync(execucao_treino.finalizar_treino, db_obj=db_obj, obj_in=obj_in)
+        return await self._recarregar(db, db_obj)
+
+    async def get_simples(self, db: AsyncSession, *, id: int) -> Optional[ExecucaoTreino]:
+        """Apenas a linha da execução, sem exercícios e séries (permissão e escritas granulares)."""
+        return await db.get(ExecucaoTreino, id)
+
+    async def atualizar_series(
+        self, db: AsyncSession, *, db_obj: ExecucaoTreino, alteracoes: Sequence[Tuple[int, int, Dict[str, Any]]]
+    ) -> Optional[List[Tuple[int, Serie]]]:
+        return await db.run_sync(execucao_treino.atualizar_series, db_obj=db_obj, alteracoes=alteracoes)
+
+    async def atualizar_exercicio(
+        self, db: AsyncSession, *, db_obj: ExecucaoTreino, ordem: int, obj_in: Dict[str, Any]
+    ) -> Optional[ExecucaoExercicio]:
+        return await db.run_sync(execucao_treino.atualizar_exercicio, db_obj=db_obj, ordem=ordem, obj_in=obj_in)
+
+    async def start_execution(self, db: AsyncSession, *, obj_in: Any, usuario_id: int) -> ExecucaoTreino:
+        db_obj = await db.run_sync(execucao_treino.start_execution, obj_in=obj_in, usuario_id=usuario_id)
+        return await self._recarregar(db, db_obj)
+
+    async def remove(self, db: AsyncSession, *, id: int) -> ExecucaoTreino:
+        return await db.run_sync(execucao_treino.remove, id=id)
+
 class CRUDExecucaoExercicio(CRUDBase[ExecucaoExercicio, ExecucaoExercicioCreate, ExecucaoExercicioUpdate]):
     pass
 
 class CRUDSerie(CRUDBase[Serie, SerieCreate, SerieUpdate]):
-    pass
+
+    def _inicio_periodo(self, db: Session, agrupamento: str):
+        """Expressão SQL com o primeiro dia da semana (segunda) ou do mês de data_inicio."""
+        coluna = ExecucaoTreino.data_inicio
+        if db.get_bind().dialect.name == "sqlite":
+            if agrupamento == "semana":
+                return func.date(coluna, "weekday 0", "-6 days")
+            return func.date(coluna, "start of month")
+        return func.date(func.date_trunc("week" if agrupamento == "semana" else "month", coluna))
+
+    def get_distribuicao_grupos(
+        self,
+        db: Session,
+        *,
+        usuario_id: int,
+        data_inicio: datetime,
+        data_fim: datetime,
+        agrupamento: Optional[str] = None,
+    ) -> List[Tuple]:
+        """
+        Séries concluídas, repetições e tonelagem por grupo muscular (e opcionalmente por semana/mês),
+        agregadas no banco com GROUP BY: só as somas trafegam, nenhum objeto ORM é instanciado.
+        """
+        colunas = [
+            ExercicioModel.grupo_muscular,
+            func.count(Serie.id),
+            func.coalesce(func.sum(Serie.repeticoes), 0),
+            func.coalesce(func.sum(Serie.repeticoes * Serie.peso), 0),
+        ]
+        agrupar_por = [ExercicioModel.grupo_muscular]
+        if agrupamento in ("semana", "mes"):
+            periodo = self._inicio_periodo(db, agrupamento).label("periodo_inicio")
+            colunas.insert(0, periodo)
+            agrupar_por.insert(0, periodo)
+
+        query = (
+            db.query(*colunas)
+            .select_from(Serie)
+            .join(ExecucaoExercicio, Serie.execucao_exercicio_id == ExecucaoExercicio.id)
+            .join(ExecucaoTreino, ExecucaoExercicio.execucao_treino_id == ExecucaoTreino.id)
+            .join(ExercicioModel, ExecucaoExercicio.exercicio_id == ExercicioModel.id)
+            .filter(
+                ExecucaoTreino.usuario_id == usuario_id,
+                ExecucaoTreino.data_inicio >= data_inicio,
+                ExecucaoTreino.data_inicio < data_fim,
+                Serie.concluida == True,
+            )
+            .group_by(*agrupar_por)
+            .order_by(*agrupar_por)
+        )
+        return query.all()
 
 execucao_treino = CRUDExecucaoTreino(ExecucaoTreino)
+execucao_treino_async = CRUDExecucaoTreinoAsync(ExecucaoTreino)
 execucao_exercicio = CRUDExecucaoExercicio(ExecucaoExercicio)
 serie = CRUDSerie(Serie)
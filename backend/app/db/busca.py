@@ -0,0 +1,105 @@
+# Full-text search index for the exercise catalog
+"""
+Índice de texto completo sobre nome, descrição e instruções dos exercícios. No SQLite é uma
+tabela FTS5 de conteúdo externo (exercicio_busca, com rowid = exercicio.id) mantida por
+triggers; no PostgreSQL, um índice GIN sobre o tsvector das mesmas colunas. Nos dois casos a
+sincronização fica no banco, então inserções, UPDATEs em lote e exclusões em cascata também
+atualizam o índice.
+
+criar_indice_busca roda depois do CREATE TABLE exercicio (evento after_create em
+app/models/exercise.py); a migração 8 tem sua própria cópia congelada deste DDL.
+"""
+import re
+from typing import List
+
+from sqlalchemy import ColumnElement, Select, column, func, literal_column, table
+from sqlalchemy.engine import Connection
+
+TABELA_BUSCA = "exercicio_busca"
+INDICE_BUSCA_PG = "ix_exercicio_busca"
+COLUNAS_BUSCA = ("nome", "descricao", "instrucoes")
+PESOS_BUSCA = (10.0, 2.0, 1.0) # bm25 por coluna: o nome pesa mais que o texto livre
+
+_TERMO = re.compile(r"\w+")
+
+# Triggers da tabela de conteúdo externo (https://sqlite.org/fts5.html#external_content_tables)
+_TRIGGERS_SQLITE = (
+    """
+        CREATE TRIGGER IF NOT EXISTS exercicio_busca_ai AFTER INSERT ON exercicio BEGIN
+            INSERT INTO exercicio_busca (rowid, nome, descricao, instrucoes)
+            VALUES (new.id, new.nome, new.descricao, new.instrucoes);
+        END""",
+    """
+        CREATE TRIGGER IF NOT EXISTS exercicio_busca_ad AFTER DELETE ON exercicio BEGIN
+            INSERT INTO exercicio_busca (exercicio_busca, rowid, nome, descricao, instrucoes)
+            VALUES ('delete', old.id, old.nome, old.descricao, old.instrucoes);
+        END""",
+    """
+        CREATE TRIGGER IF NOT EXISTS exercicio_busca_au AFTER UPDATE OF nome, descricao, instrucoes ON exercicio BEGIN
+            INSERT INTO exercicio_busca (exercicio_busca, rowid, nome, descricao, instrucoes)
+            VALUES ('delete', old.id, old.nome, old.descricao, old.instrucoes);
+            INSERT INTO exercicio_busca (rowid, nome, descricao, instrucoes)
+            VALUES (new.id, new.nome, new.descricao, new.instrucoes);
+        END""",
+)
+
+def _documento_pg() -> str:
+    return "to_tsvector('simple', " + " || ' ' || ".join(f"coalesce({c}, '')" for c in COLUNAS_BUSCA) + ")"
+
+def criar_indice_busca(conn: Connection) -> None:
+    """Cria o índice (e no SQLite os triggers) se não existir e reindexa a tabela exercicio."""
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+            f"{', '.join(COLUNAS_BUSCA)}, content='exercicio', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        for ddl in _TRIGGERS_SQLITE:
+            conn.exec_driver_sql(ddl)
+        # Reconstrói a partir do conteúdo: vale para tabela nova, recriada ou já populada
+        conn.exec_driver_sql(f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}) VALUES ('rebuild')")
+    elif conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {INDICE_BUSCA_PG} ON exercicio USING gin ({_documento_pg()})")
+
+def remover_indice_busca(conn: Connection) -> None:
+    """Remove a tabela FTS5 (os triggers e o índice GIN caem junto com a tabela exercicio)."""
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {TABELA_BUSCA}")
+
+def termos(q: str) -> List[str]:
+    """Palavras da busca; pontuação e operadores da sintaxe de consulta são descartados."""
+    return _TERMO.findall(q.lower())
+
+def consulta_fts5(palavras: List[str]) -> str:
+    """Todas as palavras, cada uma como prefixo: "sup" "ret" casa com "Supino Reto"."""
+    return " ".join(f'"{p}"*' for p in palavras)
+
+def consulta_tsquery(palavras: List[str]) -> str:
+    return " & ".join(f"{p}:*" for p in palavras)
+
+def aplicar_busca(query: Select, id_exercicio: ColumnElement, dialeto: str, palavras: List[str]) -> Select:
+    """
+    Restringe `query` (um select de Exercicio) aos exercícios que casam com todas as palavras,
+    do mais relevante para o menos. Fora do SQLite e do PostgreSQL cai em LIKE por prefixo de
+    palavra no nome, sem ranking.
+    """
+    if dialeto == "sqlite":
+        fts = table(TABELA_BUSCA, column("rowid"))
+        documento = literal_column(TABELA_BUSCA)
+        return (
+            query.join(fts, fts.c.rowid == id_exercicio)
+            .where(documento.op("MATCH")(consulta_fts5(palavras)))
+            .order_by(func.bm25(documento, *PESOS_BUSCA), id_exercicio) # bm25: menor é melhor
+        )
+    if dialeto == "postgresql":
+        # O mesmo tsvector do índice GIN, para que o planner use o índice
+        documento = literal_column(_documento_pg())
+        consulta = func.to_tsquery("simple", consulta_tsquery(palavras))
+        return (
+            query.where(documento.op("@@")(consulta))
+            .order_by(func.ts_rank(documento, consulta).desc(), id_exercicio)
+        )
+    nome = id_exercicio.table.c.nome
+    for palavra in palavras:
+        query = query.where(nome.ilike(f"{palavra}%") | nome.ilike(f"% {palavra}%"))
+    return query.order_by(id_exercicio)
@@ -0,0 +1,134 @@
+# Per-request SQL instrumentation
+"""
+Conta os statements emitidos durante uma medição (por padrão, uma requisição HTTP), o tempo
+gasto no banco e quantas vezes cada statement se repetiu. Statements iguais a menos dos
+parâmetros têm a mesma impressão digital; muitas repetições da mesma impressão em uma
+requisição são o sintoma de um carregamento N+1.
+
+Os hooks ficam nos engines (instrumentar, chamado por create_db_engine/create_async_db_engine)
+e só registram quando há uma medição ativa no contexto (medir_consultas), então fora de uma
+requisição o custo é uma leitura de ContextVar por statement.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_LISTA_PARAMETROS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)") # IN (?, ?, ?) e VALUES (?, ?)
+_LINHAS_VALUES = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")       # VALUES (?), (?), (?)
+_ESPACOS = re.compile(r"\s+")
+
+def impressao_digital(statement: str) -> str:
+    """Statement normalizado: listas de parâmetros de tamanhos diferentes contam como a mesma query."""
+    normalizado = _ESPACOS.sub(" ", statement).strip()
+    normalizado = _LISTA_PARAMETROS.sub("(?)", normalizado)
+    return _LINHAS_VALUES.sub(r"\1", normalizado)
+
+class ConsultasRequisicao:
+    """Statements de uma medição. Medições aninhadas também somam na de fora (`pai`)."""
+
+    def __init__(self, pai: Optional["ConsultasRequisicao"] = None) -> None:
+        self.pai = pai
+        self.statements = 0
+        self.tempo_db = 0.0 # segundos
+        self.impressoes: Counter = Counter()
+
+    def registrar(self, statement: str, duracao: float) -> None:
+        impressao = impressao_digital(statement)
+        registro: Optional[ConsultasRequisicao] = self
+        while registro is not None:
+            registro.statements += 1
+            registro.tempo_db += duracao
+            registro.impressoes[impressao] += 1
+            registro = registro.pai
+
+    @property
+    def repetidas(self) -> Dict[str, int]:
+        """Impressões emitidas mais de uma vez, das mais repetidas para as menos."""
+        return {impressao: n for impressao, n in self.impressoes.most_common() if n > 1}
+
+    @property
+    def statements_repetidos(self) -> int:
+        """Statements que repetiram uma impressão já vista (0 sem nenhuma repetição)."""
+        return sum(n - 1 for n in self.repetidas.values())
+
+    def resumo(self) -> str:
+        linhas = [f"{self.statements} statement(s), {self.tempo_db * 1000:.2f} ms no banco"]
+        linhas += [f"  {n}x {impressao}" for impressao, n in self.impressoes.most_common()]
+        return "\n".join(linhas)
+
+_atual: ContextVar[Optional[ConsultasRequisicao]] = ContextVar("consultas_requisicao", default=None)
+
+@contextmanager
+def medir_consultas() -> Iterator[ConsultasRequisicao]:
+    """Registra os statements emitidos no contexto atual (inclusive no threadpool e em run_sync)."""
+    registro = ConsultasRequisicao(pai=_atual.get())
+    token = _atual.set(registro)
+    try:
+        yield registro
+    finally:
+        _atual.reset(token)
+
+def _antes(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _atual.get() is not None:
+        context._instrumentacao_inicio = time.perf_counter()
+
+def _depois(conn, cursor, statement, parameters, context, executemany) -> None:
+    registro = _atual.get()
+    inicio = getattr(context, "_instrumentacao_inicio", None)
+    if registro is not None and inicio is not None:
+        registro.registrar(statement, time.perf_counter() - inicio)
+
+def instrumentar(engine: Engine) -> None:
+    """Liga os hooks de medição ao engine (síncrono; para AsyncEngine use .sync_engine)."""
+    if not event.contains(engine, "before_cursor_execute", _antes):
+        event.listen(engine, "before_cursor_execute", _antes)
+        event.listen(engine, "after_cursor_execute", _depois)
+
+class InstrumentacaoSQLMiddleware:
+    """
+    Mede cada requisição HTTP. Com `cabecalhos`, a resposta leva X-DB-Queries, X-DB-Time-Ms e
+    X-DB-Repeated (statements repetidos); com `limite_repeticoes` > 0, uma impressão repetida
+    mais vezes que isso gera um aviso no log com a rota e o statement.
+    """
+
+    def __init__(self, app: ASGIApp, *, cabecalhos: bool = False, limite_repeticoes: int = 0) -> None:
+        self.app = app
+        self.cabecalhos = cabecalhos
+        self.limite_repeticoes = limite_repeticoes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with medir_consultas() as registro:
+            async def enviar(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    self._avisar_repeticoes(scope, registro)
+                    if self.cabecalhos:
+                        headers = MutableHeaders(scope=message)
+                        headers["X-DB-Queries"] = str(registro.statements)
+                        headers["X-DB-Time-Ms"] = f"{registro.tempo_db * 1000:.2f}"
+                        headers["X-DB-Repeated"] = str(registro.statements_repetidos)
+                await send(message)
+
+            await self.app(scope, receive, enviar)
+
+    def _avisar_repeticoes(self, scope: Scope, registro: ConsultasRequisicao) -> None:
+        if self.limite_repeticoes <= 0:
+            return
+        for impressao, n in registro.repetidas.items():
+            if n <= self.limite_repeticoes:
+                break
+            logger.warning("Possível N+1 em %s %s: %dx %s", scope["method"], scope["path"], n, impressao)
@@ -0,0 +1,23 @@
+# Timestamp with sub-second precision for the ETag watermark columns
+"""
+agora_preciso() é o instante da escrita com frações de segundo. No SQLite, func.now() vira
+CURRENT_TIMESTAMP, que só tem segundos: duas escritas no mesmo segundo deixariam a mesma
+data_atualizacao e o ETag de GET /treinos/{id} não mudaria. Só as colunas que compõem a marca
+d'água (crud_workout.marca_dagua) usam esta função; as demais seguem com func.now().
+"""
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
+
+class agora_preciso(FunctionElement):
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(agora_preciso)
+def _agora_preciso(element, compiler, **kw) -> str:
+    return compiler.process(func.now(), **kw) # now() do PostgreSQL já tem microssegundos
+
+@compiles(agora_preciso, "sqlite")
+def _agora_preciso_sqlite(element, compiler, **kw) -> str:
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
@@ -0,0 +1,80 @@
+# Schema migration runner
+"""
+Aplica as migrações de app/db/migrations em ordem, cada uma em sua própria transação,
+registrando a versão na tabela versao_esquema. Rodado uma vez por deploy (python migrate.py);
+a aplicação só confere a versão na inicialização (verificar_versao).
+"""
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.migrations import MIGRACOES, VERSAO_ATUAL
+
+# Fora de Base.metadata: create_all/drop_all dos modelos não devem tocar no controle de versão
+_metadata = MetaData()
+versao_esquema = Table(
+    "versao_esquema",
+    _metadata,
+    Column("versao", Integer, primary_key=True, autoincrement=False),
+    Column("descricao", String(255), nullable=False),
+    Column("aplicada_em", DateTime, nullable=False),
+)
+
+class EsquemaDesatualizado(RuntimeError):
+    pass
+
+def versao_banco(conn: Connection) -> int:
+    """Versão aplicada no banco (0 quando nenhuma migração rodou)."""
+    if not inspect(conn).has_table(versao_esquema.name):
+        return 0
+    return conn.execute(select(func.max(versao_esquema.c.versao))).scalar() or 0
+
+def migrar(engine: Engine) -> List[int]:
+    """Aplica as migrações pendentes e devolve as versões aplicadas."""
+    with engine.begin() as conn:
+        versao_esquema.create(conn, checkfirst=True)
+    aplicadas = []
+    for migracao in MIGRACOES:
+        with engine.connect() as conn:
+            # No SQLite, recriar uma tabela com foreign_keys ligado dispararia os ON DELETE CASCADE
+            # dos filhos; o pragma só pode mudar fora de transação, por isso antes do begin
+            sqlite = conn.dialect.name == "sqlite"
+            if sqlite:
+                conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+                conn.commit()
+            try:
+                with conn.begin():
+                    if migracao.VERSAO <= versao_banco(conn):
+                        continue
+                    migracao.upgrade(conn)
+                    conn.execute(versao_esquema.insert().values(
+                        versao=migracao.VERSAO, descricao=migracao.DESCRICAO, aplicada_em=datetime.now()
+                    ))
+            finally:
+                if sqlite:
+                    conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+                    conn.commit()
+        aplicadas.append(migracao.VERSAO)
+    return aplicadas
+
+def verificar_versao(engine: Engine) -> None:
+    """Checagem barata feita na inicialização: uma única query na tabela de versões."""
+    with engine.connect() as conn:
+        versao = versao_banco(conn)
+    if versao < VERSAO_ATUAL:
+        raise EsquemaDesatualizado(
+            f"Banco na versão {versao} do esquema, a aplicação requer a {VERSAO_ATUAL}. Rode: python migrate.py"
+        )
+
+def main() -> None:
+    from app.db.session import engine
+
+    aplicadas = migrar(engine)
+    if aplicadas:
+        for versao in aplicadas:
+            print(f"Migração {versao} aplicada.")
+    else:
+        print("Nenhuma migração pendente.")
+    print(f"Esquema na versão {VERSAO_ATUAL}.")
@@ -0,0 +1,26 @@
+# Migrações versionadas, em ordem. Ao criar uma nova, adicione o módulo ao final da lista.
+from app.db.migrations import (
+    m0001_esquema_inicial,
+    m0002_duracao_minutos,
+    m0003_estatisticas,
+    m0004_versao_token,
+    m0005_indices_historico,
+    m0006_chave_cursor_historico,
+    m0007_exclusao_em_cascata,
+    m0008_busca_exercicios,
+    m0009_exercicio_sem_cascata,
+)
+
+MIGRACOES = [
+    m0001_esquema_inicial,
+    m0002_duracao_minutos,
+    m0003_estatisticas,
+    m0004_versao_token,
+    m0005_indices_historico,
+    m0006_chave_cursor_historico,
+    m0007_exclusao_em_cascata,
+    m0008_busca_exercicios,
+    m0009_exercicio_sem_cascata,
+]
+
+VERSAO_ATUAL = MIGRACOES[-1].VERSAO
@@ -0,0 +1,123 @@
+# Tabelas originais da aplicação
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import criar_tabelas
+
+VERSAO = 1
+DESCRICAO = "Esquema inicial"
+
+# Esquema da versão 1, congelado (as colunas e índices posteriores vêm das migrações seguintes)
+metadata = MetaData()
+
+usuario = Table(
+    "usuario", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nome", String(100), nullable=False),
+    Column("email", String(100), unique=True, index=True, nullable=False),
+    Column("senha_hash", String(255), nullable=False),
+    Column("peso", Float),
+    Column("altura", Float),
+    Column("idade", Integer),
+    Column("foto_perfil", String(255)),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+exercicio = Table(
+    "exercicio", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nome", String(100), nullable=False),
+    Column("grupo_muscular", String(50), nullable=False),
+    Column("equipamento", String(50)),
+    Column("descricao", Text),
+    Column("instrucoes", Text),
+    Column("dificuldade", String(20), nullable=False),
+    Column("imagem_url", String(255)),
+    Column("publico", Boolean),
+    Column("usuario_id", Integer, ForeignKey("usuario.id")),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+treino_fixo = Table(
+    "treino_fixo", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False),
+    Column("nome", String(100), nullable=False),
+    Column("descricao", Text),
+    Column("tempo_descanso_global", Integer),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+exercicio_treino = Table(
+    "exercicio_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("treino_fixo_id", Integer, ForeignKey("treino_fixo.id", ondelete="CASCADE"), nullable=False),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id"), nullable=False),
+    Column("series", Integer, nullable=False),
+    Column("repeticoes_recomendadas", String(20)),
+    Column("tempo_descanso", Integer),
+    Column("usar_tempo_descanso_global", Boolean),
+    Column("ordem", Integer, nullable=False),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+execucao_treino = Table(
+    "execucao_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False),
+    Column("treino_fixo_id", Integer, ForeignKey("treino_fixo.id"), nullable=False),
+    Column("data_inicio", DateTime, nullable=False),
+    Column("data_fim", DateTime),
+    Column("peso_usuario", Float),
+    Column("observacoes", Text),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+execucao_exercicio = Table(
+    "execucao_exercicio", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("execucao_treino_id", Integer, ForeignKey("execucao_treino.id", ondelete="CASCADE"), nullable=False),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id"), nullable=False),
+    Column("ordem", Integer, nullable=False),
+    Column("observacoes", Text),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+serie = Table(
+    "serie", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("execucao_exercicio_id", Integer, ForeignKey("execucao_exercicio.id", ondelete="CASCADE"), nullable=False),
+    Column("repeticoes", Integer),
+    Column("peso", Float),
+    Column("concluida", Boolean),
+    Column("ordem", Integer, nullable=False),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+meta = Table(
+    "meta", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False),
+    Column("tipo", String(50), nullable=False),
+    Column("valor_alvo", Float, nullable=False),
+    Column("valor_atual", Float),
+    Column("data_inicio", Date, nullable=False),
+    Column("data_fim", Date),
+    Column("ativa", Boolean),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+def upgrade(conn: Connection) -> None:
+    criar_tabelas(
+        conn,
+        usuario, exercicio, treino_fixo, exercicio_treino,
+        execucao_treino, execucao_exercicio, serie, meta,
+    )
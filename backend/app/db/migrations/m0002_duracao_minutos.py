@@ -0,0 +1,11 @@
+# Duração manual das execuções (antes aplicada por add_duracao_column.py)
+from sqlalchemy import Column, Integer
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import adicionar_coluna
+
+VERSAO = 2
+DESCRICAO = "Coluna execucao_treino.duracao_minutos"
+
+def upgrade(conn: Connection) -> None:
+    adicionar_coluna(conn, "execucao_treino", Column("duracao_minutos", Integer))
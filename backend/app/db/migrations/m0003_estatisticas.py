@@ -0,0 +1,135 @@
+# Agregados de estatísticas e índice das metas ativas
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, UniqueConstraint,
+)
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import criar_indices, criar_tabelas
+
+VERSAO = 3
+DESCRICAO = "Tabelas volume_diario, recorde_pessoal e dia_treino (com o histórico já gravado); índice de metas ativas"
+
+# Esquema da versão 3, congelado; usuario, exercicio e meta só com as colunas referenciadas
+metadata = MetaData()
+
+Table("usuario", metadata, Column("id", Integer, primary_key=True))
+Table("exercicio", metadata, Column("id", Integer, primary_key=True))
+meta = Table(
+    "meta", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("usuario_id", Integer),
+    Column("ativa", Boolean),
+)
+ix_meta_usuario_ativa = Index("ix_meta_usuario_ativa", meta.c.usuario_id, meta.c.ativa)
+
+volume_diario = Table(
+    "volume_diario", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False),
+    Column("dia", Date, nullable=False),
+    Column("grupo_muscular", String(50), nullable=False),
+    Column("series", Integer, nullable=False),
+    Column("repeticoes", Integer, nullable=False),
+    Column("tonelagem", Float, nullable=False),
+    Column("data_atualizacao", DateTime),
+    UniqueConstraint("usuario_id", "dia", "grupo_muscular", name="uq_volume_diario_usuario_dia_grupo"),
+    Index("ix_volume_diario_usuario_dia", "usuario_id", "dia"),
+)
+
+recorde_pessoal = Table(
+    "recorde_pessoal", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id"), nullable=False),
+    Column("melhor_peso", Float),
+    Column("melhor_peso_repeticoes", Integer),
+    Column("melhor_peso_serie_id", Integer),
+    Column("e1rm_epley", Float),
+    Column("e1rm_epley_serie_id", Integer),
+    Column("e1rm_brzycki", Float),
+    Column("e1rm_brzycki_serie_id", Integer),
+    Column("data_atualizacao", DateTime),
+    UniqueConstraint("usuario_id", "exercicio_id", name="uq_recorde_pessoal_usuario_exercicio"),
+)
+
+dia_treino = Table(
+    "dia_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id"), nullable=False),
+    Column("dia", Date, nullable=False),
+    Column("execucoes", Integer, nullable=False),
+    UniqueConstraint("usuario_id", "dia", name="uq_dia_treino_usuario_dia"),
+)
+
+# Backfill em SQL puro sobre o esquema da versão 3, com as mesmas regras dos agregados: só séries
+# concluídas contam; nos recordes, só com peso e repetições positivos, e em empates vale a série
+# mais antiga (Epley: 1 repetição vale o próprio peso; Brzycki: só abaixo de 37 repetições)
+_SERIES_CONCLUIDAS = """
+    FROM serie s
+    JOIN execucao_exercicio ee ON ee.id = s.execucao_exercicio_id
+    JOIN execucao_treino et ON et.id = ee.execucao_treino_id
+"""
+
+_PREENCHER_VOLUME = f"""
+    INSERT INTO volume_diario (usuario_id, dia, grupo_muscular, series, repeticoes, tonelagem, data_atualizacao)
+    SELECT et.usuario_id, date(et.data_inicio), e.grupo_muscular, count(*),
+           sum(coalesce(s.repeticoes, 0)), sum(coalesce(s.repeticoes, 0) * coalesce(s.peso, 0)), CURRENT_TIMESTAMP
+    {_SERIES_CONCLUIDAS}
+    JOIN exercicio e ON e.id = ee.exercicio_id
+    WHERE s.concluida
+    GROUP BY et.usuario_id, date(et.data_inicio), e.grupo_muscular
+"""
+
+_PREENCHER_RECORDES = f"""
+    WITH candidatas AS (
+        SELECT et.usuario_id, ee.exercicio_id, s.id AS serie_id, s.peso, s.repeticoes,
+               CASE WHEN s.repeticoes = 1 THEN s.peso ELSE s.peso * (1 + s.repeticoes / 30.0) END AS epley,
+               CASE WHEN s.repeticoes < 37 THEN s.peso * 36.0 / (37 - s.repeticoes) END AS brzycki
+        {_SERIES_CONCLUIDAS}
+        WHERE s.concluida AND s.peso > 0 AND s.repeticoes > 0
+    ),
+    ordenadas AS (
+        SELECT candidatas.*,
+               row_number() OVER (PARTITION BY usuario_id, exercicio_id ORDER BY peso DESC, repeticoes DESC, serie_id) AS ordem_peso,
+               row_number() OVER (PARTITION BY usuario_id, exercicio_id ORDER BY epley DESC, serie_id) AS ordem_epley,
+               row_number() OVER (
+                   PARTITION BY usuario_id, exercicio_id ORDER BY CASE WHEN brzycki IS NULL THEN 1 ELSE 0 END, brzycki DESC, serie_id
+               ) AS ordem_brzycki
+        FROM candidatas
+    )
+    INSERT INTO recorde_pessoal (
+        usuario_id, exercicio_id, melhor_peso, melhor_peso_repeticoes, melhor_peso_serie_id,
+        e1rm_epley, e1rm_epley_serie_id, e1rm_brzycki, e1rm_brzycki_serie_id, data_atualizacao
+    )
+    SELECT p.usuario_id, p.exercicio_id, p.peso, p.repeticoes, p.serie_id,
+           round(CAST(e.epley AS NUMERIC), 2), e.serie_id,
+           round(CAST(b.brzycki AS NUMERIC), 2), CASE WHEN b.brzycki IS NOT NULL THEN b.serie_id END,
+           CURRENT_TIMESTAMP
+    FROM ordenadas p
+    JOIN ordenadas e ON e.usuario_id = p.usuario_id AND e.exercicio_id = p.exercicio_id AND e.ordem_epley = 1
+    JOIN ordenadas b ON b.usuario_id = p.usuario_id AND b.exercicio_id = p.exercicio_id AND b.ordem_brzycki = 1
+    WHERE p.ordem_peso = 1
+"""
+
+_PREENCHER_DIAS = """
+    INSERT INTO dia_treino (usuario_id, dia, execucoes)
+    SELECT usuario_id, date(data_inicio), count(*)
+    FROM execucao_treino
+    GROUP BY usuario_id, date(data_inicio)
+"""
+
+def upgrade(conn: Connection) -> None:
+    criar_tabelas(conn, volume_diario, recorde_pessoal, dia_treino)
+    criar_indices(conn, ix_meta_usuario_ativa)
+    preencher_estatisticas(conn)
+
+def preencher_estatisticas(conn: Connection) -> None:
+    """
+    Backfill dos agregados a partir das execuções existentes. Bancos criados pelo create_all
+    antigo podem já ter os agregados: eles são recalculados do zero.
+    """
+    for tabela in ("volume_diario", "recorde_pessoal", "dia_treino"):
+        conn.exec_driver_sql(f"DELETE FROM {tabela}")
+    conn.exec_driver_sql(_PREENCHER_VOLUME)
+    conn.exec_driver_sql(_PREENCHER_RECORDES)
+    conn.exec_driver_sql(_PREENCHER_DIAS)
@@ -0,0 +1,20 @@
+# Versões de token para revogação no modo STATELESS_TOKENS
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import criar_tabelas
+
+VERSAO = 4
+DESCRICAO = "Tabela versao_token"
+
+metadata = MetaData()
+
+versao_token = Table(
+    "versao_token", metadata,
+    Column("usuario_id", Integer, primary_key=True, autoincrement=False),
+    Column("versao", Integer, nullable=False),
+    Column("data_atualizacao", DateTime),
+)
+
+def upgrade(conn: Connection) -> None:
+    criar_tabelas(conn, versao_token)
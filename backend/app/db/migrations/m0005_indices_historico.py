@@ -0,0 +1,38 @@
+# Índices dos caminhos de acesso ao histórico de execuções e ao catálogo
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import criar_indices
+
+VERSAO = 5
+DESCRICAO = "Índices compostos e de chaves estrangeiras do histórico"
+
+# Só as colunas indexadas, na forma da versão 5
+metadata = MetaData()
+
+execucao_treino = Table(
+    "execucao_treino", metadata,
+    Column("usuario_id", Integer), Column("treino_fixo_id", Integer), Column("data_inicio", DateTime),
+)
+execucao_exercicio = Table("execucao_exercicio", metadata, Column("execucao_treino_id", Integer))
+serie = Table("serie", metadata, Column("execucao_exercicio_id", Integer))
+exercicio = Table("exercicio", metadata, Column("publico", Boolean), Column("usuario_id", Integer))
+exercicio_treino = Table("exercicio_treino", metadata, Column("treino_fixo_id", Integer), Column("ordem", Integer))
+treino_fixo = Table("treino_fixo", metadata, Column("usuario_id", Integer))
+
+INDICES = (
+    Index("ix_execucao_treino_usuario_data", execucao_treino.c.usuario_id, execucao_treino.c.data_inicio.desc()),
+    Index(
+        "ix_execucao_treino_usuario_treino_data",
+        execucao_treino.c.usuario_id, execucao_treino.c.treino_fixo_id, execucao_treino.c.data_inicio.desc(),
+    ),
+    Index("ix_execucao_exercicio_execucao_treino_id", execucao_exercicio.c.execucao_treino_id),
+    Index("ix_serie_execucao_exercicio_id", serie.c.execucao_exercicio_id),
+    Index("ix_exercicio_publico_usuario", exercicio.c.publico, exercicio.c.usuario_id),
+    Index("ix_exercicio_usuario_id", exercicio.c.usuario_id),
+    Index("ix_exercicio_treino_treino_ordem", exercicio_treino.c.treino_fixo_id, exercicio_treino.c.ordem),
+    Index("ix_treino_fixo_usuario_id", treino_fixo.c.usuario_id),
+)
+
+def upgrade(conn: Connection) -> None:
+    criar_indices(conn, *INDICES)
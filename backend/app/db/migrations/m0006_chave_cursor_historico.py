@@ -0,0 +1,30 @@
+# Índices do histórico cobrindo a chave do cursor de paginação (data_inicio, id)
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import recriar_indices
+
+VERSAO = 6
+DESCRICAO = "id nos índices do histórico de execuções"
+
+metadata = MetaData()
+
+execucao_treino = Table(
+    "execucao_treino", metadata,
+    Column("id", Integer), Column("usuario_id", Integer), Column("treino_fixo_id", Integer), Column("data_inicio", DateTime),
+)
+
+INDICES = (
+    Index(
+        "ix_execucao_treino_usuario_data",
+        execucao_treino.c.usuario_id, execucao_treino.c.data_inicio.desc(), execucao_treino.c.id.desc(),
+    ),
+    Index(
+        "ix_execucao_treino_usuario_treino_data",
+        execucao_treino.c.usuario_id, execucao_treino.c.treino_fixo_id,
+        execucao_treino.c.data_inicio.desc(), execucao_treino.c.id.desc(),
+    ),
+)
+
+def upgrade(conn: Connection) -> None:
+    recriar_indices(conn, *INDICES)
@@ -0,0 +1,183 @@
+# ON DELETE CASCADE em todas as chaves estrangeiras e exclusão lógica de treinos
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text, UniqueConstraint,
+)
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import (
+    adicionar_coluna, criar_indices, recriar_chaves_estrangeiras, isolar_orfaos,
+)
+
+VERSAO = 7
+DESCRICAO = "Chaves estrangeiras com ON DELETE CASCADE e treino_fixo.excluido_em"
+
+# Esquema da versão 7, congelado: as tabelas recriadas (no SQLite) levam todas as colunas e índices
+metadata = MetaData()
+
+Table("usuario", metadata, Column("id", Integer, primary_key=True))
+
+exercicio = Table(
+    "exercicio", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nome", String(100), nullable=False),
+    Column("grupo_muscular", String(50), nullable=False),
+    Column("equipamento", String(50)),
+    Column("descricao", Text),
+    Column("instrucoes", Text),
+    Column("dificuldade", String(20), nullable=False),
+    Column("imagem_url", String(255)),
+    Column("publico", Boolean),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), index=True),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+    Index("ix_exercicio_publico_usuario", "publico", "usuario_id"),
+)
+
+excluido_em = Column("excluido_em", DateTime)
+treino_fixo = Table(
+    "treino_fixo", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("nome", String(100), nullable=False),
+    Column("descricao", Text),
+    Column("tempo_descanso_global", Integer),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+    excluido_em,
+)
+
+exercicio_treino = Table(
+    "exercicio_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("treino_fixo_id", Integer, ForeignKey("treino_fixo.id", ondelete="CASCADE"), nullable=False),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("series", Integer, nullable=False),
+    Column("repeticoes_recomendadas", String(20)),
+    Column("tempo_descanso", Integer),
+    Column("usar_tempo_descanso_global", Boolean),
+    Column("ordem", Integer, nullable=False),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+    Index("ix_exercicio_treino_treino_ordem", "treino_fixo_id", "ordem"),
+)
+
+execucao_treino = Table(
+    "execucao_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False),
+    Column("treino_fixo_id", Integer, ForeignKey("treino_fixo.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("data_inicio", DateTime, nullable=False),
+    Column("data_fim", DateTime),
+    Column("duracao_minutos", Integer),
+    Column("peso_usuario", Float),
+    Column("observacoes", Text),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+Index(
+    "ix_execucao_treino_usuario_data",
+    execucao_treino.c.usuario_id, execucao_treino.c.data_inicio.desc(), execucao_treino.c.id.desc(),
+)
+Index(
+    "ix_execucao_treino_usuario_treino_data",
+    execucao_treino.c.usuario_id, execucao_treino.c.treino_fixo_id,
+    execucao_treino.c.data_inicio.desc(), execucao_treino.c.id.desc(),
+)
+
+execucao_exercicio = Table(
+    "execucao_exercicio", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("execucao_treino_id", Integer, ForeignKey("execucao_treino.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("ordem", Integer, nullable=False),
+    Column("observacoes", Text),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+serie = Table(
+    "serie", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("execucao_exercicio_id", Integer, ForeignKey("execucao_exercicio.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("repeticoes", Integer),
+    Column("peso", Float),
+    Column("concluida", Boolean),
+    Column("ordem", Integer, nullable=False),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+meta = Table(
+    "meta", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False),
+    Column("tipo", String(50), nullable=False),
+    Column("valor_alvo", Float, nullable=False),
+    Column("valor_atual", Float),
+    Column("data_inicio", Date, nullable=False),
+    Column("data_fim", Date),
+    Column("ativa", Boolean),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+    Index("ix_meta_usuario_ativa", "usuario_id", "ativa"),
+)
+
+volume_diario = Table(
+    "volume_diario", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False),
+    Column("dia", Date, nullable=False),
+    Column("grupo_muscular", String(50), nullable=False),
+    Column("series", Integer, nullable=False),
+    Column("repeticoes", Integer, nullable=False),
+    Column("tonelagem", Float, nullable=False),
+    Column("data_atualizacao", DateTime),
+    UniqueConstraint("usuario_id", "dia", "grupo_muscular", name="uq_volume_diario_usuario_dia_grupo"),
+    Index("ix_volume_diario_usuario_dia", "usuario_id", "dia"),
+)
+
+recorde_pessoal = Table(
+    "recorde_pessoal", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("melhor_peso", Float),
+    Column("melhor_peso_repeticoes", Integer),
+    Column("melhor_peso_serie_id", Integer),
+    Column("e1rm_epley", Float),
+    Column("e1rm_epley_serie_id", Integer),
+    Column("e1rm_brzycki", Float),
+    Column("e1rm_brzycki_serie_id", Integer),
+    Column("data_atualizacao", DateTime),
+    UniqueConstraint("usuario_id", "exercicio_id", name="uq_recorde_pessoal_usuario_exercicio"),
+)
+
+dia_treino = Table(
+    "dia_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("usuario_id", Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False),
+    Column("dia", Date, nullable=False),
+    Column("execucoes", Integer, nullable=False),
+    UniqueConstraint("usuario_id", "dia", name="uq_dia_treino_usuario_dia"),
+)
+
+def _indice(tabela: Table, nome: str) -> Index:
+    return next(indice for indice in tabela.indexes if indice.name == nome)
+
+def upgrade(conn: Connection) -> None:
+    adicionar_coluna(conn, "treino_fixo", excluido_em)
+    recriar_chaves_estrangeiras(
+        conn,
+        exercicio, treino_fixo, exercicio_treino, execucao_treino, execucao_exercicio, serie,
+        meta, volume_diario, recorde_pessoal, dia_treino,
+    )
+    # Colunas filhas das cascatas que não eram a primeira de nenhum índice (no SQLite a recriação já os criou)
+    criar_indices(
+        conn,
+        _indice(execucao_treino, "ix_execucao_treino_treino_fixo_id"),
+        _indice(exercicio_treino, "ix_exercicio_treino_exercicio_id"),
+        _indice(execucao_exercicio, "ix_execucao_exercicio_exercicio_id"),
+        _indice(recorde_pessoal, "ix_recorde_pessoal_exercicio_id"),
+    )
+    # Órfãos impediriam as cascatas de serem confiáveis; vão para quarentena, sem perder o histórico
+    isolar_orfaos(conn)
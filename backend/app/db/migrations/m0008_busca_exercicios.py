@@ -0,0 +1,45 @@
+# Índice de texto completo do catálogo de exercícios
+from sqlalchemy.engine import Connection
+
+VERSAO = 8
+DESCRICAO = "Busca textual em exercicio (FTS5 no SQLite, GIN/tsvector no PostgreSQL)"
+
+# DDL da versão 8, congelado (a definição viva fica em app/db/busca.py)
+_TABELA_SQLITE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS exercicio_busca USING fts5("
+    "nome, descricao, instrucoes, content='exercicio', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+_TRIGGERS_SQLITE = (
+    """
+        CREATE TRIGGER IF NOT EXISTS exercicio_busca_ai AFTER INSERT ON exercicio BEGIN
+            INSERT INTO exercicio_busca (rowid, nome, descricao, instrucoes)
+            VALUES (new.id, new.nome, new.descricao, new.instrucoes);
+        END""",
+    """
+        CREATE TRIGGER IF NOT EXISTS exercicio_busca_ad AFTER DELETE ON exercicio BEGIN
+            INSERT INTO exercicio_busca (exercicio_busca, rowid, nome, descricao, instrucoes)
+            VALUES ('delete', old.id, old.nome, old.descricao, old.instrucoes);
+        END""",
+    """
+        CREATE TRIGGER IF NOT EXISTS exercicio_busca_au AFTER UPDATE OF nome, descricao, instrucoes ON exercicio BEGIN
+            INSERT INTO exercicio_busca (exercicio_busca, rowid, nome, descricao, instrucoes)
+            VALUES ('delete', old.id, old.nome, old.descricao, old.instrucoes);
+            INSERT INTO exercicio_busca (rowid, nome, descricao, instrucoes)
+            VALUES (new.id, new.nome, new.descricao, new.instrucoes);
+        END""",
+)
+_INDICE_PG = (
+    "CREATE INDEX IF NOT EXISTS ix_exercicio_busca ON exercicio USING gin (to_tsvector('simple', "
+    "coalesce(nome, '') || ' ' || coalesce(descricao, '') || ' ' || coalesce(instrucoes, '')))"
+)
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql(_TABELA_SQLITE)
+        for ddl in _TRIGGERS_SQLITE:
+            conn.exec_driver_sql(ddl)
+        # Indexa os exercícios que já existem
+        conn.exec_driver_sql("INSERT INTO exercicio_busca (exercicio_busca) VALUES ('rebuild')")
+    elif conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(_INDICE_PG)
@@ -0,0 +1,44 @@
+# Exercícios em uso não são excluídos em cascata
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.operacoes import recriar_chaves_estrangeiras
+
+VERSAO = 9
+DESCRICAO = "exercicio_treino e execucao_exercicio sem ON DELETE CASCADE a partir de exercicio"
+
+# Esquema da versão 9, congelado
+metadata = MetaData()
+
+Table("treino_fixo", metadata, Column("id", Integer, primary_key=True))
+Table("exercicio", metadata, Column("id", Integer, primary_key=True))
+Table("execucao_treino", metadata, Column("id", Integer, primary_key=True))
+
+exercicio_treino = Table(
+    "exercicio_treino", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("treino_fixo_id", Integer, ForeignKey("treino_fixo.id", ondelete="CASCADE"), nullable=False),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id", ondelete="NO ACTION"), nullable=False, index=True),
+    Column("series", Integer, nullable=False),
+    Column("repeticoes_recomendadas", String(20)),
+    Column("tempo_descanso", Integer),
+    Column("usar_tempo_descanso_global", Boolean),
+    Column("ordem", Integer, nullable=False),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+    Index("ix_exercicio_treino_treino_ordem", "treino_fixo_id", "ordem"),
+)
+
+execucao_exercicio = Table(
+    "execucao_exercicio", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("execucao_treino_id", Integer, ForeignKey("execucao_treino.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("exercicio_id", Integer, ForeignKey("exercicio.id", ondelete="NO ACTION"), nullable=False, index=True),
+    Column("ordem", Integer, nullable=False),
+    Column("observacoes", Text),
+    Column("data_criacao", DateTime),
+    Column("data_atualizacao", DateTime),
+)
+
+def upgrade(conn: Connection) -> None:
+    recriar_chaves_estrangeiras(conn, exercicio_treino, execucao_exercicio)
@@ -0,0 +1,96 @@
+# Operações idempotentes usadas pelas migrações
+"""
+Cada operação verifica o estado atual antes de alterar o banco, para que uma migração leve
+tanto um banco novo quanto um criado por versões antigas (via create_all) ao mesmo esquema.
+As tabelas, colunas e índices vêm de cada módulo de migração (MetaData própria, congelada na
+forma que o esquema tinha naquela versão), nunca dos modelos atuais: mudar um modelo não pode
+mudar o que uma migração antiga faz.
+"""
+import logging
+from typing import Dict
+
+from sqlalchemy import Column, Index, Table, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint, CreateIndex, CreateTable
+
+logger = logging.getLogger(__name__)
+
+def criar_tabelas(conn: Connection, *tabelas: Table) -> None:
+    """Cria as tabelas (com seus índices) que ainda não existem."""
+    for tabela in tabelas:
+        tabela.create(conn, checkfirst=True)
+
+def adicionar_coluna(conn: Connection, tabela: str, coluna: Column) -> None:
+    """ALTER TABLE ADD COLUMN com o tipo da coluna, se ela ainda não existir."""
+    if coluna.name in {c["name"] for c in inspect(conn).get_columns(tabela)}:
+        return
+    tipo = coluna.type.compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {coluna.name} {tipo}")
+
+def criar_indices(conn: Connection, *indices: Index) -> None:
+    """Cria os índices que ainda não existem."""
+    for indice in indices:
+        indice.create(conn, checkfirst=True)
+
+def recriar_indices(conn: Connection, *indices: Index) -> None:
+    """Remove e recria os índices com a nova definição (mudança de colunas)."""
+    for indice in indices:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {indice.name}")
+    criar_indices(conn, *indices)
+
+def recriar_chaves_estrangeiras(conn: Connection, *tabelas: Table) -> None:
+    """
+    Leva as chaves estrangeiras das tabelas à definição dada (ex.: ON DELETE CASCADE). O SQLite
+    não altera restrições de uma tabela existente: ela é recriada com o DDL da definição, os dados
+    copiados e os triggers que já existiam sobre ela recriados (requer foreign_keys desligado, ver
+    migrate.migrar). Nos demais bancos as restrições são removidas e adicionadas de novo.
+    """
+    for definicao in tabelas:
+        tabela = definicao.name
+        if conn.dialect.name != "sqlite":
+            for fk in inspect(conn).get_foreign_keys(tabela):
+                conn.exec_driver_sql(f"ALTER TABLE {tabela} DROP CONSTRAINT {fk['name']}")
+            for restricao in definicao.foreign_key_constraints:
+                conn.execute(AddConstraint(restricao))
+            continue
+        colunas = ", ".join(
+            c["name"] for c in inspect(conn).get_columns(tabela) if c["name"] in definicao.c
+        )
+        triggers = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (tabela,)
+        ).scalars().all()
+        ddl = str(CreateTable(definicao).compile(dialect=conn.dialect))
+        conn.exec_driver_sql(ddl.replace(f"CREATE TABLE {tabela} (", f"CREATE TABLE {tabela}__nova (", 1))
+        conn.exec_driver_sql(f"INSERT INTO {tabela}__nova ({colunas}) SELECT {colunas} FROM {tabela}")
+        conn.exec_driver_sql(f"DROP TABLE {tabela}")
+        conn.exec_driver_sql(f"ALTER TABLE {tabela}__nova RENAME TO {tabela}")
+        for indice in definicao.indexes:
+            conn.execute(CreateIndex(indice))
+        # Os triggers caem com o DROP TABLE (ex.: os do índice de busca de exercicio)
+        for trigger in triggers:
+            conn.exec_driver_sql(trigger)
+
+def isolar_orfaos(conn: Connection) -> Dict[str, int]:
+    """
+    Move para tabelas quarentena_<tabela> (mesmas colunas, sem restrições) as linhas cujas chaves
+    estrangeiras apontam para registros inexistentes, deixadas enquanto o SQLite não aplicava as
+    restrições. Nada é apagado: as linhas ficam para conferência e recuperação manual. Repete até a
+    checagem ficar limpa, porque isolar um órfão pode deixar os filhos dele órfãos. Retorna quantas
+    linhas foram isoladas por tabela.
+    """
+    if conn.dialect.name != "sqlite":
+        return {}
+    isoladas: Dict[str, int] = {}
+    while True:
+        violacoes = conn.exec_driver_sql("PRAGMA foreign_key_check").all()
+        if not violacoes:
+            break
+        for tabela, rowid in {(tabela, rowid) for tabela, rowid, _pai, _fk in violacoes}:
+            quarentena = f"quarentena_{tabela}"
+            conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {quarentena} AS SELECT * FROM {tabela} WHERE 0")
+            conn.exec_driver_sql(f"INSERT INTO {quarentena} SELECT * FROM {tabela} WHERE rowid = ?", (rowid,))
+            conn.exec_driver_sql(f"DELETE FROM {tabela} WHERE rowid = ?", (rowid,))
+            isoladas[tabela] = isoladas.get(tabela, 0) + 1
+    for tabela, total in isoladas.items():
+        logger.warning("%d linha(s) órfã(s) de %s movida(s) para quarentena_%s", total, tabela, tabela)
+    return isoladas
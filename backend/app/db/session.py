@@ -1,8 +1,126 @@
 # Database session management
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool, StaticPool
 
 from app.core.config import settings
+from app.core.metricas import metricas, pool_medido
+from app.db.instrumentacao import instrumentar
+
+# Driver assíncrono usado para cada backend síncrono suportado
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+_POOLS = {"queue": QueuePool, "null": NullPool, "static": StaticPool}
+_POOLS_ASYNC = {"queue": AsyncAdaptedQueuePool, "null": NullPool, "static": StaticPool}
+
+def async_database_uri(uri: str) -> str:
+    """URL equivalente com driver assíncrono (aiosqlite / asyncpg); drivers já assíncronos são mantidos."""
+    url = make_url(uri)
+    url = url.set(drivername=_ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    return url.render_as_string(hide_password=False)
+
+def _sqlite_pragmas() -> Dict[str, Any]:
+    return {
+        # Desligado por padrão no SQLite; sem ele os ON DELETE CASCADE dos modelos não rodam
+        "foreign_keys": "ON",
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+def _aplicar_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma, valor in _sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {pragma}={valor}")
+    cursor.close()
+
+def _engine_kwargs(uri: str, *, assincrono: bool, poolclass: Optional[Type[Pool]] = None) -> Dict[str, Any]:
+    """
+    Pool por backend: SQLite em memória usa uma única conexão compartilhada (StaticPool);
+    SQLite em arquivo e servidores usam QueuePool dimensionado pelas settings. O pre-ping
+    fica desligado por padrão: um arquivo local não derruba conexões, e nos servidores
+    DB_POOL_RECYCLE descarta conexões antigas sem um round trip a cada checkout.
+    """
+    url = make_url(uri)
+    pools = _POOLS_ASYNC if assincrono else _POOLS
+    sqlite = url.get_backend_name() == "sqlite"
+    em_memoria = sqlite and url.database in (None, "", ":memory:")
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+    if poolclass is None:
+        poolclass = pools[settings.DB_POOL_CLASS or ("static" if em_memoria else "queue")]
+    kwargs: Dict[str, Any] = {"poolclass": poolclass, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if issubclass(poolclass, QueuePool):
+        kwargs.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
+        if not sqlite:
+            kwargs["pool_recycle"] = settings.DB_POOL_RECYCLE
+    if sqlite:
+        # As conexões do pool são usadas pelo threadpool do Starlette, fora da thread que as abriu
+        kwargs["connect_args"] = {"check_same_thread": False}
+    return kwargs
+
+def _medir_pool(kwargs: Dict[str, Any], nome: Optional[str]) -> Dict[str, Any]:
+    """Com `nome`, o pool é a subclasse de pool_medido (esperas e timeouts em /metrics)."""
+    if nome is not None:
+        kwargs["poolclass"] = pool_medido(nome, kwargs["poolclass"])
+    return kwargs
+
+def create_db_engine(
+    uri: str, *, poolclass: Optional[Type[Pool]] = None, nome: Optional[str] = None, **kwargs: Any
+) -> Engine:
+    """
+    Engine síncrono com o perfil de pool/pragmas das settings; `kwargs` sobrescreve o perfil.
+    Com `nome`, as estatísticas do pool entram em /metrics com o rótulo pool=`nome`.
+    """
+    kwargs = _medir_pool({**_engine_kwargs(uri, assincrono=False, poolclass=poolclass), **kwargs}, nome)
+    db_engine = create_engine(uri, **kwargs)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _aplicar_pragmas)
+    instrumentar(db_engine)
+    if nome is not None:
+        metricas.pool(nome).ligar(db_engine)
+    return db_engine
+
+def create_async_db_engine(
+    uri: str, *, poolclass: Optional[Type[Pool]] = None, nome: Optional[str] = None, **kwargs: Any
+) -> AsyncEngine:
+    """Engine assíncrono equivalente a create_db_engine (a URL é convertida com async_database_uri)."""
+    uri = async_database_uri(uri)
+    kwargs = _medir_pool({**_engine_kwargs(uri, assincrono=True, poolclass=poolclass), **kwargs}, nome)
+    db_engine = create_async_engine(uri, **kwargs)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _aplicar_pragmas)
+    instrumentar(db_engine.sync_engine)
+    if nome is not None:
+        metricas.pool(nome).ligar(db_engine.sync_engine)
+    return db_engine
+
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI, nome="principal")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Engine assíncrono para os endpoints async def. expire_on_commit=False porque, fora do
+# greenlet do SQLAlchemy, atributos expirados não podem ser recarregados sob demanda.
+async_engine = create_async_db_engine(settings.SQLALCHEMY_DATABASE_URI, nome="principal_async")
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Réplica de leitura (READ_DATABASE_URL). Sem réplica configurada, as sessões de leitura
+# usam os mesmos engines do banco principal.
+if settings.READ_DATABASE_URI:
+    read_engine = create_db_engine(settings.READ_DATABASE_URI, nome="leitura")
+    async_read_engine = create_async_db_engine(settings.READ_DATABASE_URI, nome="leitura_async")
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
@@ -1,18 +1,35 @@
-import app.db.base  # Registrar todos os modelos antes de criar tabelas e antes de importar rotas
-from fastapi import FastAPI
+import app.db.base  # Registrar todos os modelos antes de importar rotas
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app import crud
 from app.api.api_v1.api import api_router
 from app.core.config import settings
-from app.db.session import engine # Importar engine
-from app.db.base_class import Base # Importar Base
+from app.core.metricas import MetricasHTTPMiddleware, metricas
+from app.core.security import PasswordHasherBusy
+from app.crud.base import CursorInvalido
+from app.db.instrumentacao import InstrumentacaoSQLMiddleware
+from app.db.migrate import verificar_versao
+from app.db.session import async_engine, engine # Importar engine
 from fastapi.middleware.cors import CORSMiddleware
 
-# Cria as tabelas no banco de dados (apenas para desenvolvimento/simplicidade)
-# Em produção, você usaria Alembic ou outra ferramenta de migração.
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # O esquema é criado/atualizado por `python migrate.py`; aqui só conferimos a versão
+    purga = None
+    if settings.CHECK_SCHEMA_VERSION:
+        verificar_versao(engine)
+        # Com o esquema conferido, conclui em segundo plano as purgas de treinos que ficaram pendentes
+        purga = asyncio.create_task(crud.treino_fixo_async.purgar_excluidos(async_engine))
+    yield
+    if purga is not None and not purga.done():
+        purga.cancel() # a purga em andamento é desfeita inteira e retomada na próxima inicialização
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Integrate front-end by enabling CORS
@@ -22,10 +39,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Statements, tempo de banco e repetições (N+1) por requisição
+app.add_middleware(
+    InstrumentacaoSQLMiddleware,
+    cabecalhos=settings.SQL_DEBUG_HEADERS,
+    limite_repeticoes=settings.SQL_REPETICOES_ALERTA,
+)
+
+# Latência, status e requisições em andamento por rota; por fora dos outros middlewares
+app.add_middleware(MetricasHTTPMiddleware)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Fila de bcrypt cheia: recusa logo em vez de acumular latência
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Serviço de autenticação sobrecarregado, tente novamente"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(CursorInvalido)
+async def cursor_invalido_handler(request: Request, exc: CursorInvalido):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas de HTTP e dos pools de conexão no formato de exposição do Prometheus."""
+    return PlainTextResponse(metricas.exposicao(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/ping")
 def pong():
     """
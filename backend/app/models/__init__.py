@@ -1,5 +1,6 @@
-from .user import User
+from .user import User, VersaoToken
 from .exercise import Exercicio
 from .workout import TreinoFixo, ExercicioTreino
+from .statistics import VolumeDiario, RecordePessoal, DiaTreino
 # from .workout_execution import ExecucaoTreino, ExecucaoExercicio, Serie
-# from .goal import Meta
+from .goal import Meta
@@ -1,11 +1,16 @@
 # Exercise model
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime, func
+from sqlalchemy import event, Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.db.marca_dagua import agora_preciso
+from app.db.busca import criar_indice_busca, remover_indice_busca
 
 class Exercicio(Base):
     __tablename__ = "exercicio"
+    __table_args__ = (
+        Index("ix_exercicio_publico_usuario", "publico", "usuario_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
@@ -16,9 +21,14 @@ class Exercicio(Base):
     dificuldade = Column(String(20), nullable=False) # iniciante, intermediario, avancado
     imagem_url = Column(String(255), nullable=True)
     publico = Column(Boolean, default=False)
-    usuario_id = Column(Integer, ForeignKey("usuario.id"), nullable=True)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=True, index=True)
     data_criacao = Column(DateTime, default=func.now())
-    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+    data_atualizacao = Column(DateTime, default=agora_preciso(), onupdate=agora_preciso()) # marca d'água do ETag
 
     # usuario = relationship("User", back_populates="exercicios")
-    treinos_exercicios = relationship("ExercicioTreino", back_populates="exercicio")
+    # O banco recusa excluir um exercício em uso; o ORM não deve carregar nem alterar os filhos
+    treinos_exercicios = relationship("ExercicioTreino", back_populates="exercicio", passive_deletes="all")
+
+# Índice de busca textual (FTS5 / GIN), criado e removido junto com a tabela
+event.listen(Exercicio.__table__, "after_create", lambda target, connection, **kw: criar_indice_busca(connection))
+event.listen(Exercicio.__table__, "after_drop", lambda target, connection, **kw: remover_indice_busca(connection))
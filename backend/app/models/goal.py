@@ -1,14 +1,17 @@
 # Goal model (Meta)
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
 
 class Meta(Base):
     __tablename__ = "meta"
+    __table_args__ = (
+        Index("ix_meta_usuario_ativa", "usuario_id", "ativa"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, ForeignKey("usuario.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False)
     tipo = Column(String(50), nullable=False) # treino, peso, carga
     valor_alvo = Column(Float, nullable=False)
     valor_atual = Column(Float, default=0)
@@ -0,0 +1,61 @@
+# Statistics models (rollups mantidos incrementalmente)
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, DateTime, Index, UniqueConstraint, func
+
+from app.db.base_class import Base
+
+class VolumeDiario(Base):
+    """
+    Volume de treino consolidado por usuário, dia e grupo muscular.
+    Atualizado a cada escrita de séries para que gráficos longos não precisem ler o histórico completo.
+    """
+    __tablename__ = "volume_diario"
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "dia", "grupo_muscular", name="uq_volume_diario_usuario_dia_grupo"),
+        Index("ix_volume_diario_usuario_dia", "usuario_id", "dia"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False)
+    dia = Column(Date, nullable=False)
+    grupo_muscular = Column(String(50), nullable=False)
+    series = Column(Integer, nullable=False, default=0)
+    repeticoes = Column(Integer, nullable=False, default=0)
+    tonelagem = Column(Float, nullable=False, default=0) # soma de repeticoes * peso das séries concluídas
+    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class RecordePessoal(Base):
+    """
+    Índice de recordes pessoais por usuário e exercício, com a série de origem de cada marca.
+    Mantido incrementalmente a cada escrita de séries.
+    """
+    __tablename__ = "recorde_pessoal"
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "exercicio_id", name="uq_recorde_pessoal_usuario_exercicio"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False)
+    exercicio_id = Column(Integer, ForeignKey("exercicio.id", ondelete="CASCADE"), nullable=False, index=True)
+    melhor_peso = Column(Float, nullable=True)
+    melhor_peso_repeticoes = Column(Integer, nullable=True) # mais repetições feitas com o melhor peso
+    melhor_peso_serie_id = Column(Integer, nullable=True)
+    e1rm_epley = Column(Float, nullable=True)
+    e1rm_epley_serie_id = Column(Integer, nullable=True)
+    e1rm_brzycki = Column(Float, nullable=True)
+    e1rm_brzycki_serie_id = Column(Integer, nullable=True)
+    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class DiaTreino(Base):
+    """
+    Índice de dias treinados por usuário (um registro por dia com ao menos uma execução).
+    Mantido na criação e exclusão de execuções; alimenta o calendário e as sequências.
+    """
+    __tablename__ = "dia_treino"
+    __table_args__ = (
+        UniqueConstraint("usuario_id", "dia", name="uq_dia_treino_usuario_dia"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False)
+    dia = Column(Date, nullable=False)
+    execucoes = Column(Integer, nullable=False, default=0)
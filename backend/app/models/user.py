@@ -20,6 +20,19 @@ class User(Base):
 
     # Relationships (add as needed based on other models)
     # exercicios = relationship("Exercicio", back_populates="usuario")
-    treinos_fixos = relationship("TreinoFixo", back_populates="usuario", cascade="all, delete-orphan")
-    execucoes_treino = relationship("ExecucaoTreino", back_populates="usuario", cascade="all, delete-orphan") # Adicionado relacionamento
+    # passive_deletes: a exclusão fica com o ON DELETE CASCADE do banco, sem carregar as coleções
+    treinos_fixos = relationship("TreinoFixo", back_populates="usuario", cascade="all, delete-orphan", passive_deletes=True)
+    execucoes_treino = relationship("ExecucaoTreino", back_populates="usuario", cascade="all, delete-orphan", passive_deletes=True) # Adicionado relacionamento
     # metas = relationship("Meta", back_populates="usuario")
+
+class VersaoToken(Base):
+    """
+    Versão atual dos tokens de um usuário; incrementada para revogar todos os tokens sem estado
+    já emitidos. Só existem linhas para usuários que já tiveram tokens revogados (ausente = 0).
+    Sem chave estrangeira para que a revogação sobreviva à exclusão do usuário.
+    """
+    __tablename__ = "versao_token"
+
+    usuario_id = Column(Integer, primary_key=True, autoincrement=False)
+    versao = Column(Integer, nullable=False, default=0)
+    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
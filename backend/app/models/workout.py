@@ -1,37 +1,45 @@
 # Workout models (TreinoFixo, ExercicioTreino)
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.db.marca_dagua import agora_preciso
 
 class TreinoFixo(Base):
     __tablename__ = "treino_fixo"
 
     id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, ForeignKey("usuario.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False, index=True)
     nome = Column(String(100), nullable=False)
     descricao = Column(Text, nullable=True)
     tempo_descanso_global = Column(Integer, default=60) # em segundos
     data_criacao = Column(DateTime, default=func.now())
-    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+    data_atualizacao = Column(DateTime, default=agora_preciso(), onupdate=agora_preciso()) # marca d'água do ETag
+    # Exclusão lógica: o treino some das consultas e a linha (com o histórico) é purgada em segundo plano
+    excluido_em = Column(DateTime, nullable=True)
 
     usuario = relationship("User", back_populates="treinos_fixos") # Descomentado para corrigir erro de mapeamento
-    exercicios_treino = relationship("ExercicioTreino", back_populates="treino_fixo", cascade="all, delete-orphan")
-    execucoes = relationship("ExecucaoTreino", back_populates="treino_fixo", cascade="all, delete-orphan") # Relacionamento para execuções
+    exercicios_treino = relationship("ExercicioTreino", back_populates="treino_fixo", cascade="all, delete-orphan", passive_deletes=True)
+    execucoes = relationship("ExecucaoTreino", back_populates="treino_fixo", cascade="all, delete-orphan", passive_deletes=True) # Relacionamento para execuções
 
 class ExercicioTreino(Base):
     __tablename__ = "exercicio_treino"
+    __table_args__ = (
+        Index("ix_exercicio_treino_treino_ordem", "treino_fixo_id", "ordem"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     treino_fixo_id = Column(Integer, ForeignKey("treino_fixo.id", ondelete="CASCADE"), nullable=False)
-    exercicio_id = Column(Integer, ForeignKey("exercicio.id"), nullable=False)
+    # Sem cascata a partir do catálogo: um exercício em uso não pode ser excluído (NO ACTION é conferido
+    # no fim do statement, então a exclusão em cascata do próprio usuário continua passando)
+    exercicio_id = Column(Integer, ForeignKey("exercicio.id", ondelete="NO ACTION"), nullable=False, index=True)
     series = Column(Integer, nullable=False, default=3)
     repeticoes_recomendadas = Column(String(20), nullable=True)
     tempo_descanso = Column(Integer, default=60) # em segundos
     usar_tempo_descanso_global = Column(Boolean, default=True)
     ordem = Column(Integer, nullable=False)
     data_criacao = Column(DateTime, default=func.now())
-    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now())
+    data_atualizacao = Column(DateTime, default=agora_preciso(), onupdate=agora_preciso()) # marca d'água do ETag
 
     treino_fixo = relationship("TreinoFixo", back_populates="exercicios_treino")
     exercicio = relationship("Exercicio", back_populates="treinos_exercicios") # Descomentado
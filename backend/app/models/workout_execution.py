@@ -1,5 +1,5 @@
 # Workout execution models (ExecucaoTreino, ExecucaoExercicio, Serie)
-from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Boolean, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -12,8 +12,8 @@ class ExecucaoTreino(Base):
     __tablename__ = "execucao_treino"
 
     id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, ForeignKey("usuario.id"), nullable=False)
-    treino_fixo_id = Column(Integer, ForeignKey("treino_fixo.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuario.id", ondelete="CASCADE"), nullable=False)
+    treino_fixo_id = Column(Integer, ForeignKey("treino_fixo.id", ondelete="CASCADE"), nullable=False, index=True)
     data_inicio = Column(DateTime, nullable=False, default=func.now())
     data_fim = Column(DateTime, nullable=True)
     duracao_minutos = Column(Integer, nullable=True)  # Duração manual em minutos
@@ -24,14 +24,30 @@ class ExecucaoTreino(Base):
 
     usuario = relationship("User", back_populates="execucoes_treino")
     treino_fixo = relationship("TreinoFixo", back_populates="execucoes")
-    exercicios_executados = relationship("ExecucaoExercicio", back_populates="execucao_treino", cascade="all, delete-orphan")
+    exercicios_executados = relationship("ExecucaoExercicio", back_populates="execucao_treino", cascade="all, delete-orphan", passive_deletes=True)
+
+# Histórico do usuário (opcionalmente por treino), das execuções mais recentes para as mais antigas.
+# O id fecha a chave do cursor de paginação (data_inicio, id), mantendo a ordenação toda no índice.
+Index(
+    "ix_execucao_treino_usuario_data",
+    ExecucaoTreino.usuario_id,
+    ExecucaoTreino.data_inicio.desc(),
+    ExecucaoTreino.id.desc(),
+)
+Index(
+    "ix_execucao_treino_usuario_treino_data",
+    ExecucaoTreino.usuario_id,
+    ExecucaoTreino.treino_fixo_id,
+    ExecucaoTreino.data_inicio.desc(),
+    ExecucaoTreino.id.desc(),
+)
 
 class ExecucaoExercicio(Base):
     __tablename__ = "execucao_exercicio"
 
     id = Column(Integer, primary_key=True, index=True)
-    execucao_treino_id = Column(Integer, ForeignKey("execucao_treino.id", ondelete="CASCADE"), nullable=False)
-    exercicio_id = Column(Integer, ForeignKey("exercicio.id"), nullable=False)
+    execucao_treino_id = Column(Integer, ForeignKey("execucao_treino.id", ondelete="CASCADE"), nullable=False, index=True)
+    exercicio_id = Column(Integer, ForeignKey("exercicio.id", ondelete="NO ACTION"), nullable=False, index=True) # histórico: nunca em cascata
     # exercicio_treino_id = Column(Integer, ForeignKey("exercicio_treino.id"), nullable=True) # Mantido, mas considerar se é sempre necessário
     ordem = Column(Integer, nullable=False) # Adicionado campo ordem para manter a ordem dos exercícios na execução
     observacoes = Column(Text, nullable=True) # Adicionado campo observacoes para o exercício específico
@@ -41,13 +57,13 @@ class ExecucaoExercicio(Base):
     execucao_treino = relationship("ExecucaoTreino", back_populates="exercicios_executados")
     exercicio = relationship("Exercicio") 
     # exercicio_treino_info = relationship("ExercicioTreino") # Opcional
-    series = relationship("Serie", back_populates="execucao_exercicio", cascade="all, delete-orphan")
+    series = relationship("Serie", back_populates="execucao_exercicio", cascade="all, delete-orphan", passive_deletes=True)
 
 class Serie(Base):
     __tablename__ = "serie"
 
     id = Column(Integer, primary_key=True, index=True)
-    execucao_exercicio_id = Column(Integer, ForeignKey("execucao_exercicio.id", ondelete="CASCADE"), nullable=False)
+    execucao_exercicio_id = Column(Integer, ForeignKey("execucao_exercicio.id", ondelete="CASCADE"), nullable=False, index=True)
     repeticoes = Column(Integer, nullable=True)
     peso = Column(Float, nullable=True)
     concluida = Column(Boolean, default=False)
@@ -1,7 +1,8 @@
-from .token import Token, TokenPayload
-from .user import User, UserCreate, UserUpdate, UserInDB, UserWithToken
-from .exercise import Exercicio, ExercicioCreate, ExercicioUpdate, ExercicioInDB
+from .token import Token, TokenPayload, TokenUser
+from .user import User, UserCreate, UserUpdate, UserInDB, UserWithToken, UserAtualizado
+from .exercise import Exercicio, ExercicioCreate, ExercicioUpdate, ExercicioInDB, ExercicioUpdateLote, AtualizacaoLote
 # Add other schemas here as they are created
 from .workout import TreinoFixo, TreinoFixoCreate, TreinoFixoUpdate, TreinoFixoInDB, ExercicioTreino, ExercicioTreinoCreate, ExercicioTreinoUpdate, ExercicioTreinoInDB
-from .workout_execution import SerieBase, SerieCreate, SerieUpdate, Serie, ExecucaoExercicioBase, ExecucaoExercicioCreate, ExecucaoExercicioUpdate, ExecucaoExercicio, ExecucaoTreinoBase, ExecucaoTreinoCreate, ExecucaoTreinoUpdate, ExecucaoTreino, ExecucaoTreinoIniciado, ExecucaoTreinoHistorico, TreinoExecucaoStart, TreinoFixoBasico
-# from .goal import Meta, MetaCreate, MetaUpdate, MetaInDB
+from .workout_execution import SerieBase, SerieCreate, SerieUpdate, Serie, ExecucaoExercicioBase, ExecucaoExercicioCreate, ExecucaoExercicioUpdate, ExecucaoExercicio, ExecucaoTreinoBase, ExecucaoTreinoCreate, ExecucaoTreinoUpdate, ExecucaoTreino, ExecucaoTreinoIniciado, ExecucaoTreinoHistorico, TreinoExecucaoStart, TreinoFixoBasico, SeriePatch, SeriePatchLote, SerieConfirmacao, ExecucaoExercicioPatch, ExecucaoExercicioConfirmacao
+from .statistics import VolumePeriodo, RecordePessoal, PontoProgresso, ProgressoExercicio, ResumoProgresso, DiaCalendario, CalendarioTreino, DistribuicaoGrupo
+from .goal import Meta, MetaCreate, MetaUpdate, MetaInDB
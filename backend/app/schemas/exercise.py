@@ -1,6 +1,6 @@
 # Exercise schemas
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 # Shared properties
 class ExercicioBase(BaseModel):
@@ -23,6 +23,25 @@ class ExercicioCreate(ExercicioBase):
 class ExercicioUpdate(ExercicioBase):
     pass
 
+# Alteração em lote de vários exercícios do usuário (um único UPDATE)
+class ExercicioUpdateLote(BaseModel):
+    ids: List[int]
+    publico: Optional[bool] = None
+    grupo_muscular: Optional[str] = None
+    equipamento: Optional[str] = None
+    dificuldade: Optional[str] = None
+
+    @field_validator("publico", "grupo_muscular", "dificuldade")
+    @classmethod
+    def nao_nulo(cls, valor):
+        # Omitir deixa o campo como está; null explícito iria direto para colunas obrigatórias
+        if valor is None:
+            raise ValueError("não pode ser nulo")
+        return valor
+
+class AtualizacaoLote(BaseModel):
+    atualizados: int
+
 class ExercicioInDBBase(ExercicioBase):
     id: int
     usuario_id: Optional[int] = None
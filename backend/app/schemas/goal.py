@@ -1,12 +1,12 @@
 # Goal schemas (Meta)
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import date
 
+# valor_atual é mantido pelo servidor (a partir das execuções) e não faz parte da entrada
 class MetaBase(BaseModel):
     tipo: Optional[str] = None # treino, peso, carga
     valor_alvo: Optional[float] = None
-    valor_atual: Optional[float] = 0
     data_inicio: Optional[date] = None
     data_fim: Optional[date] = None
     ativa: Optional[bool] = True
@@ -17,11 +17,18 @@ class MetaCreate(MetaBase):
     data_inicio: date
 
 class MetaUpdate(MetaBase):
-    pass
+    @field_validator("tipo", "valor_alvo", "data_inicio", "ativa")
+    @classmethod
+    def nao_nulo(cls, valor):
+        # Omitir mantém o valor atual; null explícito não vale para colunas obrigatórias
+        if valor is None:
+            raise ValueError("não pode ser nulo")
+        return valor
 
 class MetaInDBBase(MetaBase):
     id: int
     usuario_id: int
+    valor_atual: Optional[float] = 0
     # data_criacao: datetime
     # data_atualizacao: datetime
 
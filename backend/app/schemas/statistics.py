@@ -0,0 +1,72 @@
+# Statistics schemas
+from typing import Optional, List
+from pydantic import BaseModel
+from datetime import date, datetime
+
+# --- Volume de treino ---
+class VolumePeriodo(BaseModel):
+    periodo_inicio: date # dia, ou segunda-feira da semana quando agrupado por semana
+    grupo_muscular: str
+    series: int = 0
+    repeticoes: int = 0
+    tonelagem: float = 0
+
+# --- Recordes pessoais ---
+class RecordePessoal(BaseModel):
+    exercicio_id: int
+    melhor_peso: Optional[float] = None
+    melhor_peso_repeticoes: Optional[int] = None
+    melhor_peso_serie_id: Optional[int] = None
+    e1rm_epley: Optional[float] = None
+    e1rm_epley_serie_id: Optional[int] = None
+    e1rm_brzycki: Optional[float] = None
+    e1rm_brzycki_serie_id: Optional[int] = None
+    data_atualizacao: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# --- Progressão por exercício ---
+class PontoProgresso(BaseModel):
+    data: date
+    execucao_id: int
+    series: int
+    repeticoes: int
+    tonelagem: float
+    e1rm: float # melhor 1RM estimado (Epley) da sessão
+    e1rm_media_movel: float
+    tonelagem_media_movel: float
+
+class ProgressoExercicio(BaseModel):
+    exercicio_id: int
+    sessoes: int
+    tendencia_e1rm_semanal: Optional[float] = None # inclinação da regressão linear, em kg por semana
+    pontos: List[PontoProgresso] = []
+
+class ResumoProgresso(BaseModel):
+    exercicio_id: int
+    sessoes: int
+    tonelagem_total: float
+    e1rm_atual: float
+    e1rm_maximo: float
+    tendencia_e1rm_semanal: Optional[float] = None
+
+# --- Calendário de treinos ---
+class DiaCalendario(BaseModel):
+    dia: date
+    execucoes: int
+
+class CalendarioTreino(BaseModel):
+    ano: int
+    mes: int
+    dias: List[DiaCalendario] = []
+    sequencia_atual: int = 0 # dias consecutivos até hoje (ou ontem)
+    maior_sequencia: int = 0
+
+# --- Distribuição por grupo muscular ---
+class DistribuicaoGrupo(BaseModel):
+    periodo_inicio: Optional[date] = None # preenchido quando agrupado por semana ou mês
+    grupo_muscular: str
+    series: int
+    repeticoes: int
+    tonelagem: float
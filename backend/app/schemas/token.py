@@ -8,3 +8,14 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
+
+class TokenUser(BaseModel):
+    """
+    Principal montado a partir de um token sem estado (STATELESS_TOKENS), sem consultar o banco.
+    nome e email são um retrato do momento do login; use deps.get_current_user_model
+    quando o registro completo for necessário.
+    """
+    id: int
+    nome: str
+    email: str
+    token_version: int = 0
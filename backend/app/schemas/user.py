@@ -29,6 +29,11 @@ class UserInDBBase(UserBase):
 class User(UserInDBBase):
     pass
 
+class UserAtualizado(User):
+    """Resposta de PUT /usuarios/me; ao trocar a senha traz um token novo, porque os anteriores são revogados."""
+    access_token: Optional[str] = None
+    token_type: Optional[str] = None
+
 # Additional properties stored in DB
 class UserInDB(UserInDBBase):
     senha_hash: str
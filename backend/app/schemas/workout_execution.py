@@ -1,6 +1,6 @@
 # Workout execution schemas
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from app.schemas.exercise import Exercicio # Para aninhar detalhes do exercício, se necessário
 
@@ -123,3 +123,42 @@ class ExecucaoTreinoHistorico(ExecucaoTreino):
     # Poderia adicionar o nome do treino aqui se fizesse um join na query do CRUD
     # treino_nome: Optional[str] = None
     pass
+
+# --- Atualizações granulares durante o treino (PATCH) ---
+class SeriePatch(BaseModel):
+    # Apenas os campos enviados são alterados
+    repeticoes: Optional[int] = None
+    peso: Optional[float] = None
+    concluida: Optional[bool] = None
+
+    @field_validator("concluida")
+    @classmethod
+    def concluida_nao_nula(cls, valor: Optional[bool]) -> bool:
+        # Omitir mantém o valor atual; null explícito gravaria NULL numa série que é concluída ou não
+        if valor is None:
+            raise ValueError("concluida não pode ser nulo")
+        return valor
+
+class SeriePatchLote(SeriePatch):
+    exercicio_ordem: int # ordem do exercício na execução
+    ordem: int # ordem da série no exercício
+
+class SerieConfirmacao(BaseModel):
+    # Resposta mínima de um PATCH de série, em vez da execução completa
+    id: int
+    exercicio_ordem: int
+    ordem: int
+    repeticoes: Optional[int] = None
+    peso: Optional[float] = None
+    concluida: bool
+
+class ExecucaoExercicioPatch(BaseModel):
+    observacoes: Optional[str] = None
+
+class ExecucaoExercicioConfirmacao(BaseModel):
+    id: int
+    ordem: int
+    observacoes: Optional[str] = None
+
+    class Config:
+        from_attributes = True
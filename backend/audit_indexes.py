@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Script para auditar os índices: executa as leituras dos CRUDs contra um banco SQLite em memória
+com o esquema dos modelos e alguns dados mínimos, captura cada SELECT emitido (inclusive os
+carregamentos de relacionamentos e as leituras internas dos agregados) e roda EXPLAIN QUERY PLAN
+sobre ele, apontando as varreduras completas de tabela. Sai com código 1 quando alguma query
+percorre uma tabela inteira.
+
+    python audit_indexes.py
+"""
+
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import app.db.base  # noqa: F401 - registra todos os modelos
+from app import analytics, crud, schemas
+from app.db.base_class import Base
+
+# Varreduras completas esperadas, por etapa
+VARREDURAS_ACEITAS = {
+    "user.get_token_version": "carrega o mapa inteiro de versões de token (poucas linhas) de uma vez",
+}
+
+class PlanoConsulta(NamedTuple):
+    etapa: str              # chamada de CRUD que emitiu a query
+    sql: str
+    plano: List[str]        # linhas "detail" do EXPLAIN QUERY PLAN
+    varreduras: List[str]   # linhas do plano que percorrem uma tabela inteira
+
+def varreduras_completas(plano: List[str]) -> List[str]:
+    """
+    Linhas "SCAN <tabela>" do plano. Varrer um índice inteiro (USING INDEX / COVERING INDEX)
+    também é linear no tamanho da tabela, então só SEARCH conta como acesso indexado. A exceção
+    é uma tabela FTS5 com MATCH (idxStr com "M"), que o SQLite mostra como SCAN mas resolve
+    pelo índice invertido.
+    """
+    return [
+        linha for linha in plano
+        if linha.startswith("SCAN ") and linha != "SCAN CONSTANT ROW" and not _busca_fts5(linha)
+    ]
+
+def _busca_fts5(linha: str) -> bool:
+    _, _, indice = linha.partition(" VIRTUAL TABLE INDEX ")
+    return "M" in indice.partition(":")[2]
+
+class _Captura:
+    def __init__(self) -> None:
+        self.etapa = ""
+        self.consultas: Dict[str, Tuple[str, tuple]] = {} # sql -> (etapa, parâmetros), na ordem de emissão
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT") and statement not in self.consultas:
+            self.consultas[statement] = (self.etapa, parameters)
+
+    @contextmanager
+    def em(self, etapa: str) -> Iterator[None]:
+        self.etapa = etapa
+        yield
+
+def _popular(db: Session, captura: _Captura) -> Dict[str, int]:
+    """Um usuário com exercício, treino, execução com séries e meta; passa pelos caminhos de escrita."""
+    with captura.em("user.create"):
+        usuario = crud.user.create(
+            db, obj_in=schemas.UserCreate(email="auditoria@example.com", password="x", nome="Auditoria"),
+            senha_hash="x",
+        )
+    with captura.em("exercicio.create_with_owner"):
+        exercicio = crud.exercicio.create_with_owner(
+            db,
+            obj_in=schemas.ExercicioCreate(nome="Supino", grupo_muscular="Peito", dificuldade="medio", publico=True),
+            user_id=usuario.id,
+        )
+    with captura.em("treino_fixo.create"):
+        treino = crud.treino_fixo.create(db, obj_in={"usuario_id": usuario.id, "nome": "Treino A"})
+        crud.exercicio_treino.create(db, obj_in={"treino_fixo_id": treino.id, "exercicio_id": exercicio.id, "ordem": 1})
+    with captura.em("meta.create_with_owner"):
+        crud.meta.create_with_owner(
+            db,
+            obj_in=schemas.MetaCreate(tipo="carga", valor_alvo=100, data_inicio=date.today() - timedelta(days=30)),
+            usuario_id=usuario.id,
+        )
+    with captura.em("execucao_treino.create_with_exercicios"):
+        execucao = crud.execucao_treino.create_with_exercicios(
+            db,
+            obj_in=schemas.ExecucaoTreinoCreate(
+                treino_fixo_id=treino.id,
+                data_inicio=datetime.now(),
+                exercicios_executados=[{
+                    "exercicio_id": exercicio.id,
+                    "ordem": 1,
+                    "series": [{"ordem": 1, "repeticoes": 10, "peso": 50, "concluida": True}],
+                }],
+            ),
+            usuario_id=usuario.id,
+        )
+    with captura.em("execucao_treino.finalizar_treino"):
+        crud.execucao_treino.finalizar_treino(
+            db,
+            db_obj=execucao,
+            obj_in=schemas.ExecucaoTreinoUpdate(exercicios_executados=[{
+                "exercicio_id": exercicio.id,
+                "ordem": 1,
+                "series": [{"ordem": 1, "repeticoes": 8, "peso": 60, "concluida": True}],
+            }]),
+        )
+    with captura.em("execucao_treino.atualizar_series"):
+        crud.execucao_treino.atualizar_series(db, db_obj=execucao, alteracoes=[(1, 1, {"concluida": False})])
+    with captura.em("execucao_treino.atualizar_exercicio"):
+        crud.execucao_treino.atualizar_exercicio(db, db_obj=execucao, ordem=1, obj_in={"observacoes": "ok"})
+    with captura.em("exercicio.update(grupo)"):
+        crud.exercicio.update(db, db_obj=exercicio, obj_in={"grupo_muscular": "Peitoral"})
+    return {"usuario": usuario.id, "exercicio": exercicio.id, "treino": treino.id, "execucao": execucao.id}
+
+def _leituras(ids: Dict[str, int]) -> List[Tuple[str, Callable[[Session], object]]]:
+    """Leituras feitas pelos endpoints, serializadas como nas respostas para disparar os carregamentos."""
+    usuario, exercicio, treino, execucao = ids["usuario"], ids["exercicio"], ids["treino"], ids["execucao"]
+    hoje = date.today()
+    inicio, fim = datetime.now() - timedelta(weeks=4), datetime.now() + timedelta(days=1)
+
+    def serializar(schema, objetos):
+        return [schema.model_validate(o) for o in objetos]
+
+    return [
+        ("user.get", lambda db: crud.user.get(db, id=usuario)),
+        ("user.get_by_email", lambda db: crud.user.get_by_email(db, email="auditoria@example.com")),
+        ("user.get_token_version", lambda db: crud.user.get_token_version(db, usuario_id=usuario)),
+        ("exercicio.get_multi_filtered", lambda db: crud.exercicio.get_multi_filtered(db, user_id=usuario)),
+        ("exercicio.get_multi_filtered(grupo)", lambda db: crud.exercicio.get_multi_filtered(
+            db, user_id=usuario, grupo_muscular="Peito", nome="Sup")),
+        ("exercicio.buscar", lambda db: crud.exercicio.buscar(db, user_id=usuario, q="sup re")),
+        ("exercicio.get_multi_by_owner", lambda db: crud.exercicio.get_multi_by_owner(db, user_id=usuario)),
+        ("exercicio.get_public_or_owner", lambda db: crud.exercicio.get_public_or_owner(db, id=exercicio, user_id=usuario)),
+        ("treino_fixo.get_multi_by_usuario", lambda db: serializar(
+            schemas.TreinoFixo, crud.treino_fixo.get_multi_by_usuario(db, usuario_id=usuario))),
+        ("execucao_treino.get_multi_by_usuario", lambda db: serializar(
+            schemas.workout_execution.ExecucaoTreino, crud.execucao_treino.get_multi_by_usuario(db, usuario_id=usuario))),
+        ("execucao_treino.get_multi_by_usuario_and_treino_fixo", lambda db: crud.execucao_treino.get_multi_by_usuario_and_treino_fixo(
+            db, usuario_id=usuario, treino_fixo_id=treino)),
+        ("execucao_treino.get_full_details", lambda db: crud.execucao_treino.get_full_details(db, id=execucao, usuario_id=usuario)),
+        ("serie.get_distribuicao_grupos", lambda db: crud.serie.get_distribuicao_grupos(
+            db, usuario_id=usuario, data_inicio=inicio, data_fim=fim, agrupamento="semana")),
+        ("volume_diario.get_periodo", lambda db: crud.volume_diario.get_periodo(
+            db, usuario_id=usuario, data_inicio=hoje - timedelta(days=30), data_fim=hoje)),
+        ("recorde_pessoal.get_multi_by_usuario", lambda db: crud.recorde_pessoal.get_multi_by_usuario(db, usuario_id=usuario)),
+        ("recorde_pessoal.get_by_exercicio", lambda db: crud.recorde_pessoal.get_by_exercicio(
+            db, usuario_id=usuario, exercicio_id=exercicio)),
+        ("dia_treino.get_dias", lambda db: crud.dia_treino.get_dias(db, usuario_id=usuario, data_inicio=hoje, data_fim=hoje)),
+        ("dia_treino.get_sequencias", lambda db: crud.dia_treino.get_sequencias(db, usuario_id=usuario, hoje=hoje)),
+        ("meta.get_multi_by_usuario", lambda db: crud.meta.get_multi_by_usuario(db, usuario_id=usuario, ativa=True)),
+        ("analytics.carregar_series", lambda db: analytics.carregar_series(db, usuario_id=usuario, exercicio_id=exercicio)),
+        ("execucao_treino.remove", lambda db: crud.execucao_treino.remove(db, id=execucao)),
+        ("treino_fixo.purgar", lambda db: crud.treino_fixo.purgar(db, id=treino)),
+    ]
+
+def auditar(engine: Engine = None) -> List[PlanoConsulta]:
+    """Roda a carga de leituras e devolve o plano de cada SELECT distinto emitido."""
+    if engine is None:
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    captura = _Captura()
+    event.listen(engine, "before_cursor_execute", captura)
+    try:
+        with Session(bind=engine, autoflush=False) as db:
+            ids = _popular(db, captura)
+            for etapa, leitura in _leituras(ids):
+                with captura.em(etapa):
+                    leitura(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", captura)
+
+    planos = []
+    with engine.connect() as conn:
+        for sql, (etapa, parametros) in captura.consultas.items():
+            plano = [linha[3] for linha in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+            varreduras = [] if etapa in VARREDURAS_ACEITAS else varreduras_completas(plano)
+            planos.append(PlanoConsulta(etapa, sql, plano, varreduras))
+    return planos
+
+def main() -> int:
+    planos = auditar()
+    com_varredura = [p for p in planos if p.varreduras]
+    for p in com_varredura:
+        print(f"[VARREDURA] {p.etapa}")
+        print(f"  {' '.join(p.sql.split())}")
+        for linha in p.plano:
+            print(f"    {linha}")
+    print(f"{len(planos)} consulta(s) analisada(s), {len(com_varredura)} com varredura completa.")
+    return 1 if com_varredura else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
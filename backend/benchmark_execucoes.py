@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark da gravação de execuções: compara o caminho antigo (um flush por exercício e uma
+Serie adicionada por vez na unidade de trabalho do ORM) com o INSERT em lote usado por
+crud.execucao_treino.create_with_exercicios, contando statements e medindo o tempo.
+
+Roda em um banco SQLite temporário com o esquema dos modelos:
+
+    python benchmark_execucoes.py [--exercicios 10] [--series 4] [--repeticoes 200]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.db.base  # noqa: F401 - registra todos os modelos
+from app import crud
+from app.db.base_class import Base
+from app.db.session import create_db_engine
+from app.models.exercise import Exercicio
+from app.models.user import User
+from app.models.workout import TreinoFixo
+from app.models.workout_execution import ExecucaoExercicio, ExecucaoTreino, Serie
+from app.schemas.workout_execution import ExecucaoTreinoCreate
+
+def _payload(treino_fixo_id: int, exercicio_ids: list, series: int) -> ExecucaoTreinoCreate:
+    return ExecucaoTreinoCreate(
+        treino_fixo_id=treino_fixo_id,
+        exercicios_executados=[
+            {
+                "exercicio_id": exercicio_id,
+                "ordem": ordem,
+                "series": [
+                    {"ordem": s, "repeticoes": 10, "peso": 20.0 + s, "concluida": True}
+                    for s in range(1, series + 1)
+                ],
+            }
+            for ordem, exercicio_id in enumerate(exercicio_ids, start=1)
+        ],
+    )
+
+def _criar_por_linha(db: Session, obj_in: ExecucaoTreinoCreate, usuario_id: int) -> None:
+    """Caminho anterior ao INSERT em lote (sem os agregados, que são iguais nos dois)."""
+    db_execucao_treino = ExecucaoTreino(treino_fixo_id=obj_in.treino_fixo_id, usuario_id=usuario_id)
+    db.add(db_execucao_treino)
+    db.flush()
+    for ex_exec_in in obj_in.exercicios_executados:
+        db_execucao_exercicio = ExecucaoExercicio(
+            **ex_exec_in.model_dump(exclude={"series"}), execucao_treino_id=db_execucao_treino.id
+        )
+        db.add(db_execucao_exercicio)
+        db.flush()
+        for serie_in in ex_exec_in.series:
+            db.add(Serie(**serie_in.model_dump(), execucao_exercicio_id=db_execucao_exercicio.id))
+    db.flush()
+    db.commit()
+
+def _criar_em_lote(db: Session, obj_in: ExecucaoTreinoCreate, usuario_id: int) -> None:
+    """Apenas as inserções de create_with_exercicios, para comparar com _criar_por_linha."""
+    db_execucao_treino = ExecucaoTreino(treino_fixo_id=obj_in.treino_fixo_id, usuario_id=usuario_id)
+    db.add(db_execucao_treino)
+    db.flush()
+    crud.execucao_treino._inserir_exercicios(
+        db,
+        execucao_treino_id=db_execucao_treino.id,
+        exercicios=[
+            (ex.model_dump(exclude={"series"}), [serie.model_dump() for serie in ex.series])
+            for ex in obj_in.exercicios_executados
+        ],
+    )
+    db.commit()
+
+def _medir(
+    SessionLocal: sessionmaker, gravar: Callable, obj_in: ExecucaoTreinoCreate, usuario_id: int, repeticoes: int
+) -> Tuple[float, int]:
+    engine = SessionLocal.kw["bind"]
+    statements = 0
+
+    def contar(*args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", contar)
+    inicio = time.perf_counter()
+    try:
+        for _ in range(repeticoes):
+            with SessionLocal() as db:
+                gravar(db, obj_in, usuario_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    return (time.perf_counter() - inicio) / repeticoes * 1000, statements // repeticoes
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exercicios", type=int, default=10)
+    parser.add_argument("--series", type=int, default=4)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_db_engine(f"sqlite:///{Path(pasta) / 'benchmark.db'}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+        with SessionLocal() as db:
+            usuario = User(nome="Benchmark", email="benchmark@example.com", senha_hash="-")
+            db.add(usuario)
+            db.flush()
+            treino = TreinoFixo(nome="Benchmark", usuario_id=usuario.id)
+            exercicios = [Exercicio(nome=f"Exercício {i}", grupo_muscular="Peito", dificuldade="medio") for i in range(args.exercicios)]
+            db.add_all([treino, *exercicios])
+            db.commit()
+            obj_in = _payload(treino.id, [e.id for e in exercicios], args.series)
+            usuario_id = usuario.id
+
+        print(f"Execução com {args.exercicios} exercícios x {args.series} séries, {args.repeticoes} repetições")
+        for nome, gravar in (("por linha (flush por exercício)", _criar_por_linha), ("em lote (executemany)", _criar_em_lote)):
+            ms, statements = _medir(SessionLocal, gravar, obj_in, usuario_id, args.repeticoes)
+            print(f"  {nome:<32} {ms:8.2f} ms/execução  {statements:4d} statements")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
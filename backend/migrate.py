@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Script para aplicar as migrações pendentes do banco de dados (app/db/migrations).
+Substitui o create_all na inicialização e scripts avulsos como add_duracao_column.py.
+"""
+
+from app.db.migrate import main
+
+if __name__ == "__main__":
+    main()
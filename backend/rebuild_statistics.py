@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Script para (re)construir as tabelas de estatísticas (volume_diario, recorde_pessoal,
+dia_treino)
+a partir do histórico de execuções
+"""
+
+import app.db.base  # noqa: F401 - registra todos os modelos
+from app import crud
+from app.db.migrate import verificar_versao
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+
+def main():
+    # As tabelas de estatísticas são criadas pelas migrações (python migrate.py)
+    verificar_versao(engine)
+
+    db = SessionLocal()
+    try:
+        usuario_ids = [id_ for (id_,) in db.query(User.id).all()]
+        for usuario_id in usuario_ids:
+            crud.volume_diario.reconstruir(db, usuario_id=usuario_id)
+            crud.recorde_pessoal.reconstruir(db, usuario_id=usuario_id)
+            crud.dia_treino.reconstruir(db, usuario_id=usuario_id)
+        print(f"Estatísticas reconstruídas para {len(usuario_ids)} usuário(s).")
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao reconstruir as estatísticas: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
 # Exercise endpoint tests
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app import crud
+from app.api import deps
+from app.core.cache import catalogo_publico
 from app.core.config import settings
+from app.db.base import Base
+from app.db.session import create_async_db_engine, create_db_engine
+from app.main import app
+from app.models.exercise import Exercicio
+from app.schemas.exercise import ExercicioCreate
+from app.schemas.user import UserCreate
+from tests.utils.exercise import create_random_exercise
+from tests.utils.queries import assert_max_queries
 from tests.utils.user import create_random_user
 
 @ pytest.fixture(scope="function")
@@ -132,3 +146,228 @@ def test_delete_exercise(client: TestClient, db: Session, user_token_headers: di
         headers=user_token_headers
     )
     assert r3.status_code == 404
+
+
+def test_bulk_update_only_touches_own_exercises(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    """Test toggling publico on several exercises with one request."""
+    ids = []
+    for nome in ("Remada", "Puxada", "Rosca"):
+        r = client.post(
+            f"{settings.API_V1_STR}/exercicios/",
+            json={"nome": nome, "grupo_muscular": "Costas", "dificuldade": "medio", "publico": False},
+            headers=user_token_headers,
+        )
+        ids.append(r.json()["id"])
+    outro = crud.user.create(db, obj_in=UserCreate(email="outro@example.com", password="testpassword", nome="Outro"))
+    alheio = create_random_exercise(db, user_id=outro.id)
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/exercicios/",
+        json={"ids": ids[:2] + [alheio.id], "publico": True},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json() == {"atualizados": 2}
+
+    r = client.get(f"{settings.API_V1_STR}/exercicios/", params={"grupo_muscular": "Costas"}, headers=user_token_headers)
+    assert {e["nome"]: e["publico"] for e in r.json()} == {"Remada": True, "Puxada": True, "Rosca": False}
+
+    # Explicit nulls for required columns are rejected instead of reaching the UPDATE
+    for campo in ("grupo_muscular", "dificuldade", "publico"):
+        r = client.patch(f"{settings.API_V1_STR}/exercicios/", json={"ids": ids, campo: None}, headers=user_token_headers)
+        assert r.status_code == 422, campo
+
+
+def test_update_reads_values_back_from_returning(db: Session) -> None:
+    """Test that update does not re-select the row after committing."""
+    exercicio = create_random_exercise(db)
+    antes = exercicio.data_atualizacao
+
+    selects = []
+    def registrar(conn, cursor, statement, *args) -> None:
+        if statement.startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", registrar)
+    try:
+        atualizado = crud.exercicio.update(db, db_obj=exercicio, obj_in={"nome": "Supino Inclinado", "inexistente": 1})
+        assert (atualizado.nome, atualizado.publico) == ("Supino Inclinado", True)
+        assert atualizado.data_atualizacao >= antes
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", registrar)
+    assert selects == []
+
+
+def test_search_ranks_prefix_matches_and_follows_writes(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    """Test the full-text search endpoint and that the index follows updates and deletes."""
+    criados = {}
+    for corpo in (
+        {"nome": "Remada Curvada", "descricao": "Variação do supino para as costas", "publico": True},
+        {"nome": "Supino Reto", "publico": True},
+        {"nome": "Supino Inclinado", "instrucoes": "Banco a 30 graus", "publico": False},
+        {"nome": "Agachamento Livre", "instrucoes": "Desça até o paralelo", "publico": False},
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/exercicios/",
+            json={"grupo_muscular": "Peito", "dificuldade": "medio", **corpo},
+            headers=user_token_headers,
+        )
+        criados[corpo["nome"]] = r.json()["id"]
+    outro = crud.user.create(db, obj_in=UserCreate(email="outro@example.com", password="testpassword", nome="Outro"))
+    crud.exercicio.create_with_owner(
+        db, obj_in=ExercicioCreate(nome="Supino Privado", grupo_muscular="Peito", dificuldade="medio"), user_id=outro.id
+    )
+
+    def buscar(q: str) -> list:
+        r = client.get(f"{settings.API_V1_STR}/exercicios/busca", params={"q": q}, headers=user_token_headers)
+        assert r.status_code == 200
+        return [e["nome"] for e in r.json()]
+
+    # Name matches rank above the description match; other users' private exercises are hidden
+    assert buscar("sup")[-1] == "Remada Curvada"
+    assert set(buscar("sup")) == {"Supino Reto", "Supino Inclinado", "Remada Curvada"}
+    assert buscar("SUP inc") == ["Supino Inclinado"]
+    assert buscar("graus") == ["Supino Inclinado"]
+    assert buscar("desca ate") == ["Agachamento Livre"]  # accents are ignored
+    assert buscar('"*') == []
+
+    client.put(f"{settings.API_V1_STR}/exercicios/{criados['Supino Reto']}", json={"nome": "Crucifixo"}, headers=user_token_headers)
+    client.delete(f"{settings.API_V1_STR}/exercicios/{criados['Supino Inclinado']}", headers=user_token_headers)
+    assert buscar("cruc") == ["Crucifixo"]
+    assert buscar("sup") == ["Remada Curvada"]
+
+
+def test_listing_serves_public_catalog_from_memory(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    """Test that the cached public catalog is merged with private exercises and follows writes."""
+    outro = crud.user.create(db, obj_in=UserCreate(email="outro@example.com", password="testpassword", nome="Outro"))
+    publicos = [create_random_exercise(db, user_id=outro.id, nome=f"Publico {i}").id for i in range(3)]
+    crud.exercicio.create_with_owner(
+        db, obj_in=ExercicioCreate(nome="Privado Alheio", grupo_muscular="Peito", dificuldade="medio"), user_id=outro.id
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/exercicios/",
+        json={"nome": "Privado Meu", "grupo_muscular": "Costas", "dificuldade": "medio", "publico": False},
+        headers=user_token_headers,
+    )
+    meu = r.json()["id"]
+    url = f"{settings.API_V1_STR}/exercicios/"
+
+    def listar(**params) -> list:
+        r = client.get(url, params=params, headers=user_token_headers)
+        assert r.status_code == 200
+        return [e["id"] for e in r.json()]
+
+    assert listar() == publicos + [meu]
+    # Warm catalog: only the watermark and the user's private exercises are read from the database
+    with assert_max_queries(2):
+        assert listar(grupo_muscular="cost") == [meu]
+
+    # Keyset pages merge the cached and the private rows by id
+    r = client.get(url, params={"limit": 2}, headers=user_token_headers)
+    assert [e["id"] for e in r.json()] == publicos[:2]
+    assert listar(limit=2, cursor=r.headers["X-Next-Cursor"]) == [publicos[2], meu]
+    assert listar(skip=3, limit=2) == [meu]
+
+    crud.exercicio.update(db, db_obj=crud.exercicio.get(db, id=publicos[0]), obj_in={"nome": "Renomeado"})
+    assert client.get(url, params={"nome": "renom"}, headers=user_token_headers).json()[0]["nome"] == "Renomeado"
+    client.patch(url, json={"ids": [meu], "publico": True}, headers=user_token_headers)
+    crud.exercicio.update_many(db, publicos[1:], {"publico": False})
+    assert listar() == [publicos[0], meu]
+
+
+def test_public_catalog_is_loaded_from_the_primary_not_a_lagging_replica(
+    client: TestClient, db: Session, user_token_headers: dict, tmp_path
+) -> None:
+    """Test that a cold catalog is never filled from a replica that missed the latest writes."""
+    url_replica = f"sqlite:///{tmp_path / 'replica.db'}"
+    Base.metadata.create_all(bind=create_db_engine(url_replica)) # replica still without any exercise
+    replica = async_sessionmaker(bind=create_async_db_engine(url_replica, poolclass=NullPool))
+
+    async def override_get_async_read_db():
+        async with replica() as async_db:
+            yield async_db
+
+    publico = create_random_exercise(db).id
+    catalogo_publico.invalidar()
+    app.dependency_overrides[deps.get_async_read_db] = override_get_async_read_db
+    r = client.get(f"{settings.API_V1_STR}/exercicios/", headers=user_token_headers)
+    assert [e["id"] for e in r.json()] == [publico]
+    assert [item.id for item in catalogo_publico.get(catalogo_publico.marca)] == [publico]
+
+
+def test_public_catalog_sees_writes_from_other_workers_before_the_ttl(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    """Test that writes which never called invalidar() (another process) still refresh the catalog."""
+    publicos = [create_random_exercise(db, nome=f"Exercicio {i}").id for i in range(3)]
+    url = f"{settings.API_V1_STR}/exercicios/"
+
+    def listar() -> list:
+        r = client.get(url, headers=user_token_headers)
+        assert r.status_code == 200
+        return [(e["id"], e["nome"]) for e in r.json()]
+
+    assert [id for id, _ in listar()] == publicos
+    versao = catalogo_publico.versao
+    # Core statements bypass crud, like a write served by another worker
+    db.execute(update(Exercicio).where(Exercicio.id == publicos[0]).values(nome="Editado"))
+    db.commit()
+    assert listar()[0] == (publicos[0], "Editado")
+    db.execute(update(Exercicio).where(Exercicio.id == publicos[1]).values(publico=False))
+    db.commit()
+    assert [id for id, _ in listar()] == [publicos[0], publicos[2]]
+    db.execute(delete(Exercicio).where(Exercicio.id == publicos[2]))
+    db.add(Exercicio(nome="Novo", grupo_muscular="Costas", dificuldade="medio", publico=True))
+    db.commit()
+    assert [nome for _, nome in listar()] == ["Editado", "Novo"]
+    assert catalogo_publico.versao == versao
+
+
+def test_listing_answers_not_modified_for_a_matching_etag(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    """Test conditional GET on the exercise listing."""
+    create_random_exercise(db)
+    url = f"{settings.API_V1_STR}/exercicios/"
+    r = client.get(url, headers=user_token_headers)
+    etag = r.headers["ETag"]
+    assert r.headers["Cache-Control"] == "private, no-cache"
+
+    r = client.get(url, headers={**user_token_headers, "If-None-Match": f'"outro", {etag}'})
+    assert (r.status_code, r.content) == (304, b"")
+    assert client.get(url, params={"nome": "sup"}, headers={**user_token_headers, "If-None-Match": etag}).status_code == 304
+
+    client.post(url, json={"nome": "Remada", "grupo_muscular": "Costas", "dificuldade": "medio"}, headers=user_token_headers)
+    r = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+
+def test_exercise_in_use_is_kept_with_other_users_history(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    """Test that deleting an exercise never cascades into other users' workouts or executions."""
+    dono = create_random_user(db)
+    usado = create_random_exercise(db, user_id=dono.id, nome="Supino")
+    livre = create_random_exercise(db, user_id=dono.id, nome="Crucifixo")
+    outro = crud.user.create(db, obj_in=UserCreate(email="outro@example.com", password="testpassword", nome="Outro"))
+    r = client.post(f"{settings.API_V1_STR}/auth/login", data={"username": "outro@example.com", "password": "testpassword"})
+    headers_outro = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    treino = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino B"}, headers=headers_outro).json()
+    client.post(f"{settings.API_V1_STR}/treinos/{treino['id']}/exercicios", json={"exercicio_id": usado.id, "ordem": 1}, headers=headers_outro)
+    r = client.post(f"{settings.API_V1_STR}/execucoes/", json={
+        "treino_fixo_id": treino["id"],
+        "data_inicio": "2024-05-15T10:00:00",
+        "exercicios_executados": [{"exercicio_id": usado.id, "ordem": 1, "series": [{"ordem": 1, "repeticoes": 10, "peso": 50, "concluida": True}]}],
+    }, headers=headers_outro)
+    assert r.status_code == 200
+
+    r = client.delete(f"{settings.API_V1_STR}/exercicios/{usado.id}", headers=user_token_headers)
+    assert r.status_code == 409
+    r = client.delete(f"{settings.API_V1_STR}/exercicios/{livre.id}", headers=user_token_headers)
+    assert r.status_code == 204
+
+    # Deleting the owner leaves the exercise without an owner instead of erasing the other user's history
+    crud.user.remove(db, id=dono.id)
+    db.expire_all()
+    assert crud.exercicio.get(db, id=usado.id).usuario_id is None
+    r = client.get(f"{settings.API_V1_STR}/treinos/{treino['id']}", headers=headers_outro)
+    assert [et["exercicio_id"] for et in r.json()["exercicios_treino"]] == [usado.id]
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/volume", params={"data_inicio": "2024-05-01", "data_fim": "2024-05-31"}, headers=headers_outro)
+    assert r.status_code == 200 and r.json()
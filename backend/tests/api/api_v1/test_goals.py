@@ -0,0 +1,184 @@
+# Goal endpoint tests
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from tests.utils.exercise import create_random_exercise
+from tests.utils.user import create_random_user
+from tests.utils.workout import create_random_treino
+
+
+def _post_execution(
+    client: TestClient, headers: dict, treino_id: int, exercicio_id: int, data_inicio: str, peso: float, peso_corporal: float = 80
+) -> int:
+    payload = {
+        "treino_fixo_id": treino_id,
+        "data_inicio": data_inicio,
+        "peso_corporal": peso_corporal,
+        "exercicios_executados": [{"exercicio_id": exercicio_id, "ordem": 1, "series": [
+            {"ordem": 1, "repeticoes": 5, "peso": peso, "concluida": True},
+        ]}],
+    }
+    r = client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=headers)
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+def test_goals_progress_is_updated_by_executions(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+
+    # Execução anterior à criação das metas entra no valor inicial
+    _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-02T10:00:00", 100)
+
+    metas = {}
+    for tipo, alvo in (("treino", 12), ("carga", 140), ("peso", 75)):
+        r = client.post(
+            f"{settings.API_V1_STR}/metas/",
+            json={"tipo": tipo, "valor_alvo": alvo, "data_inicio": "2024-06-01", "data_fim": "2024-06-30"},
+            headers=user_token_headers,
+        )
+        assert r.status_code == 201
+        metas[tipo] = r.json()
+    assert metas["treino"]["valor_atual"] == 1
+    assert metas["carga"]["valor_atual"] == 100
+    assert metas["peso"]["valor_atual"] == 80
+
+    execucao_id = _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-10T10:00:00", 120)
+    # Fora da janela das metas: não altera o progresso
+    _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-07-10T10:00:00", 200)
+    r = client.put(
+        f"{settings.API_V1_STR}/execucoes/{execucao_id}",
+        json={"peso_corporal": 78.5},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+
+    r = client.get(f"{settings.API_V1_STR}/metas/", params={"ativa": True}, headers=user_token_headers)
+    assert r.status_code == 200
+    progresso = {m["tipo"]: m["valor_atual"] for m in r.json()}
+    assert progresso == {"treino": 2, "carga": 120, "peso": 78.5}
+
+    client.delete(f"{settings.API_V1_STR}/execucoes/{execucao_id}", headers=user_token_headers)
+    r = client.get(f"{settings.API_V1_STR}/metas/{metas['treino']['id']}", headers=user_token_headers)
+    assert r.json()["valor_atual"] == 1
+
+
+def test_weight_goal_follows_the_latest_execution(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+    r = client.post(
+        f"{settings.API_V1_STR}/metas/",
+        json={"tipo": "peso", "valor_alvo": 75, "data_inicio": "2024-06-01", "data_fim": "2024-06-30"},
+        headers=user_token_headers,
+    )
+    url_meta = f"{settings.API_V1_STR}/metas/{r.json()['id']}"
+
+    def peso_atual() -> float:
+        return client.get(url_meta, headers=user_token_headers).json()["valor_atual"]
+
+    recente = _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-20T10:00:00", 100, 79)
+    antiga = _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-05T10:00:00", 100, 82)
+    assert peso_atual() == 79
+
+    # Editing sets or the weight of an older execution keeps the latest weight
+    r = client.patch(
+        f"{settings.API_V1_STR}/execucoes/{recente}/series",
+        json=[{"exercicio_ordem": 1, "ordem": 1, "peso": 105}],
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    client.put(f"{settings.API_V1_STR}/execucoes/{antiga}", json={"peso_corporal": 81}, headers=user_token_headers)
+    client.put(f"{settings.API_V1_STR}/execucoes/{recente}", json={"observacoes_gerais": "ok"}, headers=user_token_headers)
+    assert peso_atual() == 79
+
+    client.put(f"{settings.API_V1_STR}/execucoes/{recente}", json={"peso_corporal": 78}, headers=user_token_headers)
+    assert peso_atual() == 78
+    # Removing the latest execution falls back to the previous weight
+    client.delete(f"{settings.API_V1_STR}/execucoes/{recente}", headers=user_token_headers)
+    assert peso_atual() == 81
+
+
+def test_reactivated_goal_catches_up_with_executions_logged_while_inactive(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+    _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-02T10:00:00", 100)
+    r = client.post(
+        f"{settings.API_V1_STR}/metas/",
+        json={"tipo": "treino", "valor_alvo": 12, "data_inicio": "2024-06-01"},
+        headers=user_token_headers,
+    )
+    url_meta = f"{settings.API_V1_STR}/metas/{r.json()['id']}"
+
+    client.put(url_meta, json={"ativa": False}, headers=user_token_headers)
+    _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-03T10:00:00", 100)
+    assert client.get(url_meta, headers=user_token_headers).json()["valor_atual"] == 1
+
+    r = client.put(url_meta, json={"ativa": True}, headers=user_token_headers)
+    assert r.json()["valor_atual"] == 2
+
+
+def test_load_goal_drops_when_its_maximum_set_is_corrected_or_removed(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+    r = client.post(
+        f"{settings.API_V1_STR}/metas/",
+        json={"tipo": "carga", "valor_alvo": 140, "data_inicio": "2024-06-01"},
+        headers=user_token_headers,
+    )
+    url_meta = f"{settings.API_V1_STR}/metas/{r.json()['id']}"
+
+    def carga_atual() -> float:
+        return client.get(url_meta, headers=user_token_headers).json()["valor_atual"]
+
+    anterior = _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-02T10:00:00", 100)
+    digitada = _post_execution(client, user_token_headers, treino.id, exercicio.id, "2024-06-03T10:00:00", 500)
+    assert carga_atual() == 500
+
+    # A typo fixed from 500 kg down to 50 kg no longer counts as the best load
+    r = client.patch(
+        f"{settings.API_V1_STR}/execucoes/{digitada}/exercicios/1/series/1", json={"peso": 50}, headers=user_token_headers
+    )
+    assert r.status_code == 200
+    assert carga_atual() == 100
+
+    client.delete(f"{settings.API_V1_STR}/execucoes/{anterior}", headers=user_token_headers)
+    assert carga_atual() == 50
+
+
+def test_goal_with_invalid_type_is_rejected(client: TestClient, user_token_headers: dict) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/metas/",
+        json={"tipo": "distancia", "valor_alvo": 10, "data_inicio": "2024-06-01"},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 400
+
+
+def test_goal_update_rejects_nulls_and_ignores_client_progress(client: TestClient, user_token_headers: dict) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/metas/",
+        json={"tipo": "treino", "valor_alvo": 12, "data_inicio": "2024-06-01", "valor_atual": 50},
+        headers=user_token_headers,
+    )
+    assert r.json()["valor_atual"] == 0
+    url_meta = f"{settings.API_V1_STR}/metas/{r.json()['id']}"
+
+    for campo in ("tipo", "valor_alvo", "data_inicio", "ativa"):
+        r = client.put(url_meta, json={campo: None}, headers=user_token_headers)
+        assert r.status_code == 422, campo
+    r = client.put(url_meta, json={"valor_atual": 50, "data_fim": None}, headers=user_token_headers)
+    assert r.status_code == 200
+    assert r.json()["valor_atual"] == 0
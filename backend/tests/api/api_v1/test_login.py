@@ -1,8 +1,14 @@
 # Login endpoint tests
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from app.api import deps
+from app.core import security
+from app.core.cache import user_cache
 from app.core.config import settings
+from app.main import app
 from tests.utils.user import create_random_user
 
 def test_get_access_token(
@@ -36,3 +42,91 @@ def test_use_access_token(
     assert r_user.status_code == 200
     current_user = r_user.json()
     assert current_user["email"] == user.email
+
+def test_login_rehashes_outdated_password_hash(
+    client: TestClient, db: Session
+) -> None:
+    user = create_random_user(db)
+    hash_antigo = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("testpassword")
+    user.senha_hash = hash_antigo
+    db.commit()
+
+    login_data = {"username": user.email, "password": "testpassword"}
+    r = client.post(f"{settings.API_V1_STR}/auth/login", data=login_data)
+    assert r.status_code == 200
+    db.refresh(user)
+    assert user.senha_hash != hash_antigo
+    assert not security.pwd_context.needs_update(user.senha_hash)
+    assert security.verify_password("testpassword", user.senha_hash)
+
+def test_login_sheds_load_when_hash_queue_is_full(
+    client: TestClient, db: Session, monkeypatch
+) -> None:
+    user = create_random_user(db)
+    monkeypatch.setattr(security.password_hasher, "max_pending", 0)
+    login_data = {"username": user.email, "password": "testpassword"}
+    r = client.post(f"{settings.API_V1_STR}/auth/login", data=login_data)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+def test_stateless_token_skips_user_lookup_and_can_be_revoked(
+    client: TestClient, db: Session, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "STATELESS_TOKENS", True)
+    user = create_random_user(db)
+    login_data = {"username": user.email, "password": "testpassword"}
+    r = client.post(f"{settings.API_V1_STR}/auth/login", data=login_data)
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    user_cache.clear()
+    r = client.get(f"{settings.API_V1_STR}/treinos/", headers=headers)
+    assert r.status_code == 200
+    assert user_cache.stats()["misses"] == 0
+
+    # Endpoints que precisam do registro completo o carregam sob demanda
+    commits = []
+    def registrar(session) -> None:
+        commits.append(session)
+
+    event.listen(db, "after_commit", registrar)
+    try:
+        r = client.put(f"{settings.API_V1_STR}/usuarios/me", json={"password": "novasenha"}, headers=headers)
+    finally:
+        event.remove(db, "after_commit", registrar)
+    assert r.status_code == 200
+    assert r.json()["email"] == user.email
+    # The new password and the token revocation are a single commit
+    assert len(commits) == 1
+
+    # Trocar a senha revoga os tokens emitidos antes; a resposta traz o token novo
+    r_treinos = client.get(f"{settings.API_V1_STR}/treinos/", headers=headers)
+    assert r_treinos.status_code == 403
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    r = client.get(f"{settings.API_V1_STR}/treinos/", headers=headers)
+    assert r.status_code == 200
+    r = client.post(
+        f"{settings.API_V1_STR}/auth/login", data={"username": user.email, "password": "novasenha"}
+    )
+    assert r.status_code == 200
+
+    # Updates without a password keep the current token and return none
+    r = client.put(f"{settings.API_V1_STR}/usuarios/me", json={"nome": "Outro Nome"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["access_token"] is None
+    r = client.get(f"{settings.API_V1_STR}/treinos/", headers=headers)
+    assert r.status_code == 200
+
+
+def test_async_routers_authenticate_without_a_sync_session(
+    client: TestClient, user_token_headers: dict
+) -> None:
+    def sem_sessao_sincrona():
+        raise AssertionError("async routers must not open a sync session")
+        yield
+
+    app.dependency_overrides[deps.get_db] = sem_sessao_sincrona
+    user_cache.clear()
+    for caminho in ("/treinos/", "/exercicios/", "/execucoes/"):
+        r = client.get(f"{settings.API_V1_STR}{caminho}", headers=user_token_headers)
+        assert r.status_code == 200, caminho
+    assert user_cache.stats()["misses"] == 1
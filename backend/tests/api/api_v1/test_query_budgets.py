@@ -0,0 +1,156 @@
+# Query budgets for every route in api_v1/endpoints
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.core.config import settings
+from app.db.instrumentacao import medir_consultas
+from app.main import app
+from tests.utils.exercise import create_random_exercise
+from tests.utils.queries import assert_max_queries
+from tests.utils.user import create_random_user
+from tests.utils.workout import create_random_treino
+
+EXECUCAO = {
+    "data_inicio": "2024-05-15T10:00:00",
+    "exercicios_executados": [{"exercicio_id": "{exercicio}", "ordem": 1, "series": [
+        {"ordem": 1, "repeticoes": 10, "peso": 50, "concluida": True},
+        {"ordem": 2, "repeticoes": 8, "peso": 60, "concluida": True},
+    ]}],
+}
+
+# (method, path, json body, max statements). Paths are formatted with the ids of _cenario.
+# The budgets are the current counts: raising one should come with a reason in the commit.
+# Authentication is served by the user cache warmed up by the login of user_token_headers.
+ROTAS = [
+    ("GET", "/auth/ping", None, 0),
+    ("POST", "/auth/login", "login", 1),
+    ("POST", "/auth/register", {"email": "novo@example.com", "password": "x", "nome": "Novo"}, 3),
+    ("POST", "/auth/test-token", None, 0),
+    ("POST", "/usuarios/", {"email": "novo@example.com", "password": "x", "nome": "Novo"}, 3),
+    ("GET", "/usuarios/", None, 1),
+    ("GET", "/usuarios/me", None, 0),
+    ("PUT", "/usuarios/me", {"nome": "Outro Nome"}, 1),
+    ("GET", "/usuarios/{usuario}", None, 1),
+    ("POST", "/exercicios/", {"nome": "Remada", "grupo_muscular": "Costas", "dificuldade": "medio"}, 2),
+    ("GET", "/exercicios/", None, 3),  # cold public catalog; 2 once it is cached (watermark + private)
+    ("GET", "/exercicios/busca?q=sup", None, 1),
+    ("PATCH", "/exercicios/", {"ids": ["{exercicio}"], "publico": False}, 1),
+    ("GET", "/exercicios/{exercicio}", None, 1),
+    ("PUT", "/exercicios/{exercicio}", {"nome": "Supino Reto"}, 2),
+    ("DELETE", "/exercicios/{exercicio_livre}", None, 4),
+    ("GET", "/treinos/", None, 3),
+    ("GET", "/treinos/{treino}", None, 3),
+    ("POST", "/treinos/", {"nome": "Treino B"}, 3),
+    ("PUT", "/treinos/{treino}", {"nome": "Treino B"}, 4),
+    ("DELETE", "/treinos/{treino}", None, 18),
+    ("POST", "/treinos/{treino}/exercicios", {"exercicio_id": "{exercicio}", "ordem": 2}, 5),
+    ("PUT", "/treinos/{treino}/exercicios/{exercicio_treino}", {"id": "{exercicio_treino}", "exercicio_id": "{exercicio}", "ordem": 3}, 6),
+    ("DELETE", "/treinos/{treino}/exercicios/{exercicio_treino}", None, 6),
+    ("POST", "/execucoes/start", {"treino_fixo_id": "{treino}"}, 15),
+    ("POST", "/execucoes/", {**EXECUCAO, "treino_fixo_id": "{treino}"}, 18),
+    ("GET", "/execucoes/by-workout/{treino}", None, 5),
+    ("GET", "/execucoes/", None, 4),
+    ("GET", "/execucoes/{execucao}", None, 4),
+    ("PUT", "/execucoes/{execucao}", {"observacoes_gerais": "ok"}, 7),
+    ("PATCH", "/execucoes/{execucao}/series", [{"exercicio_ordem": 1, "ordem": 1, "peso": 55}], 8),
+    ("PATCH", "/execucoes/{execucao}/exercicios/1/series/2", {"repeticoes": 9}, 10),
+    ("PATCH", "/execucoes/{execucao}/exercicios/1", {"observacoes": "ok"}, 3),
+    ("DELETE", "/execucoes/{execucao}", None, 14),
+    ("GET", "/estatisticas/volume?data_inicio=2024-05-01&data_fim=2024-05-31", None, 1),
+    ("GET", "/estatisticas/recordes", None, 1),
+    ("GET", "/estatisticas/recordes/{exercicio}", None, 1),
+    ("GET", "/estatisticas/progresso", None, 1),
+    ("GET", "/estatisticas/progresso/{exercicio}", None, 1),
+    ("GET", "/estatisticas/calendario?ano=2024&mes=5", None, 2),
+    ("GET", "/estatisticas/grupos-musculares", None, 1),
+    ("POST", "/metas/", {"tipo": "treino", "valor_alvo": 12, "data_inicio": "2024-05-01"}, 3),
+    ("GET", "/metas/", None, 1),
+    ("GET", "/metas/{meta}", None, 1),
+    ("PUT", "/metas/{meta}", {"valor_alvo": 20}, 2),
+    ("DELETE", "/metas/{meta}", None, 2),
+]
+
+
+def _formatar(valor, ids: dict):
+    if isinstance(valor, str):
+        formatado = valor.format(**ids)
+        return int(formatado) if formatado != valor and formatado.isdigit() else formatado
+    if isinstance(valor, list):
+        return [_formatar(v, ids) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _formatar(v, ids) for k, v in valor.items()}
+    return valor
+
+
+def _cenario(client: TestClient, db: Session, headers: dict) -> dict:
+    """A user with an exercise, a workout using it, one execution with two sets, an unused exercise and a goal."""
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    exercicio_livre = create_random_exercise(db, user_id=user.id, nome="Crucifixo")
+    treino = create_random_treino(db, user_id=user.id)
+    exercicio_treino = crud.exercicio_treino.create(
+        db, obj_in={"treino_fixo_id": treino.id, "exercicio_id": exercicio.id, "ordem": 1}
+    )
+    payload = _formatar({**EXECUCAO, "treino_fixo_id": "{treino}"}, {"treino": treino.id, "exercicio": exercicio.id})
+    execucao = client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=headers).json()
+    meta = crud.meta.create_with_owner(
+        db, obj_in=schemas.MetaCreate(tipo="treino", valor_alvo=10, data_inicio=date(2024, 5, 1)), usuario_id=user.id
+    )
+    return {
+        "usuario": user.id,
+        "exercicio": exercicio.id,
+        "exercicio_livre": exercicio_livre.id,
+        "treino": treino.id,
+        "exercicio_treino": exercicio_treino.id,
+        "execucao": execucao["id"],
+        "meta": meta.id,
+    }
+
+
+def _padrao(caminho: str) -> str:
+    """Path with every parameter segment (template or literal id) replaced by *."""
+    return "/".join("*" if p.startswith("{") or p.isdigit() else p for p in caminho.split("?")[0].split("/"))
+
+
+def test_every_route_has_a_budget() -> None:
+    rotas = {
+        (metodo.upper(), _padrao(caminho[len(settings.API_V1_STR):]))
+        for caminho, operacoes in app.openapi()["paths"].items()
+        if caminho.startswith(settings.API_V1_STR)
+        for metodo in operacoes
+    }
+    assert rotas == {(metodo, _padrao(caminho)) for metodo, caminho, _, _ in ROTAS}
+
+
+@pytest.mark.parametrize("metodo,caminho,corpo,limite", ROTAS, ids=[f"{m} {c}" for m, c, _, _ in ROTAS])
+def test_route_query_budget(
+    client: TestClient, db: Session, user_token_headers: dict, metodo: str, caminho: str, corpo, limite: int
+) -> None:
+    ids = _cenario(client, db, user_token_headers)
+    # The login form is the only body that is not JSON
+    kwargs = {"data": {"username": "test@example.com", "password": "testpassword"}} if corpo == "login" else {"json": _formatar(corpo, ids)}
+    with assert_max_queries(limite):
+        r = client.request(metodo, f"{settings.API_V1_STR}{_formatar(caminho, ids)}", headers=user_token_headers, **kwargs)
+    assert r.status_code < 400, r.text
+
+
+def test_debug_headers_report_the_request_queries(
+    client: TestClient, db: Session, user_token_headers: dict, monkeypatch
+) -> None:
+    ids = _cenario(client, db, user_token_headers)
+    middleware = next(m for m in app.user_middleware if m.cls.__name__ == "InstrumentacaoSQLMiddleware")
+    monkeypatch.setitem(middleware.kwargs, "cabecalhos", True)
+    app.middleware_stack = app.build_middleware_stack()
+    try:
+        with medir_consultas() as registro:
+            r = client.get(f"{settings.API_V1_STR}/execucoes/{ids['execucao']}", headers=user_token_headers)
+    finally:
+        monkeypatch.undo()
+        app.middleware_stack = app.build_middleware_stack()
+    assert r.headers["X-DB-Queries"] == str(registro.statements)
+    assert float(r.headers["X-DB-Time-Ms"]) > 0
+    assert r.headers["X-DB-Repeated"] == str(registro.statements_repetidos)
@@ -0,0 +1,262 @@
+# Statistics endpoint tests
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from tests.utils.exercise import create_random_exercise
+from tests.utils.user import create_random_user
+from tests.utils.workout import create_random_treino
+
+
+def _execution_payload(treino_id: int, exercicio_id: int, series: list) -> dict:
+    return {
+        "treino_fixo_id": treino_id,
+        "data_inicio": "2024-05-15T10:00:00",
+        "exercicios_executados": [
+            {"exercicio_id": exercicio_id, "ordem": 1, "series": series}
+        ],
+    }
+
+
+def test_volume_rollup_follows_execution_writes(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+    params = {"data_inicio": "2024-05-01", "data_fim": "2024-05-31", "agrupamento": "dia"}
+
+    series = [
+        {"ordem": 1, "repeticoes": 10, "peso": 50, "concluida": True},
+        {"ordem": 2, "repeticoes": 8, "peso": 60, "concluida": True},
+        {"ordem": 3, "repeticoes": 8, "peso": 60, "concluida": False},
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/execucoes/",
+        json=_execution_payload(treino.id, exercicio.id, series),
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    execucao_id = r.json()["id"]
+
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/volume", params=params, headers=user_token_headers)
+    assert r.status_code == 200
+    assert r.json() == [
+        {"periodo_inicio": "2024-05-15", "grupo_muscular": "Peito", "series": 2, "repeticoes": 18, "tonelagem": 980.0}
+    ]
+
+    # Finalizar com a terceira série concluída aplica apenas a diferença
+    series[2]["concluida"] = True
+    r = client.put(
+        f"{settings.API_V1_STR}/execucoes/{execucao_id}",
+        json={"exercicios_executados": [{"exercicio_id": exercicio.id, "ordem": 1, "series": series}]},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    r = client.get(
+        f"{settings.API_V1_STR}/estatisticas/volume",
+        params={**params, "agrupamento": "semana"},
+        headers=user_token_headers,
+    )
+    assert r.json() == [
+        {"periodo_inicio": "2024-05-13", "grupo_muscular": "Peito", "series": 3, "repeticoes": 26, "tonelagem": 1460.0}
+    ]
+
+    r = client.delete(f"{settings.API_V1_STR}/execucoes/{execucao_id}", headers=user_token_headers)
+    assert r.status_code == 204
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/volume", params=params, headers=user_token_headers)
+    assert r.json() == []
+
+
+def test_volume_rollup_follows_muscle_group_changes(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    outro = create_random_exercise(db, user_id=user.id, nome="Remada", grupo_muscular="Costas")
+    treino = create_random_treino(db, user_id=user.id)
+    params = {"data_inicio": "2024-05-01", "data_fim": "2024-05-31", "agrupamento": "dia"}
+    payload = _execution_payload(treino.id, exercicio.id, [{"ordem": 1, "repeticoes": 10, "peso": 50, "concluida": True}])
+    payload["exercicios_executados"].append(
+        {"exercicio_id": outro.id, "ordem": 2, "series": [{"ordem": 1, "repeticoes": 5, "peso": 40, "concluida": True}]}
+    )
+    execucao_id = client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=user_token_headers).json()["id"]
+
+    def volume() -> dict:
+        r = client.get(f"{settings.API_V1_STR}/estatisticas/volume", params=params, headers=user_token_headers)
+        return {v["grupo_muscular"]: (v["series"], v["tonelagem"]) for v in r.json()}
+
+    r = client.put(
+        f"{settings.API_V1_STR}/exercicios/{exercicio.id}", json={"grupo_muscular": "Costas"}, headers=user_token_headers
+    )
+    assert r.status_code == 200
+    assert volume() == {"Costas": (2, 700.0)}
+    client.patch(
+        f"{settings.API_V1_STR}/exercicios/", json={"ids": [exercicio.id, outro.id], "grupo_muscular": "Ombros"},
+        headers=user_token_headers,
+    )
+    assert volume() == {"Ombros": (2, 700.0)}
+
+    # Removing the execution afterwards subtracts from the group the volume was moved to
+    client.delete(f"{settings.API_V1_STR}/execucoes/{execucao_id}", headers=user_token_headers)
+    assert volume() == {}
+
+
+def test_personal_records_track_best_series(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+
+    r = client.post(
+        f"{settings.API_V1_STR}/execucoes/",
+        json=_execution_payload(treino.id, exercicio.id, [
+            {"ordem": 1, "repeticoes": 5, "peso": 100, "concluida": True},
+            {"ordem": 2, "repeticoes": 10, "peso": 85, "concluida": True},
+        ]),
+        headers=user_token_headers,
+    )
+    execucao_id = r.json()["id"]
+    series = {s["ordem"]: s["id"] for s in r.json()["exercicios_executados"][0]["series"]}
+
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/recordes/{exercicio.id}", headers=user_token_headers)
+    assert r.status_code == 200
+    recorde = r.json()
+    assert recorde["melhor_peso"] == 100
+    assert recorde["melhor_peso_repeticoes"] == 5
+    assert recorde["melhor_peso_serie_id"] == series[1]
+    assert recorde["e1rm_epley"] == 116.67  # 100 * (1 + 5/30)
+    assert recorde["e1rm_epley_serie_id"] == series[1]
+    assert recorde["e1rm_brzycki"] == 113.33  # 85 * 36 / 27
+    assert recorde["e1rm_brzycki_serie_id"] == series[2]
+
+    # Remover a série de origem do recorde recalcula o exercício a partir do histórico
+    r = client.put(
+        f"{settings.API_V1_STR}/execucoes/{execucao_id}",
+        json={"exercicios_executados": [{"exercicio_id": exercicio.id, "ordem": 1, "series": [
+            {"ordem": 1, "repeticoes": 5, "peso": 90, "concluida": True},
+        ]}]},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/recordes", headers=user_token_headers)
+    assert len(r.json()) == 1
+    assert r.json()[0]["melhor_peso"] == 90
+    assert r.json()[0]["e1rm_epley"] == 105.0
+
+    client.delete(f"{settings.API_V1_STR}/execucoes/{execucao_id}", headers=user_token_headers)
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/recordes/{exercicio.id}", headers=user_token_headers)
+    assert r.status_code == 404
+
+
+def test_exercise_progression(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+
+    for data_inicio, peso in (("2024-05-01T10:00:00", 100), ("2024-05-08T10:00:00", 110), ("2024-05-15T10:00:00", 120)):
+        payload = _execution_payload(treino.id, exercicio.id, [
+            {"ordem": 1, "repeticoes": 1, "peso": peso, "concluida": True},
+            {"ordem": 2, "repeticoes": 1, "peso": peso - 10, "concluida": True},
+            {"ordem": 3, "repeticoes": 1, "peso": peso + 50, "concluida": False},
+        ])
+        payload["data_inicio"] = data_inicio
+        r = client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=user_token_headers)
+        assert r.status_code == 200
+
+    r = client.get(
+        f"{settings.API_V1_STR}/estatisticas/progresso/{exercicio.id}",
+        params={"janela": 2},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    progresso = r.json()
+    assert progresso["sessoes"] == 3
+    assert progresso["tendencia_e1rm_semanal"] == 10.0
+    assert [p["data"] for p in progresso["pontos"]] == ["2024-05-01", "2024-05-08", "2024-05-15"]
+    assert [p["e1rm"] for p in progresso["pontos"]] == [100.0, 110.0, 120.0]
+    assert [p["e1rm_media_movel"] for p in progresso["pontos"]] == [100.0, 105.0, 115.0]
+    assert [p["tonelagem"] for p in progresso["pontos"]] == [190.0, 210.0, 230.0]
+
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/progresso", headers=user_token_headers)
+    assert r.json() == [{
+        "exercicio_id": exercicio.id,
+        "sessoes": 3,
+        "tonelagem_total": 630.0,
+        "e1rm_atual": 120.0,
+        "e1rm_maximo": 120.0,
+        "tendencia_e1rm_semanal": 10.0,
+    }]
+
+
+def test_training_calendar_and_streaks(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    user = create_random_user(db)
+    treino = create_random_treino(db, user_id=user.id)
+    hoje = date.today()
+
+    # Sequência atual de 3 dias (hoje incluso, duas execuções hoje) e uma antiga de 4 dias
+    dias = [hoje, hoje, hoje - timedelta(days=1), hoje - timedelta(days=2)]
+    dias += [hoje - timedelta(days=d) for d in (10, 11, 12, 13)]
+    ids = []
+    for dia in dias:
+        payload = {"treino_fixo_id": treino.id, "data_inicio": datetime.combine(dia, datetime.min.time()).isoformat()}
+        r = client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=user_token_headers)
+        assert r.status_code == 200
+        ids.append(r.json()["id"])
+
+    params = {"ano": hoje.year, "mes": hoje.month}
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/calendario", params=params, headers=user_token_headers)
+    assert r.status_code == 200
+    calendario = r.json()
+    assert calendario["sequencia_atual"] == 3
+    assert calendario["maior_sequencia"] == 4
+    assert {"dia": hoje.isoformat(), "execucoes": 2} in calendario["dias"]
+
+    # Removendo as duas execuções de hoje a sequência atual ainda vale (último treino foi ontem)
+    for execucao_id in ids[:2]:
+        client.delete(f"{settings.API_V1_STR}/execucoes/{execucao_id}", headers=user_token_headers)
+    r = client.get(f"{settings.API_V1_STR}/estatisticas/calendario", params=params, headers=user_token_headers)
+    assert r.json()["sequencia_atual"] == 2
+    assert all(d["dia"] != hoje.isoformat() for d in r.json()["dias"])
+
+
+def test_muscle_group_distribution(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    user = create_random_user(db)
+    peito = create_random_exercise(db, user_id=user.id)
+    perna = create_random_exercise(db, user_id=user.id, nome="Agachamento", grupo_muscular="Perna")
+    treino = create_random_treino(db, user_id=user.id)
+    hoje = date.today()
+
+    for dia, exercicio in ((hoje, peito), (hoje, perna), (hoje - timedelta(days=7), peito), (hoje - timedelta(weeks=10), perna)):
+        payload = _execution_payload(treino.id, exercicio.id, [
+            {"ordem": 1, "repeticoes": 10, "peso": 20, "concluida": True},
+            {"ordem": 2, "repeticoes": 10, "peso": 20, "concluida": False},
+        ])
+        payload["data_inicio"] = datetime.combine(dia, datetime.min.time()).isoformat()
+        client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=user_token_headers)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/estatisticas/grupos-musculares",
+        params={"semanas": 4},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json() == [
+        {"periodo_inicio": None, "grupo_muscular": "Peito", "series": 2, "repeticoes": 20, "tonelagem": 400.0},
+        {"periodo_inicio": None, "grupo_muscular": "Perna", "series": 1, "repeticoes": 10, "tonelagem": 200.0},
+    ]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/estatisticas/grupos-musculares",
+        params={"semanas": 4, "agrupamento": "semana"},
+        headers=user_token_headers,
+    )
+    segunda = hoje - timedelta(days=hoje.weekday())
+    assert [(g["periodo_inicio"], g["grupo_muscular"], g["series"]) for g in r.json()] == [
+        ((segunda - timedelta(weeks=1)).isoformat(), "Peito", 1),
+        (segunda.isoformat(), "Peito", 1),
+        (segunda.isoformat(), "Perna", 1),
+    ]
@@ -1,6 +1,7 @@
 # User endpoint tests
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
+from app.core.cache import user_cache
 from app.core.config import settings
 from tests.utils.user import create_random_user
 
@@ -49,5 +50,31 @@ def test_retrieve_users(client: TestClient, db: Session) -> None:
     assert len(all_users) >= 1 # At least one user should exist
     # Add more specific assertions if needed, e.g., checking structure of items
 
-# TODO: Add tests for user update and delete if those endpoints are implemented
+def test_current_user_is_served_from_cache(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    user_cache.clear()
+    for _ in range(3):
+        r = client.get(f"{settings.API_V1_STR}/usuarios/me", headers=user_token_headers)
+        assert r.status_code == 200
+    assert user_cache.stats()["misses"] == 1
+    assert user_cache.stats()["hits"] == 2
+
+def test_update_user_me_invalidates_cache(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    client.get(f"{settings.API_V1_STR}/usuarios/me", headers=user_token_headers)
+    r = client.put(f"{settings.API_V1_STR}/usuarios/me", json={"nome": "Nome Novo", "peso": 72.5}, headers=user_token_headers)
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/usuarios/me", headers=user_token_headers)
+    assert r.json()["nome"] == "Nome Novo"
+    assert r.json()["peso"] == 72.5
+
+def test_current_user_etag(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    url = f"{settings.API_V1_STR}/usuarios/me"
+    etag = client.get(url, headers=user_token_headers).headers["ETag"]
+    r = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+    assert (r.status_code, r.content, r.headers["ETag"]) == (304, b"", etag)
+    client.put(url, json={"nome": "Nome Novo"}, headers=user_token_headers)
+    r = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["nome"] == "Nome Novo"
+
+# TODO: Add tests for user delete if that endpoint is implemented
 # TODO: Add tests for authentication requirements if endpoints are protected
@@ -0,0 +1,490 @@
+# Workout and workout execution endpoint tests
+import asyncio
+import sqlite3
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app import crud, schemas
+from app.api import deps
+from app.core.config import settings
+from app.db.marca_dagua import agora_preciso
+from app.db.session import create_async_db_engine
+from app.main import app
+from app.schemas.workout_execution import ExecucaoTreinoCreate, ExecucaoTreinoUpdate
+from tests.utils.exercise import create_random_exercise
+from tests.utils.queries import assert_max_queries
+from tests.utils.user import create_random_user
+from tests.utils.workout import create_random_treino
+
+
+def test_workout_crud_loads_nested_exercises(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    exercicio = create_random_exercise(db)
+
+    r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino A"}, headers=user_token_headers)
+    assert r.status_code == 200
+    treino = r.json()
+    assert treino["exercicios_treino"] == []
+
+    r = client.post(
+        f"{settings.API_V1_STR}/treinos/{treino['id']}/exercicios",
+        json={"exercicio_id": exercicio.id, "ordem": 1, "repeticoes_recomendadas": "8-12"},
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json()["exercicio"]["nome"] == "Supino"
+
+    r = client.put(
+        f"{settings.API_V1_STR}/treinos/{treino['id']}", json={"nome": "Treino B"}, headers=user_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["nome"] == "Treino B"
+    assert r.json()["exercicios_treino"][0]["exercicio"]["nome"] == "Supino"
+
+    r = client.get(f"{settings.API_V1_STR}/treinos/", headers=user_token_headers)
+    assert [t["nome"] for t in r.json()] == ["Treino B"]
+
+    r = client.delete(f"{settings.API_V1_STR}/treinos/{treino['id']}", headers=user_token_headers)
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/treinos/{treino['id']}", headers=user_token_headers)
+    assert r.status_code == 404
+
+
+def test_execution_reads_include_workout_and_exercise(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    exercicio = create_random_exercise(db)
+    r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino A"}, headers=user_token_headers)
+    treino_id = r.json()["id"]
+
+    payload = {
+        "treino_fixo_id": treino_id,
+        "exercicios_executados": [
+            {"exercicio_id": exercicio.id, "ordem": 1, "series": [{"ordem": 1, "repeticoes": 10, "peso": 40}]}
+        ],
+    }
+    r = client.post(f"{settings.API_V1_STR}/execucoes/", json=payload, headers=user_token_headers)
+    assert r.status_code == 200
+    execucao = r.json()
+    assert execucao["treino_fixo"]["nome"] == "Treino A"
+    assert execucao["exercicios_executados"][0]["exercicio"]["nome"] == "Supino"
+
+    r = client.get(f"{settings.API_V1_STR}/execucoes/{execucao['id']}", headers=user_token_headers)
+    assert r.json() == execucao
+    r = client.get(f"{settings.API_V1_STR}/execucoes/by-workout/{treino_id}", headers=user_token_headers)
+    assert [e["id"] for e in r.json()] == [execucao["id"]]
+
+
+def test_reads_are_served_by_the_replica(
+    client: TestClient, db: Session, user_token_headers: dict, tmp_path
+) -> None:
+    r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino A"}, headers=user_token_headers)
+    treino_a = r.json()["id"]
+
+    # A file copy of the primary stands in for the replica
+    replica_path = tmp_path / "replica.db"
+    with db.get_bind().raw_connection() as primary, sqlite3.connect(replica_path) as replica:
+        primary.driver_connection.backup(replica)
+    replica_engine = create_async_db_engine(f"sqlite:///{replica_path}", poolclass=NullPool)
+    ReplicaSession = async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_read_db():
+        async with ReplicaSession() as replica_db:
+            yield replica_db
+
+    app.dependency_overrides[deps.get_async_read_db] = override_get_async_read_db
+    try:
+        # Writes still go to the primary, which also serves the write response
+        r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino B"}, headers=user_token_headers)
+        assert r.status_code == 200
+        r = client.put(
+            f"{settings.API_V1_STR}/treinos/{treino_a}", json={"nome": "Treino A2"}, headers=user_token_headers
+        )
+        assert r.json()["nome"] == "Treino A2"
+
+        r = client.get(f"{settings.API_V1_STR}/treinos/", headers=user_token_headers)
+        assert [t["nome"] for t in r.json()] == ["Treino A"]
+        r = client.get(f"{settings.API_V1_STR}/treinos/{treino_a}", headers=user_token_headers)
+        assert r.json()["nome"] == "Treino A"
+    finally:
+        app.dependency_overrides[deps.get_async_read_db] = app.dependency_overrides[deps.get_async_db]
+        asyncio.run(replica_engine.dispose())
+
+
+def test_execution_history_cursor_pagination(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino A"}, headers=user_token_headers)
+    treino_id = r.json()["id"]
+    # Two executions share a data_inicio so the id tiebreaker is exercised
+    datas = ["2024-05-01T10:00:00", "2024-05-02T10:00:00", "2024-05-02T10:00:00", "2024-05-03T10:00:00", "2024-05-04T10:00:00"]
+    ids = []
+    for data_inicio in datas:
+        r = client.post(
+            f"{settings.API_V1_STR}/execucoes/",
+            json={"treino_fixo_id": treino_id, "data_inicio": data_inicio},
+            headers=user_token_headers,
+        )
+        ids.append(r.json()["id"])
+    esperado = [ids[4], ids[3], ids[2], ids[1], ids[0]]
+
+    vistos = []
+    params = {"limit": 2}
+    while True:
+        r = client.get(f"{settings.API_V1_STR}/execucoes/", params=params, headers=user_token_headers)
+        assert r.status_code == 200
+        vistos += [e["id"] for e in r.json()]
+        if "X-Next-Cursor" not in r.headers:
+            break
+        params["cursor"] = r.headers["X-Next-Cursor"]
+    assert vistos == esperado
+
+    # The offset page and the cursor page agree on the ordering
+    r = client.get(f"{settings.API_V1_STR}/execucoes/", params={"skip": 2, "limit": 2}, headers=user_token_headers)
+    assert [e["id"] for e in r.json()] == esperado[2:4]
+
+    r = client.get(f"{settings.API_V1_STR}/execucoes/", params={"cursor": "invalido"}, headers=user_token_headers)
+    assert r.status_code == 400
+
+
+def test_start_execution_copies_the_workout_template(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    supino = create_random_exercise(db)
+    agachamento = create_random_exercise(db, nome="Agachamento", grupo_muscular="Perna")
+    r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino A"}, headers=user_token_headers)
+    treino_id = r.json()["id"]
+    for ordem, (exercicio, series) in enumerate(((supino, 3), (agachamento, 2)), start=1):
+        client.post(
+            f"{settings.API_V1_STR}/treinos/{treino_id}/exercicios",
+            json={"exercicio_id": exercicio.id, "ordem": ordem, "series": series, "repeticoes_recomendadas": "8-12"},
+            headers=user_token_headers,
+        )
+
+    r = client.post(f"{settings.API_V1_STR}/execucoes/start", json={"treino_fixo_id": treino_id}, headers=user_token_headers)
+    assert r.status_code == 200
+    exercicios = sorted(r.json()["exercicios_executados"], key=lambda e: e["ordem"])
+    assert [(e["exercicio"]["nome"], len(e["series"])) for e in exercicios] == [("Supino", 3), ("Agachamento", 2)]
+    assert {s["repeticoes"] for e in exercicios for s in e["series"]} == {10}
+
+
+def test_create_with_exercicios_uses_a_constant_number_of_inserts(db: Session) -> None:
+    user = create_random_user(db)
+    treino = create_random_treino(db, user_id=user.id)
+    exercicios = [create_random_exercise(db, nome=f"Exercício {i}") for i in range(6)]
+
+    def payload(n_exercicios: int) -> ExecucaoTreinoCreate:
+        return ExecucaoTreinoCreate(
+            treino_fixo_id=treino.id,
+            exercicios_executados=[
+                {
+                    "exercicio_id": exercicio.id,
+                    "ordem": ordem,
+                    "series": [{"ordem": s, "repeticoes": ordem, "peso": s * 10} for s in range(1, ordem + 1)],
+                }
+                for ordem, exercicio in enumerate(exercicios[:n_exercicios], start=1)
+            ],
+        )
+
+    inserts = []
+    def contar(conn, cursor, statement, *args) -> None:
+        if statement.startswith("INSERT INTO execucao_exercicio") or statement.startswith("INSERT INTO serie"):
+            inserts.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", contar)
+    try:
+        crud.execucao_treino.create_with_exercicios(db, obj_in=payload(2), usuario_id=user.id)
+        poucos = len(inserts)
+        inserts.clear()
+        execucao = crud.execucao_treino.create_with_exercicios(db, obj_in=payload(6), usuario_id=user.id)
+        assert len(inserts) == poucos == 2
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", contar)
+
+    # Each exercise got exactly its own series
+    for ee in execucao.exercicios_executados:
+        assert ee.exercicio_id == exercicios[ee.ordem - 1].id
+        assert sorted((s.ordem, s.repeticoes) for s in ee.series) == [(s, ee.ordem) for s in range(1, ee.ordem + 1)]
+
+
+def test_finalizar_treino_only_writes_changed_series(db: Session) -> None:
+    user = create_random_user(db)
+    treino = create_random_treino(db, user_id=user.id)
+    exercicio = create_random_exercise(db)
+    series = [{"ordem": s, "repeticoes": 10, "peso": 50, "concluida": False} for s in range(1, 5)]
+    execucao = crud.execucao_treino.create_with_exercicios(
+        db,
+        obj_in=ExecucaoTreinoCreate(
+            treino_fixo_id=treino.id,
+            exercicios_executados=[{"exercicio_id": exercicio.id, "ordem": 1, "series": series}],
+        ),
+        usuario_id=user.id,
+    )
+    ids = {s.ordem: s.id for s in execucao.exercicios_executados[0].series}
+
+    escritas = []
+    def registrar(conn, cursor, statement, *args) -> None:
+        if statement.startswith(("INSERT INTO serie ", "UPDATE serie ", "DELETE FROM serie ")):
+            escritas.append(statement.split(" ", 1)[0])
+
+    def salvar(series_in: list) -> dict:
+        escritas.clear()
+        db_obj = crud.execucao_treino.get_full_details(db, id=execucao.id, usuario_id=user.id)
+        obj_in = ExecucaoTreinoUpdate(
+            exercicios_executados=[{"exercicio_id": exercicio.id, "ordem": 1, "series": series_in}]
+        )
+        event.listen(db.get_bind(), "before_cursor_execute", registrar)
+        try:
+            crud.execucao_treino.finalizar_treino(db, db_obj=db_obj, obj_in=obj_in)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", registrar)
+        db_obj = crud.execucao_treino.get_full_details(db, id=execucao.id, usuario_id=user.id)
+        return {s.ordem: (s.id, s.concluida) for s in db_obj.exercicios_executados[0].series}
+
+    series[1]["concluida"] = True
+    salvas = salvar(series)
+    assert escritas == ["UPDATE"]
+    assert salvas == {ordem: (ids[ordem], ordem == 2) for ordem in ids}
+
+    # Unchanged payload writes nothing
+    salvar(series)
+    assert escritas == []
+
+    # Missing ordens are deleted and new ones inserted; the rest keep their rows
+    salvas = salvar(series[:2] + [{"ordem": 5, "repeticoes": 8, "peso": 55, "concluida": True}])
+    assert sorted(escritas) == ["DELETE", "INSERT"]
+    assert salvas[1][0] == ids[1] and salvas[2][0] == ids[2]
+    assert sorted(salvas) == [1, 2, 5]
+
+
+def test_patch_single_and_bulk_sets(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    exercicio = create_random_exercise(db)
+    r = client.post(f"{settings.API_V1_STR}/treinos/", json={"nome": "Treino A"}, headers=user_token_headers)
+    treino_id = r.json()["id"]
+    series = [{"ordem": s, "repeticoes": 10, "peso": 50} for s in (1, 2, 3)]
+    r = client.post(
+        f"{settings.API_V1_STR}/execucoes/",
+        json={
+            "treino_fixo_id": treino_id,
+            "data_inicio": "2024-05-15T10:00:00",
+            "exercicios_executados": [{"exercicio_id": exercicio.id, "ordem": 1, "series": series}],
+        },
+        headers=user_token_headers,
+    )
+    execucao_id = r.json()["id"]
+    url = f"{settings.API_V1_STR}/execucoes/{execucao_id}"
+
+    r = client.patch(f"{url}/exercicios/1/series/2", json={"concluida": True}, headers=user_token_headers)
+    assert r.status_code == 200
+    assert {k: v for k, v in r.json().items() if k != "id"} == {
+        "exercicio_ordem": 1, "ordem": 2, "repeticoes": 10, "peso": 50.0, "concluida": True
+    }
+
+    r = client.patch(
+        f"{url}/series",
+        json=[{"exercicio_ordem": 1, "ordem": 1, "concluida": True}, {"exercicio_ordem": 1, "ordem": 3, "peso": 60, "concluida": True}],
+        headers=user_token_headers,
+    )
+    assert r.status_code == 200
+    assert [(s["ordem"], s["peso"], s["concluida"]) for s in r.json()] == [(1, 50.0, True), (3, 60.0, True)]
+
+    r = client.patch(f"{url}/exercicios/1", json={"observacoes": "Pegada fechada"}, headers=user_token_headers)
+    assert r.status_code == 200
+    assert r.json()["observacoes"] == "Pegada fechada"
+
+    # Unknown sets are rejected without writing anything
+    r = client.patch(
+        f"{url}/series",
+        json=[{"exercicio_ordem": 1, "ordem": 1, "peso": 999}, {"exercicio_ordem": 1, "ordem": 9, "concluida": True}],
+        headers=user_token_headers,
+    )
+    assert r.status_code == 404
+
+    # An explicit null would write NULL into concluida; omitting the field is how it is kept
+    r = client.patch(f"{url}/exercicios/1/series/1", json={"concluida": None}, headers=user_token_headers)
+    assert r.status_code == 422
+    r = client.patch(f"{url}/series", json=[{"exercicio_ordem": 1, "ordem": 1, "concluida": None}], headers=user_token_headers)
+    assert r.status_code == 422
+
+    r = client.get(url, headers=user_token_headers)
+    exercicio_executado = r.json()["exercicios_executados"][0]
+    assert exercicio_executado["observacoes"] == "Pegada fechada"
+    assert sorted((s["ordem"], s["peso"], s["concluida"]) for s in exercicio_executado["series"]) == [
+        (1, 50.0, True), (2, 50.0, True), (3, 60.0, True)
+    ]
+
+    # The granular writes feed the volume rollup like a full PUT would
+    r = client.get(
+        f"{settings.API_V1_STR}/estatisticas/volume",
+        params={"data_inicio": "2024-05-01", "data_fim": "2024-05-31", "agrupamento": "dia"},
+        headers=user_token_headers,
+    )
+    assert r.json()[0]["series"] == 3
+    assert r.json()[0]["tonelagem"] == 1600.0
+
+
+def test_delete_workout_purges_history_in_background(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+    outro = create_random_treino(db, user_id=user.id)
+    for treino_fixo_id in (treino.id, treino.id, outro.id):
+        r = client.post(
+            f"{settings.API_V1_STR}/execucoes/",
+            json={
+                "treino_fixo_id": treino_fixo_id,
+                "data_inicio": "2024-05-15T10:00:00",
+                "exercicios_executados": [{"exercicio_id": exercicio.id, "ordem": 1, "series": [
+                    {"ordem": 1, "repeticoes": 10, "peso": 50, "concluida": True},
+                ]}],
+            },
+            headers=user_token_headers,
+        )
+        assert r.status_code == 200
+
+    r = client.delete(f"{settings.API_V1_STR}/treinos/{treino.id}", headers=user_token_headers)
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/treinos/{treino.id}", headers=user_token_headers)
+    assert r.status_code == 404
+
+    # The purge ran after the response: only the other workout's execution and series remain,
+    # and the rollups were rebuilt from it
+    r = client.get(f"{settings.API_V1_STR}/execucoes/", headers=user_token_headers)
+    assert [e["treino_fixo_id"] for e in r.json()] == [outro.id]
+    assert db.query(crud.serie.model).count() == 1
+    r = client.get(
+        f"{settings.API_V1_STR}/estatisticas/volume",
+        params={"data_inicio": "2024-05-01", "data_fim": "2024-05-31", "agrupamento": "dia"},
+        headers=user_token_headers,
+    )
+    assert [(v["series"], v["tonelagem"]) for v in r.json()] == [(1, 500.0)]
+
+
+def test_purge_leaves_children_to_the_database_cascade(db: Session) -> None:
+    user = create_random_user(db)
+    treino = create_random_treino(db, user_id=user.id)
+    exercicio = create_random_exercise(db)
+    crud.execucao_treino.create_with_exercicios(
+        db,
+        obj_in=ExecucaoTreinoCreate(
+            treino_fixo_id=treino.id,
+            exercicios_executados=[{"exercicio_id": exercicio.id, "ordem": 1, "series": [{"ordem": 1}, {"ordem": 2}]}],
+        ),
+        usuario_id=user.id,
+    )
+
+    statements = []
+    def registrar(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", registrar)
+    try:
+        crud.treino_fixo.purgar(db, id=treino.id)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", registrar)
+
+    # One DELETE for the workout; executions, exercises and series go with ON DELETE CASCADE
+    assert [s for s in statements if s.startswith("DELETE FROM")][0].startswith("DELETE FROM treino_fixo")
+    assert not any(s.startswith(("DELETE FROM execucao", "DELETE FROM serie")) for s in statements)
+    assert db.query(crud.serie.model).count() == 0
+    assert db.query(crud.execucao_exercicio.model).count() == 0
+
+
+def test_purge_adjusts_rollups_of_the_affected_days_in_one_transaction(db: Session) -> None:
+    user = create_random_user(db)
+    treino = create_random_treino(db, user_id=user.id)
+    outro = create_random_treino(db, user_id=user.id)
+    exercicio = create_random_exercise(db)
+    metas = {
+        tipo: crud.meta.create_with_owner(
+            db, obj_in=schemas.MetaCreate(tipo=tipo, valor_alvo=10, data_inicio=date(2024, 5, 1)), usuario_id=user.id
+        )
+        for tipo in ("treino", "peso")
+    }
+    for treino_fixo_id, dia, peso_corporal, carga in ((treino.id, 15, 80, 50), (outro.id, 16, 82, 40), (treino.id, 20, 79, 60)):
+        crud.execucao_treino.create_with_exercicios(
+            db,
+            obj_in=ExecucaoTreinoCreate(
+                treino_fixo_id=treino_fixo_id,
+                data_inicio=datetime(2024, 5, dia, 10),
+                peso_corporal=peso_corporal,
+                exercicios_executados=[{"exercicio_id": exercicio.id, "ordem": 1, "series": [
+                    {"ordem": 1, "repeticoes": 10, "peso": carga, "concluida": True},
+                ]}],
+            ),
+            usuario_id=user.id,
+        )
+
+    commits = []
+    def registrar(session) -> None:
+        commits.append(session)
+
+    event.listen(db, "after_commit", registrar)
+    try:
+        crud.treino_fixo.purgar(db, id=treino.id)
+    finally:
+        event.remove(db, "after_commit", registrar)
+
+    # The DELETE and the rollup deltas of the purged days are a single transaction
+    assert len(commits) == 1
+    db.expire_all()
+    assert crud.dia_treino.get_dias(db, usuario_id=user.id) == [(date(2024, 5, 16), 1)]
+    assert [(v.dia, v.tonelagem) for v in db.query(crud.volume_diario.model)] == [(date(2024, 5, 16), 400.0)]
+    assert [(r.exercicio_id, r.melhor_peso) for r in db.query(crud.recorde_pessoal.model)] == [(exercicio.id, 40.0)]
+    # The goals follow the remaining history: one workout, and the weight of the latest execution left
+    assert metas["treino"].valor_atual == 1
+    assert metas["peso"].valor_atual == 82
+
+
+def test_workout_etag_skips_the_full_load_when_unchanged(
+    client: TestClient, db: Session, user_token_headers: dict
+) -> None:
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    treino = create_random_treino(db, user_id=user.id)
+    url = f"{settings.API_V1_STR}/treinos/{treino.id}"
+
+    r = client.get(url, headers=user_token_headers)
+    etag = r.headers["ETag"]
+    with assert_max_queries(1):
+        r = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+
+    # Adding an exercise, renaming it in the catalog and updating the workout all change the ETag
+    r = client.post(f"{url}/exercicios", json={"exercicio_id": exercicio.id, "ordem": 1}, headers=user_token_headers)
+    assert r.status_code == 200
+    etags = {etag}
+    for alterar in (
+        lambda: None,
+        lambda: client.put(f"{settings.API_V1_STR}/exercicios/{exercicio.id}", json={"nome": "Supino Reto"}, headers=user_token_headers),
+        lambda: client.put(url, json={"nome": "Treino B"}, headers=user_token_headers),
+    ):
+        alterar()
+        r = client.get(url, headers={**user_token_headers, "If-None-Match": etag})
+        assert r.status_code == 200
+        etag = r.headers["ETag"]
+        assert etag not in etags
+        etags.add(etag)
+    # The 200 response and the watermark query agree on the ETag
+    assert client.get(url, headers={**user_token_headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_only_watermark_columns_store_sub_second_timestamps(db: Session) -> None:
+    assert "%f" in str(agora_preciso().compile(dialect=sqlite.dialect()))
+    # func.now() is not overridden: columns outside the watermark keep CURRENT_TIMESTAMP
+    assert str(func.now().compile(dialect=sqlite.dialect())) == "CURRENT_TIMESTAMP"
+    treino = create_random_treino(db, user_id=create_random_user(db).id)
+    crud.treino_fixo.update(db, db_obj=treino, obj_in={"nome": "Treino B"})
+    assert treino.data_criacao.microsecond == 0
+    assert len(db.execute(text("SELECT data_atualizacao FROM treino_fixo")).scalar_one()) == len("2024-05-15 10:00:00.000")
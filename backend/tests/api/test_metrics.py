@@ -0,0 +1,82 @@
+# /metrics exposition tests
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.metricas import Histograma, metricas
+from app.db.session import create_db_engine
+from tests.utils.exercise import create_random_exercise
+from tests.utils.user import create_random_user
+
+
+def _amostras(texto: str) -> dict:
+    return dict(linha.rsplit(" ", 1) for linha in texto.splitlines() if not linha.startswith("#"))
+
+
+def test_histogram_buckets_and_quantiles() -> None:
+    histograma = Histograma((0.1, 0.2, 0.4))
+    for valor in (0.05, 0.15, 0.15, 0.3, 1.0):
+        histograma.observar(valor)
+    assert histograma.acumulados() == [(0.1, 1), (0.2, 3), (0.4, 4), (float("inf"), 5)]
+    assert histograma.total == 5
+    assert histograma.soma == pytest.approx(1.65)
+    assert histograma.quantil(0.5) == pytest.approx(0.175)
+    # Acima do último limite finito a estimativa fica no limite, como no histogram_quantile
+    assert histograma.quantil(0.99) == 0.4
+    assert Histograma((0.1,)).quantil(0.95) is None
+
+
+def test_metrics_are_labelled_by_route_template(client: TestClient, db: Session, user_token_headers: dict) -> None:
+    metricas.limpar()
+    user = create_random_user(db)
+    exercicio = create_random_exercise(db, user_id=user.id)
+    for _ in range(3):
+        r = client.get(f"{settings.API_V1_STR}/exercicios/{exercicio.id}", headers=user_token_headers)
+        assert r.status_code == 200
+    client.get(f"{settings.API_V1_STR}/exercicios/{exercicio.id + 1000}", headers=user_token_headers)
+    client.get("/nao-existe")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    amostras = _amostras(r.text)
+
+    rotulos = f'method="GET",route="{settings.API_V1_STR}/exercicios/{{id}}"'
+    assert amostras[f"fittracker_http_request_duration_seconds_count{{{rotulos}}}"] == "4"
+    assert amostras[f'fittracker_http_request_duration_seconds_bucket{{{rotulos},le="+Inf"}}'] == "4"
+    assert amostras[f'fittracker_http_responses_total{{{rotulos},status="200"}}'] == "3"
+    assert amostras[f'fittracker_http_responses_total{{{rotulos},status="404"}}'] == "1"
+    assert f'fittracker_http_request_duration_quantile_seconds{{{rotulos},quantile="0.99"}}' in amostras
+    assert amostras['fittracker_http_responses_total{method="GET",route="nao_roteada",status="404"}'] == "1"
+    # Nenhuma série por id concreto
+    assert f"/exercicios/{exercicio.id}" not in r.text
+    # A própria requisição de /metrics está em andamento
+    assert amostras["fittracker_http_requests_in_flight"] == "1"
+
+
+def test_pool_metrics_count_checkouts_and_timeouts(tmp_path) -> None:
+    engine = create_db_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, nome="teste_pool",
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    try:
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        with engine.connect():
+            pass
+    finally:
+        engine.dispose()
+
+    pool = metricas.pools["teste_pool"]
+    assert (pool.checkouts, pool.checkins, pool.conexoes_abertas, pool.timeouts) == (2, 2, 1, 1)
+    assert pool.espera.total == 3
+    assert pool.espera.soma >= 0.05
+
+    amostras = _amostras(metricas.exposicao())
+    assert amostras['fittracker_db_pool_timeouts_total{pool="teste_pool"}'] == "1"
+    assert amostras['fittracker_db_pool_wait_seconds_count{pool="teste_pool"}'] == "3"
+    assert amostras['fittracker_db_pool_checked_out{pool="teste_pool"}'] == "0"
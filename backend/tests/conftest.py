@@ -6,18 +6,26 @@ import os
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, PROJECT_ROOT)
 
+# Minimum bcrypt cost keeps the suite fast; must be set before app settings are loaded
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The test schema is built from the models below, not by the migrations of the app database
+os.environ.setdefault("CHECK_SCHEMA_VERSION", "false")
+
 # Pytest fixtures
 import pytest
 from typing import Generator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 
 from app.main import app # This import should now work
 from app.core.config import settings
 from app.db.base import Base # Import Base from your app
 # from app.db.session import SessionLocal # Not strictly needed if TestingSessionLocal is used for tests
+from app.db.session import create_async_db_engine, create_db_engine
 from app.api import deps
+from app.core.cache import catalogo_publico, token_versions, user_cache
 
 # Use a different database for testing
 # Ensure a unique name for the test database to avoid conflicts
@@ -26,8 +34,11 @@ from app.api import deps
 # Or a file-based one if needed:
 SQLALCHEMY_DATABASE_URL_TEST = "sqlite:///./test_fittracker.db"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL_TEST)
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL_TEST)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Each TestClient runs its own event loop, so async connections must not be pooled across tests
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL_TEST, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 @pytest.fixture(scope="session")
 def db_engine():
@@ -44,20 +55,18 @@ def db_engine():
 def db(db_engine) -> Generator[Session, None, None]: # db_engine is now a dependency
     """
     Yields a SQLAlchemy session for a test.
-    Rolls back transactions after the test to ensure isolation.
+    Data is really committed, because async endpoints read it through their own connection;
+    every table is emptied after the test to keep isolation.
     """
-    connection = db_engine.connect()
-    # begin a non-ORM transaction
-    transaction = connection.begin()
-    # bind an ORM session to the connection
-    # The bind is important here for the session to use the correct transaction context
-    db_session = TestingSessionLocal(bind=connection)
+    db_session = TestingSessionLocal()
 
     yield db_session
 
+    db_session.rollback()
     db_session.close()
-    transaction.rollback()
-    connection.close()
+    with db_engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
 
 
 @pytest.fixture(scope="function") # Changed from "module" to "function"
@@ -73,8 +82,37 @@ def client(db: Session) -> Generator[TestClient, None, None]: # Added type hint
             # The 'db' fixture itself handles closing/rolling back the session.
             pass # Session is managed by the db fixture
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_async_db] = override_get_async_db
+    # Without a replica in the test settings, reads go to the same test database
+    app.dependency_overrides[deps.get_read_db] = override_get_db
+    app.dependency_overrides[deps.get_async_read_db] = override_get_async_db
+    # Ids are reused after each test's rollback, so cached users must not leak between tests
+    user_cache.clear()
+    token_versions.clear()
+    catalogo_publico.clear()
     with TestClient(app) as c:
         yield c
     # Clean up dependency override after tests in this module
     app.dependency_overrides.pop(deps.get_db, None)
+    app.dependency_overrides.pop(deps.get_async_db, None)
+    app.dependency_overrides.pop(deps.get_read_db, None)
+    app.dependency_overrides.pop(deps.get_async_read_db, None)
+
+
+@pytest.fixture(scope="function")
+def user_token_headers(client: TestClient, db: Session) -> dict:
+    """
+    Creates the default test user and returns its auth headers.
+    """
+    from tests.utils.user import create_random_user
+
+    user = create_random_user(db)
+    login_data = {"username": user.email, "password": "testpassword"}
+    r = client.post(f"{settings.API_V1_STR}/auth/login", data=login_data)
+    assert r.status_code == 200
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
@@ -0,0 +1,44 @@
+# Per-request SQL instrumentation tests
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.instrumentacao import InstrumentacaoSQLMiddleware, impressao_digital, medir_consultas
+
+
+def test_fingerprint_ignores_parameter_list_sizes() -> None:
+    assert impressao_digital("SELECT a FROM t WHERE id IN (?, ?, ?)") == impressao_digital("SELECT a\n  FROM t WHERE id IN (?)")
+    assert impressao_digital("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?)"
+
+
+def test_nested_measurements_add_up_and_flag_repeats(db: Session) -> None:
+    with medir_consultas() as externo:
+        db.execute(text("SELECT 1"))
+        with medir_consultas() as interno:
+            for valor in (1, 2, 3):
+                db.execute(text("SELECT :valor"), {"valor": valor})
+    assert (externo.statements, interno.statements) == (4, 3)
+    assert interno.repetidas == {"SELECT ?": 3}
+    assert externo.statements_repetidos == 2
+    assert externo.tempo_db >= interno.tempo_db > 0
+
+
+def test_middleware_warns_about_repeated_statements(db: Session, caplog) -> None:
+    async def aplicacao(scope, receive, send) -> None:
+        for valor in range(4):
+            db.execute(text("SELECT :valor"), {"valor": valor})
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    enviadas = []
+    async def enviar(message) -> None:
+        enviadas.append(message)
+
+    middleware = InstrumentacaoSQLMiddleware(aplicacao, cabecalhos=True, limite_repeticoes=3)
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentacao"):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/x", "headers": []}, None, enviar))
+    assert "Possível N+1 em GET /x: 4x SELECT ?" in caplog.text
+    assert (b"x-db-queries", b"4") in enviadas[0]["headers"]
+    assert (b"x-db-repeated", b"3") in enviadas[0]["headers"]
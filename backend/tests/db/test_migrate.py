@@ -0,0 +1,163 @@
+# Schema migration tests
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import IntegrityError
+
+from app.db.base import Base
+from app.db.migrate import EsquemaDesatualizado, migrar, verificar_versao, versao_esquema
+from app.db.migrations import VERSAO_ATUAL
+from app.db.session import create_db_engine
+
+
+def _esquema(engine) -> dict:
+    inspector = inspect(engine)
+    return {
+        tabela: (
+            {(c["name"], c["nullable"]) for c in inspector.get_columns(tabela)},
+            {(i["name"], tuple(i["column_names"]), bool(i["unique"])) for i in inspector.get_indexes(tabela)},
+            {
+                (tuple(fk["constrained_columns"]), fk["referred_table"], fk["options"].get("ondelete"))
+                for fk in inspector.get_foreign_keys(tabela)
+            },
+        )
+        for tabela in inspector.get_table_names()
+        if tabela != versao_esquema.name
+    }
+
+
+def test_migrations_build_the_model_schema(tmp_path) -> None:
+    migrado = create_engine(f"sqlite:///{tmp_path / 'migrado.db'}")
+    modelos = create_engine(f"sqlite:///{tmp_path / 'modelos.db'}")
+    Base.metadata.create_all(bind=modelos)
+
+    assert migrar(migrado) == list(range(1, VERSAO_ATUAL + 1))
+    assert _esquema(migrado) == _esquema(modelos)
+    assert migrar(migrado) == []
+    verificar_versao(migrado)
+
+
+def test_migrations_upgrade_a_legacy_database(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legado.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE execucao_treino (id INTEGER PRIMARY KEY, usuario_id INTEGER NOT NULL, "
+                             "treino_fixo_id INTEGER NOT NULL, data_inicio DATETIME NOT NULL)")
+    with pytest.raises(EsquemaDesatualizado):
+        verificar_versao(engine)
+
+    migrar(engine)
+    colunas = {c["name"] for c in inspect(engine).get_columns("execucao_treino")}
+    assert "duracao_minutos" in colunas
+    indices = {i["name"] for i in inspect(engine).get_indexes("execucao_treino")}
+    assert "ix_execucao_treino_usuario_data" in indices
+    verificar_versao(engine)
+
+
+def test_statistics_migration_backfills_existing_history(tmp_path) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'sem_estatisticas.db'}")
+    migrar(engine)
+    # Simulates a database from version 2: history recorded before the statistics tables existed
+    with engine.connect() as conn:
+        for tabela in ("volume_diario", "recorde_pessoal", "dia_treino"):
+            conn.exec_driver_sql(f"DROP TABLE {tabela}")
+        conn.exec_driver_sql("INSERT INTO usuario (id, nome, email, senha_hash) VALUES (1, 'A', 'a@example.com', '-')")
+        conn.exec_driver_sql("INSERT INTO exercicio (id, nome, grupo_muscular, dificuldade) VALUES (1, 'Supino', 'Peito', 'medio')")
+        conn.exec_driver_sql("INSERT INTO treino_fixo (id, usuario_id, nome) VALUES (1, 1, 'Treino A')")
+        conn.exec_driver_sql("INSERT INTO execucao_treino (id, usuario_id, treino_fixo_id, data_inicio) "
+                             "VALUES (1, 1, 1, '2024-05-15 10:00:00')")
+        conn.exec_driver_sql("INSERT INTO execucao_exercicio (id, execucao_treino_id, exercicio_id, ordem) VALUES (1, 1, 1, 1)")
+        conn.exec_driver_sql("INSERT INTO serie (id, execucao_exercicio_id, repeticoes, peso, concluida, ordem) "
+                             "VALUES (1, 1, 10, 50, 1, 1), (2, 1, 8, 60, 1, 2)")
+        conn.exec_driver_sql("DELETE FROM versao_esquema WHERE versao >= 3")
+        conn.commit()
+
+    assert migrar(engine) == list(range(3, VERSAO_ATUAL + 1))
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT dia, grupo_muscular, series, repeticoes, tonelagem FROM volume_diario").all() == [
+            ("2024-05-15", "Peito", 2, 18, 980.0)
+        ]
+        assert conn.exec_driver_sql("SELECT exercicio_id, melhor_peso, melhor_peso_serie_id FROM recorde_pessoal").all() == [(1, 60.0, 2)]
+        assert conn.exec_driver_sql("SELECT dia, execucoes FROM dia_treino").all() == [("2024-05-15", 1)]
+
+
+def test_cascade_migration_rebuilds_foreign_keys_and_quarantines_orphans(tmp_path) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'sem_cascata.db'}")
+    migrar(engine)
+    # Simulates a database created before the cascades: serie without ON DELETE and an orphan row
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.exec_driver_sql("DROP TABLE serie")
+        conn.exec_driver_sql("CREATE TABLE serie (id INTEGER PRIMARY KEY, execucao_exercicio_id INTEGER NOT NULL "
+                             "REFERENCES execucao_exercicio (id), repeticoes INTEGER, peso FLOAT, concluida BOOLEAN, "
+                             "ordem INTEGER NOT NULL, data_criacao DATETIME, data_atualizacao DATETIME)")
+        conn.exec_driver_sql("INSERT INTO usuario (id, nome, email, senha_hash) VALUES (1, 'A', 'a@example.com', '-')")
+        conn.exec_driver_sql("INSERT INTO exercicio (id, nome, grupo_muscular, dificuldade) VALUES (1, 'Supino', 'Peito', 'medio')")
+        conn.exec_driver_sql("INSERT INTO treino_fixo (id, usuario_id, nome) VALUES (1, 1, 'Treino A')")
+        conn.exec_driver_sql("INSERT INTO execucao_treino (id, usuario_id, treino_fixo_id, data_inicio) "
+                             "VALUES (1, 1, 1, '2024-05-15 10:00:00')")
+        conn.exec_driver_sql("INSERT INTO execucao_exercicio (id, execucao_treino_id, exercicio_id, ordem) VALUES (1, 1, 1, 1)")
+        conn.exec_driver_sql("INSERT INTO serie (id, execucao_exercicio_id, ordem) VALUES (1, 1, 1), (2, 99, 1)")
+        conn.exec_driver_sql("DELETE FROM versao_esquema WHERE versao >= 7")
+        conn.commit()
+
+    assert migrar(engine) == list(range(7, VERSAO_ATUAL + 1))
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT id FROM serie").scalars().all() == [1]
+        assert conn.exec_driver_sql("SELECT id, execucao_exercicio_id FROM quarentena_serie").all() == [(2, 99)]
+        conn.exec_driver_sql("DELETE FROM usuario WHERE id = 1")
+        for tabela in ("treino_fixo", "execucao_treino", "execucao_exercicio", "serie"):
+            assert conn.exec_driver_sql(f"SELECT count(*) FROM {tabela}").scalar() == 0
+    assert {fk["options"].get("ondelete") for fk in inspect(engine).get_foreign_keys("serie")} == {"CASCADE"}
+
+
+def test_search_migration_indexes_existing_exercises(tmp_path) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'sem_busca.db'}")
+    migrar(engine)
+    # Simulates a database from version 7: exercises without the FTS5 table and its triggers
+    with engine.connect() as conn:
+        conn.exec_driver_sql("DROP TABLE exercicio_busca")
+        for trigger in ("exercicio_busca_ai", "exercicio_busca_ad", "exercicio_busca_au"):
+            conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        conn.exec_driver_sql("INSERT INTO exercicio (id, nome, grupo_muscular, dificuldade) VALUES (1, 'Supino Reto', 'Peito', 'medio')")
+        conn.exec_driver_sql("DELETE FROM versao_esquema WHERE versao >= 8")
+        conn.commit()
+
+    assert migrar(engine) == list(range(8, VERSAO_ATUAL + 1))
+    with engine.connect() as conn:
+        busca = "SELECT rowid FROM exercicio_busca WHERE exercicio_busca MATCH ?"
+        assert conn.exec_driver_sql(busca, ('"sup"*',)).scalars().all() == [1]
+        conn.exec_driver_sql("UPDATE exercicio SET nome = 'Crucifixo' WHERE id = 1")
+        assert conn.exec_driver_sql(busca, ('"sup"*',)).scalars().all() == []
+        assert conn.exec_driver_sql(busca, ('"cruc"*',)).scalars().all() == [1]
+
+
+def test_exercise_migration_stops_cascading_into_history(tmp_path) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'exercicio_em_cascata.db'}")
+    migrar(engine)
+    # Simulates a database from version 8: execucao_exercicio deleted in cascade with its exercise
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.exec_driver_sql("DROP TABLE execucao_exercicio")
+        conn.exec_driver_sql("CREATE TABLE execucao_exercicio (id INTEGER PRIMARY KEY, execucao_treino_id INTEGER NOT NULL "
+                             "REFERENCES execucao_treino (id) ON DELETE CASCADE, exercicio_id INTEGER NOT NULL "
+                             "REFERENCES exercicio (id) ON DELETE CASCADE, ordem INTEGER NOT NULL, observacoes TEXT, "
+                             "data_criacao DATETIME, data_atualizacao DATETIME)")
+        conn.exec_driver_sql("INSERT INTO usuario (id, nome, email, senha_hash) VALUES (1, 'A', 'a@example.com', '-')")
+        conn.exec_driver_sql("INSERT INTO exercicio (id, nome, grupo_muscular, dificuldade) VALUES (1, 'Supino', 'Peito', 'medio')")
+        conn.exec_driver_sql("INSERT INTO treino_fixo (id, usuario_id, nome) VALUES (1, 1, 'Treino A')")
+        conn.exec_driver_sql("INSERT INTO execucao_treino (id, usuario_id, treino_fixo_id, data_inicio) "
+                             "VALUES (1, 1, 1, '2024-05-15 10:00:00')")
+        conn.exec_driver_sql("INSERT INTO execucao_exercicio (id, execucao_treino_id, exercicio_id, ordem) VALUES (1, 1, 1, 1)")
+        conn.exec_driver_sql("DELETE FROM versao_esquema WHERE versao = 9")
+        conn.commit()
+
+    assert migrar(engine) == [9]
+    with engine.connect() as conn:
+        with pytest.raises(IntegrityError):
+            conn.exec_driver_sql("DELETE FROM exercicio WHERE id = 1")
+        conn.rollback()
+        assert conn.exec_driver_sql("SELECT count(*) FROM execucao_exercicio").scalar() == 1
+        # The user's own cascade still goes through: the check runs at the end of the statement
+        conn.exec_driver_sql("DELETE FROM usuario WHERE id = 1")
+        assert conn.exec_driver_sql("SELECT count(*) FROM execucao_exercicio").scalar() == 0
+    fks = inspect(engine).get_foreign_keys("execucao_exercicio")
+    assert {fk["referred_table"]: fk["options"].get("ondelete") for fk in fks} == {"execucao_treino": "CASCADE", "exercicio": None}
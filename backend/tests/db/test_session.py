@@ -0,0 +1,39 @@
+# Database engine profile tests
+import asyncio
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from app.core.config import settings
+from app.db.session import create_async_db_engine, create_db_engine
+
+PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "temp_store", "cache_size")
+
+def _esperado() -> tuple:
+    return ("wal", 1, settings.SQLITE_BUSY_TIMEOUT_MS, 2, settings.SQLITE_CACHE_SIZE)
+
+def test_sqlite_connections_get_performance_pragmas(db_engine: Engine) -> None:
+    with db_engine.connect() as connection:
+        valores = tuple(connection.exec_driver_sql(f"PRAGMA {p}").scalar() for p in PRAGMAS)
+    assert valores == _esperado()
+
+def test_async_sqlite_connections_get_performance_pragmas(db_engine: Engine) -> None:
+    async def ler_pragmas() -> tuple:
+        async_engine = create_async_db_engine(str(db_engine.url), poolclass=NullPool)
+        async with async_engine.connect() as connection:
+            valores = tuple([(await connection.exec_driver_sql(f"PRAGMA {p}")).scalar() for p in PRAGMAS])
+        await async_engine.dispose()
+        return valores
+
+    assert asyncio.run(ler_pragmas()) == _esperado()
+
+@pytest.mark.parametrize(
+    "uri, pool",
+    [("sqlite://", StaticPool), ("sqlite:///./test_fittracker.db", QueuePool)],
+)
+def test_pool_class_follows_backend(uri: str, pool: type) -> None:
+    engine = create_db_engine(uri)
+    assert isinstance(engine.pool, pool)
+    assert engine.pool._pre_ping is False
+    engine.dispose()
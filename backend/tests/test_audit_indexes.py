@@ -0,0 +1,29 @@
+# Index audit tests
+from audit_indexes import auditar, varreduras_completas
+
+
+def test_crud_queries_do_not_scan_whole_tables() -> None:
+    planos = auditar()
+    assert planos
+    assert [(p.etapa, p.varreduras) for p in planos if p.varreduras] == []
+
+
+def test_execution_history_uses_composite_indexes() -> None:
+    planos = {}
+    for p in auditar():
+        planos.setdefault(p.etapa, p.plano) # a primeira query de cada etapa é a principal
+    assert any("ix_execucao_treino_usuario_data" in linha for linha in planos["execucao_treino.get_multi_by_usuario"])
+    assert any(
+        "ix_execucao_treino_usuario_treino_data" in linha
+        for linha in planos["execucao_treino.get_multi_by_usuario_and_treino_fixo"]
+    )
+    # A ordenação por data_inicio desc vem do índice, sem B-tree temporária
+    assert not any("TEMP B-TREE" in linha for linha in planos["execucao_treino.get_multi_by_usuario"])
+
+
+def test_full_scan_detection() -> None:
+    assert varreduras_completas(["SCAN serie"]) == ["SCAN serie"]
+    assert varreduras_completas(["SEARCH serie USING INDEX ix_serie_execucao_exercicio_id (execucao_exercicio_id=?)"]) == []
+    # FTS5 MATCH is answered by the inverted index even though the plan says SCAN
+    assert varreduras_completas(["SCAN exercicio_busca VIRTUAL TABLE INDEX 0:M3"]) == []
+    assert varreduras_completas(["SCAN exercicio_busca VIRTUAL TABLE INDEX 0:"]) != []
@@ -1 +1,15 @@
 # Exercise test utilities
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.schemas.exercise import ExercicioCreate
+
+def create_random_exercise(
+    db: Session, *, user_id: Optional[int] = None, nome: str = "Supino", grupo_muscular: str = "Peito"
+) -> models.Exercicio:
+    exercicio_in = ExercicioCreate(
+        nome=nome, grupo_muscular=grupo_muscular, dificuldade="medio", publico=True
+    )
+    return crud.exercicio.create_with_owner(db, obj_in=exercicio_in, user_id=user_id)
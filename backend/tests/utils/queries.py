@@ -0,0 +1,15 @@
+# SQL query budget helpers
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.db.instrumentacao import ConsultasRequisicao, medir_consultas
+
+@contextmanager
+def assert_max_queries(n: int) -> Iterator[ConsultasRequisicao]:
+    """
+    Fails when the block emits more than `n` SQL statements. TestClient requests made inside the
+    block run in a copy of this context, so their statements (background tasks included) count.
+    """
+    with medir_consultas() as registro:
+        yield registro
+    assert registro.statements <= n, f"query budget of {n} exceeded:\n{registro.resumo()}"
@@ -0,0 +1,7 @@
+# Workout test utilities
+from sqlalchemy.orm import Session
+
+from app import crud, models
+
+def create_random_treino(db: Session, *, user_id: int, nome: str = "Treino A") -> models.TreinoFixo:
+    return crud.treino_fixo.create(db, obj_in={"usuario_id": user_id, "nome": nome})